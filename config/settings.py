@@ -41,6 +41,7 @@ DJANGO_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 ]
 
 THIRD_PARTY_APPS = [
@@ -146,39 +147,90 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.User'
 
+# Аутентификация по JWT без загрузки пользователя из базы данных: признаки активности и суперпользователя
+# читаются из токена доступа (users.authentication.StatelessJWTAuthentication)
+JWT_STATELESS_AUTH_ENABLED = os.getenv('JWT_STATELESS_AUTH_ENABLED', 'False') == 'True'
+
 # Настройки для аутентификации DRF
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.StatelessJWTAuthentication' if JWT_STATELESS_AUTH_ENABLED
+        else 'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ]
 }
 
+# Отладочная проверка бюджета SQL-запросов представлений в запросах к API (QueryBudgetMixin), по умолчанию
+# выключена. Бюджеты проверяются тестами (trading_networks/tests.py), в строгом режиме превышение приводит к ошибке
+QUERY_BUDGET_ENABLED = os.getenv('QUERY_BUDGET_ENABLED', 'False') == 'True'
+QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', 'False') == 'True'
+
+# Максимальное количество сетей в одном запросе пакетного создания и изменения сетей
+NETWORK_BULK_MAX_ITEMS = int(os.getenv('NETWORK_BULK_MAX_ITEMS', 5000))
+
 # Настройки JWT токена
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=10),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.token.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.token.ClaimsTokenRefreshSerializer',
 }
 
 # Настройки Сelery
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL')
 CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND')
 CELERY_TIME_ZONE = 'UTC'
+# Задачи задолженности подтверждаются после выполнения (acks_late), поэтому воркер не берёт задачи впрок
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
 
 # Настройки Celery Beat
 CELERY_BEAT_SCHEDULE = {
     'increase_debt_every_1_minute': {
         'task': 'trading_networks.tasks.increase_debt',
         'schedule': timedelta(hours=3),
+        'kwargs': {'chunk_size': 5000, 'fan_out': True, 'shard_size': 50000, 'concurrency': 4},
     },
     'decrease_debt_daily': {
         'task': 'trading_networks.tasks.decrease_debt',
         'schedule': crontab(hour=6, minute=30),
+        'kwargs': {'chunk_size': 5000, 'fan_out': True, 'shard_size': 50000, 'concurrency': 4},
+    },
+    'rollup_debt_every_1_minute': {
+        'task': 'trading_networks.tasks.rollup_debt_balances',
+        'schedule': timedelta(minutes=1),
+    },
+}
+
+# Граф иерархии поставщиков в памяти процесса (необязательный кэш для проверки переноса сетей) и его максимальный
+# возраст в секундах
+HIERARCHY_GRAPH_CACHE_ENABLED = os.getenv('HIERARCHY_GRAPH_CACHE_ENABLED', 'False') == 'True'
+HIERARCHY_GRAPH_CACHE_TTL = int(os.getenv('HIERARCHY_GRAPH_CACHE_TTL', 60))
+
+# Кэш Django: Redis, если задан его адрес (например, redis://redis:6379/1), иначе кэш в памяти процесса
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_REDIS_URL,
+    } if CACHE_REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     },
 }
 
+# Кэш ответов представлений сетей и продуктов (ResponseCacheMixin): время жизни ответа в секундах и максимальное
+# время ожидания ответа, который формирует другой запрос. Кэш в памяти процесса не сбрасывается изменениями
+# из других процессов, поэтому кэш ответов следует включать только вместе с CACHE_REDIS_URL
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'False') == 'True'
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 300))
+RESPONSE_CACHE_LOCK_TIMEOUT = int(os.getenv('RESPONSE_CACHE_LOCK_TIMEOUT', 5))
+
+# Кэш идентификаторов сетей, сотрудником которых является пользователь (проверка IsCompanyEmployee). Кэш
+# сбрасывается при изменении сотрудников сетей, время жизни ограничивает задержку при сбоях сброса
+EMPLOYEE_NETWORKS_CACHE_ENABLED = os.getenv('EMPLOYEE_NETWORKS_CACHE_ENABLED', 'False') == 'True'
+EMPLOYEE_NETWORKS_CACHE_TTL = int(os.getenv('EMPLOYEE_NETWORKS_CACHE_TTL', 60))
+
 # Настройки почтового сервера для отправки сообщений
 EMAIL_HOST = os.getenv('EMAIL_HOST')
 EMAIL_PORT = os.getenv('EMAIL_PORT')
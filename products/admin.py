@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import SEARCH_VAR
 
 from products.models import Product
+from products.search import PRODUCT_SEARCH_FIELDS, search_products
 
 
 @admin.register(Product)
@@ -13,5 +15,22 @@ class ProductAdmin(admin.ModelAdmin):
 
     Атрибуты:
     - list_display: Кортеж, определяющий, какие поля модели будут отображаться в списке объектов на странице администратора.
+    - search_fields: Поля, по которым можно выполнять поиск продуктов. Поиск выполняется по индексам триграмм.
+
+    Методы:
+    - get_search_results(self, request, queryset, search_term): Ищет продукты по сходству триграмм.
+    - get_ordering(self, request): При поиске упорядочивает продукты по убыванию сходства со строкой поиска.
         """
     list_display = ('pk', 'product_name', 'product_model', 'date_release',)
+    search_fields = PRODUCT_SEARCH_FIELDS
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return search_products(search_term, queryset), False
+
+    def get_ordering(self, request):
+        if request.GET.get(SEARCH_VAR, '').strip():
+            return ('-rank', 'pk')
+        return super().get_ordering(request)
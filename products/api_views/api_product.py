@@ -1,10 +1,18 @@
-from rest_framework import generics
+from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from products.importer import CSV, NDJSON, import_products, read_product_rows
 from products.models import Product
 from products.paginators import ProductPaginator
-from products.serializers.product import ProductSerializer
+from products.search import search_products
+from products.serializers.product import ProductSearchResultSerializer, ProductSerializer
+from trading_networks.api_views.mixins import ConditionalGetMixin, ResponseCacheMixin, ValuesListMixin
+from trading_networks.cache import PRODUCT_SCOPE
 from trading_networks.permissions import IsActiveEmployee, IsSuperUser
+from trading_networks.serializers.search import SearchQuerySerializer
+from users.authentication import FreshUserMixin
 
 
 class ProductCreateAPIView(generics.CreateAPIView):
@@ -21,38 +29,98 @@ class ProductCreateAPIView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated & IsActiveEmployee]
 
 
-class ProductListAPIView(generics.ListAPIView):
+class ProductListAPIView(ResponseCacheMixin, ConditionalGetMixin, ValuesListMixin, generics.ListAPIView):
     """
     Представление для отображения списка всех продуктов.
 
     Позволяет аутентифицированным и активным сотрудникам получать список всех продуктов с пагинацией.
+    Поддерживает условные запросы (см. ConditionalGetMixin), ответы кэшируются (см. ResponseCacheMixin).
 
     Атрибуты:
     - serializer_class: Класс сериализатора, используемого для преобразования объектов Product в формат JSON.
     - queryset: QuerySet объектов Product, который возвращает все продукты.
     - pagination_class: Класс пагинации, используемый для разбивки списка продуктов на страницы.
     - permission_classes: Список классов разрешений; доступ разрешен только аутентифицированным и активным сотрудникам.
+    - cache_scope: Область кэша ответов (см. ResponseCacheMixin).
         """
     serializer_class = ProductSerializer
-    queryset = Product.objects.all()
+    queryset = Product.objects.order_by('pk')
     pagination_class = ProductPaginator
     permission_classes = [IsAuthenticated & IsActiveEmployee]
+    cache_scope = PRODUCT_SCOPE
+
+
+class ProductImportAPIView(APIView):
+    """
+    Представление для потокового импорта продуктов из CSV или NDJSON.
+
+    Формат определяется заголовком Content-Type (text/csv или application/x-ndjson). Тело запроса читается
+    построчно и сохраняется пакетами: продукт с уже существующими названием и моделью обновляется, а не дублируется.
+    Строки с ошибками пропускаются и перечисляются в ответе.
+
+    Атрибуты:
+    - permission_classes: Список классов разрешений; доступ разрешен только аутентифицированным и активным сотрудникам.
+    - content_types: Соответствие типов содержимого форматам импорта.
+
+    Методы:
+    - post(request): Импортирует продукты из тела запроса и возвращает сводку импорта.
+    """
+    permission_classes = [IsAuthenticated & IsActiveEmployee]
+    content_types = {'text/csv': CSV, 'application/x-ndjson': NDJSON}
+
+    def post(self, request):
+        file_format = self.content_types.get(request.content_type.split(';')[0].strip())
+        if file_format is None:
+            return Response({'error': f'Поддерживаются типы содержимого: {", ".join(self.content_types)}'},
+                            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+        # Поток читается напрямую, минуя парсеры DRF, чтобы тело запроса не загружалось в память целиком
+        summary = import_products(read_product_rows(request.stream or [], file_format))
+        return Response(summary, status=status.HTTP_200_OK)
+
+
+class ProductSearchAPIView(generics.GenericAPIView):
+    """
+    Представление для поиска продуктов по названию и модели.
+
+    Возвращает продукты, упорядоченные по убыванию сходства со строкой поиска, для автодополнения.
+
+    Атрибуты:
+    - serializer_class: Класс сериализатора, используемого для представления результатов поиска.
+    - permission_classes: Список классов разрешений; доступ разрешен только аутентифицированным и активным сотрудникам.
+
+    Методы:
+    - get(request): Проверяет параметры q и limit и возвращает найденные продукты.
+    """
+    serializer_class = ProductSearchResultSerializer
+    permission_classes = [IsAuthenticated & IsActiveEmployee]
+
+    def get(self, request):
+        query_serializer = SearchQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        params = query_serializer.validated_data
+
+        products = search_products(params['q'], Product.objects.only('pk', 'product_name', 'product_model'))
+        return Response(self.get_serializer(products[:params['limit']], many=True).data)
 
 
-class ProductRetrieveAPIView(generics.RetrieveAPIView):
+class ProductRetrieveAPIView(ResponseCacheMixin, ConditionalGetMixin, generics.RetrieveAPIView):
     """
     Представление для отображения детальной информации о продукте.
 
     Позволяет аутентифицированным и активным сотрудникам получать информацию о конкретном продукте по его ID.
+    Поддерживает условные запросы (см. ConditionalGetMixin), ответы кэшируются (см. ResponseCacheMixin).
 
     Атрибуты:
     - serializer_class: Класс сериализатора, используемого для преобразования объекта Product в формат JSON.
     - queryset: QuerySet объектов Product, среди которых производится поиск по ID.
     - permission_classes: Список классов разрешений; доступ разрешен только аутентифицированным и активным сотрудникам.
+    - cache_scope: Область кэша ответов (см. ResponseCacheMixin).
     """
     serializer_class = ProductSerializer
     queryset = Product.objects.all()
     permission_classes = [IsAuthenticated & IsActiveEmployee]
+    cache_scope = PRODUCT_SCOPE
 
 
 class ProductUpdateAPIView(generics.UpdateAPIView):
@@ -71,11 +139,12 @@ class ProductUpdateAPIView(generics.UpdateAPIView):
     permission_classes = [IsAuthenticated & IsActiveEmployee]
 
 
-class ProductDestroyAPIView(generics.DestroyAPIView):
+class ProductDestroyAPIView(FreshUserMixin, generics.DestroyAPIView):
     """
     Представление для удаления продукта.
 
-    Позволяет аутентифицированным суперпользователям удалять продукт по его ID.
+    Позволяет аутентифицированным суперпользователям удалять продукт по его ID. Удаление необратимо, поэтому
+    пользователь загружается из базы данных (см. FreshUserMixin).
 
     Атрибуты:
     - queryset: QuerySet объектов Product, среди которых производится поиск по ID.
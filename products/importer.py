@@ -0,0 +1,210 @@
+import csv
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.db import transaction
+from rest_framework import serializers
+
+from products.models import Product
+from products.validators import validate_release_dates
+from trading_networks.cache import PRODUCT_SCOPE, invalidate_objects
+
+CSV = 'csv'
+NDJSON = 'ndjson'
+FILE_FORMATS = (CSV, NDJSON)
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+UNIQUE_FIELDS = ('product_name', 'product_model')
+# Поля, которые обновляются у существующего продукта, только если они есть в строке импорта
+UPDATE_FIELDS = ('date_release',)
+
+
+class ProductImportRowSerializer(serializers.Serializer):
+    """
+    Сериализатор для строки импорта продуктов.
+
+    Проверяет поля строки без обращений к базе данных; дата выпуска проверяется для всего пакета функцией
+    validate_release_dates. Максимальная длина названия и модели берётся из модели Product.
+
+    Атрибуты:
+    - product_name (CharField): Название продукта.
+    - product_model (CharField): Модель продукта.
+    - date_release (DateField): Дата выхода продукта на рынок. Может быть пустой.
+
+    Методы:
+    - to_internal_value(self, data): Считает пустую дату выпуска (пустая или недостающая ячейка CSV) отсутствующей:
+    дата выпуска существующего продукта при этом не изменяется.
+    """
+    product_name = serializers.CharField(max_length=Product._meta.get_field('product_name').max_length)
+    product_model = serializers.CharField(max_length=Product._meta.get_field('product_model').max_length)
+    date_release = serializers.DateField(required=False, allow_null=True)
+
+    def to_internal_value(self, data):
+        if data.get('date_release') == '':
+            data = {name: value for name, value in data.items() if name != 'date_release'}
+        return super().to_internal_value(data)
+
+
+def decode_lines(stream, encoding, invalid_lines):
+    """
+    Построчно декодирует бинарный поток.
+
+    Строка, которую не удалось декодировать, декодируется с заменой некорректных байтов, а её номер добавляется
+    в invalid_lines, поэтому ошибка кодировки относится к одной строке и не прерывает чтение потока.
+
+    Аргументы:
+    - stream: Бинарный поток с данными.
+    - encoding (str): Кодировка потока.
+    - invalid_lines (set): Номера строк с ошибкой кодировки; дополняется.
+
+    Возвращает:
+    - generator: Декодированные строки.
+    """
+    for number, line in enumerate(stream, start=1):
+        try:
+            yield line.decode(encoding)
+        except UnicodeDecodeError:
+            invalid_lines.add(number)
+            yield line.decode(encoding, errors='replace')
+
+
+def get_encoding_error(encoding):
+    """
+    Возвращает сообщение об ошибке для строки, которую не удалось декодировать.
+    """
+    return f'Строка содержит некорректные данные в кодировке {encoding}'
+
+
+def read_csv_rows(stream, encoding='utf-8-sig'):
+    """
+    Построчно читает продукты из CSV с заголовком.
+
+    Аргументы:
+    - stream: Бинарный поток с данными.
+    - encoding (str): Кодировка потока.
+
+    Возвращает:
+    - generator: Пары (номер строки, словарь полей или сообщение об ошибке, если строку не удалось прочитать).
+    """
+    invalid_lines = set()
+    reader = csv.DictReader(decode_lines(stream, encoding, invalid_lines), restval='')
+    for row in reader:
+        # Строки потока декодируются по мере чтения CSV, поэтому все ещё не учтённые ошибки относятся к этой записи
+        if invalid_lines:
+            invalid_lines.clear()
+            row = get_encoding_error(encoding)
+        yield reader.line_num, row
+
+
+def read_ndjson_rows(stream, encoding='utf-8'):
+    """
+    Построчно читает продукты из NDJSON: каждая непустая строка содержит один объект JSON.
+
+    Аргументы:
+    - stream: Бинарный поток с данными.
+    - encoding (str): Кодировка потока.
+
+    Возвращает:
+    - generator: Пары (номер строки, словарь полей или сообщение об ошибке, если строку не удалось прочитать).
+    """
+    invalid_lines = set()
+    for number, line in enumerate(decode_lines(stream, encoding, invalid_lines), start=1):
+        if number in invalid_lines:
+            yield number, get_encoding_error(encoding)
+            continue
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else 'Строка не является объектом JSON'
+
+
+def read_product_rows(stream, file_format):
+    """
+    Возвращает генератор строк импорта для указанного формата файла (csv или ndjson).
+    """
+    return read_csv_rows(stream) if file_format == CSV else read_ndjson_rows(stream)
+
+
+def validate_product_batch(batch):
+    """
+    Проверяет пакет строк импорта.
+
+    Аргументы:
+    - batch (list): Пары (номер строки, словарь полей или сообщение об ошибке).
+
+    Возвращает:
+    - tuple: Проверенные данные продуктов и ошибки в виде пар (номер строки, ошибки).
+    """
+    valid, errors = [], []
+    for number, row in batch:
+        if isinstance(row, str):
+            errors.append((number, {'non_field_errors': [row]}))
+            continue
+        serializer = ProductImportRowSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((number, serializer.validated_data))
+        else:
+            errors.append((number, serializer.errors))
+
+    date_errors = validate_release_dates([data.get('date_release') for number, data in valid])
+    errors.extend((number, {'date_release': [error]}) for (number, data), error in zip(valid, date_errors) if error)
+    return [data for (number, data), error in zip(valid, date_errors) if not error], errors
+
+
+def upsert_products(rows):
+    """
+    Добавляет продукты или обновляет время изменения и поля UPDATE_FIELDS существующих продуктов с теми же
+    названием и моделью запросами INSERT ... ON CONFLICT. У существующего продукта обновляются только поля,
+    которые есть в строке импорта, поэтому строки сгруппированы по набору полей: не больше одного запроса
+    на каждый набор. Кэшированные ответы с сохранёнными продуктами сбрасываются.
+
+    Аргументы:
+    - rows (list): Проверенные данные продуктов. При повторе пары (название, модель) используется последняя строка.
+
+    Возвращает:
+    - int: Количество добавленных или обновлённых продуктов.
+    """
+    rows = {tuple(data[field] for field in UNIQUE_FIELDS): data for data in rows}
+    groups = defaultdict(list)
+    for data in rows.values():
+        groups[tuple(field for field in UPDATE_FIELDS if field in data)].append(Product(**data))
+    for fields, products in groups.items():
+        Product.objects.bulk_create(products, update_conflicts=True, unique_fields=UNIQUE_FIELDS,
+                                    update_fields=(*fields, 'updated_at'))
+    invalidate_objects(PRODUCT_SCOPE, [product.pk for products in groups.values() for product in products])
+    return len(rows)
+
+
+def import_products(rows, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Импортирует продукты из потока строк пакетами.
+
+    Строки читаются из генератора по одному пакету, каждый пакет проверяется и сохраняется в отдельной транзакции,
+    а из ошибок сохраняются только первые MAX_REPORTED_ERRORS, поэтому расход памяти не зависит от размера файла.
+    Строки с ошибками пропускаются и не прерывают импорт.
+
+    Аргументы:
+    - rows (iterable): Пары (номер строки, словарь полей или сообщение об ошибке), например из read_product_rows.
+    - batch_size (int): Количество строк в пакете.
+
+    Возвращает:
+    - dict: Количество обработанных строк, сохранённых продуктов и ошибок, а также первые ошибки.
+    """
+    rows = iter(rows)
+    summary = {'processed': 0, 'upserted': 0, 'error_count': 0, 'errors': []}
+    while batch := list(islice(rows, batch_size)):
+        valid, errors = validate_product_batch(batch)
+        if valid:
+            with transaction.atomic():
+                summary['upserted'] += upsert_products(valid)
+        summary['processed'] += len(batch)
+        summary['error_count'] += len(errors)
+        free_slots = MAX_REPORTED_ERRORS - len(summary['errors'])
+        summary['errors'].extend({'line': number, 'errors': error} for number, error in sorted(
+            errors, key=lambda pair: pair[0])[:free_slots])
+    return summary
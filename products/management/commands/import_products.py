@@ -0,0 +1,37 @@
+from pathlib import Path
+
+from django.core.management import BaseCommand, CommandError
+
+from products.importer import DEFAULT_BATCH_SIZE, FILE_FORMATS, import_products, read_product_rows
+
+
+class Command(BaseCommand):
+    """
+    Команда для потокового импорта продуктов из файла CSV или NDJSON.
+
+    Файл читается построчно и сохраняется пакетами, поэтому расход памяти не зависит от размера файла. Продукт
+    с уже существующими названием и моделью обновляется, а не дублируется. Формат определяется по расширению файла
+    или задаётся параметром --format.
+    """
+    help = 'Импортирует продукты из файла CSV или NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу')
+        parser.add_argument('--format', choices=FILE_FORMATS, help='Формат файла; по умолчанию по расширению')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Количество строк в пакете')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in FILE_FORMATS:
+            raise CommandError(f'Не удалось определить формат файла, укажите --format ({", ".join(FILE_FORMATS)})')
+
+        with path.open('rb') as stream:
+            summary = import_products(read_product_rows(stream, file_format), batch_size=options['batch_size'])
+
+        for error in summary['errors']:
+            self.stdout.write(self.style.ERROR(f'Строка {error["line"]}: {error["errors"]}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано строк: {summary["processed"]}, сохранено продуктов: {summary["upserted"]}, '
+            f'ошибок: {summary["error_count"]}.'
+        ))
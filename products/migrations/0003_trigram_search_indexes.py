@@ -0,0 +1,26 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:05
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Индексы строятся без блокировки записи в таблицы, что невозможно внутри транзакции
+    atomic = False
+
+    dependencies = [
+        ('products', '0002_alter_product_product_model_and_more'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['product_name'], name='product_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['product_model'], name='product_model_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
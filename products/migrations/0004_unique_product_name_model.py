@@ -0,0 +1,61 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:10
+
+from django.db import migrations, models, transaction
+from django.db.models import Count, Min
+
+
+def merge_duplicate_products(apps, schema_editor):
+    """
+    Объединяет продукты с одинаковыми названием и моделью: связи сетей с дубликатами переносятся на продукт
+    с наименьшим id, после чего дубликаты удаляются.
+    """
+    Product = apps.get_model('products', 'Product')
+    Network = apps.get_model('trading_networks', 'Network')
+    NetworkProducts = Network.products.through
+
+    duplicates = (Product.objects.values('product_name', 'product_model')
+                  .annotate(kept_id=Min('id'), count=Count('id')).filter(count__gt=1))
+    with transaction.atomic():
+        for group in duplicates.iterator():
+            duplicate_ids = list(Product.objects.filter(product_name=group['product_name'],
+                                                        product_model=group['product_model'])
+                                 .exclude(id=group['kept_id']).values_list('id', flat=True))
+            linked = NetworkProducts.objects.filter(product_id=group['kept_id']).values('network_id')
+            NetworkProducts.objects.filter(product_id__in=duplicate_ids).exclude(network_id__in=linked) \
+                .update(product_id=group['kept_id'])
+            Product.objects.filter(id__in=duplicate_ids).delete()
+
+
+class Migration(migrations.Migration):
+    # Уникальный индекс строится без блокировки записи в таблицу, что невозможно внутри транзакции
+    atomic = False
+
+    dependencies = [
+        ('products', '0003_trigram_search_indexes'),
+        ('trading_networks', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_products, migrations.RunPython.noop),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS unique_product_name_model '
+                    'ON products_product (product_name, product_model);',
+                    'DROP INDEX CONCURRENTLY IF EXISTS unique_product_name_model;',
+                ),
+                migrations.RunSQL(
+                    'ALTER TABLE products_product ADD CONSTRAINT unique_product_name_model '
+                    'UNIQUE USING INDEX unique_product_name_model;',
+                    'ALTER TABLE products_product DROP CONSTRAINT unique_product_name_model;',
+                ),
+            ],
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='product',
+                    constraint=models.UniqueConstraint(fields=('product_name', 'product_model'),
+                                                       name='unique_product_name_model'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:40
+
+import django.db.models.functions.datetime
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Индекс строится без блокировки записи в таблицу, что невозможно внутри транзакции
+    atomic = False
+
+    dependencies = [
+        ('products', '0004_unique_product_name_model'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_default=django.db.models.functions.datetime.Now(), verbose_name='время изменения'),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(fields=['updated_at'], name='product_updated_at_idx'),
+        ),
+    ]
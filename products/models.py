@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from django.db.models.functions import Now
 
 from users.models import NULLABLE
 
@@ -14,6 +16,8 @@ class Product(models.Model):
     - product_name (CharField): Название продукта. Максимальная длина 25 символов.
     - product_model (CharField): Модель продукта. Максимальная длина 25 символов.
     - date_release (DateField): Дата выхода продукта на рынок. Может быть пустым или NULL (определяется в NULLABLE).
+    - updated_at (DateTimeField): Время последнего изменения продукта. Используется для условных запросов
+    (ETag, Last-Modified).
 
     Методы:
     - __str__(): Возвращает строковое представление объекта Product, отображающее название продукта.
@@ -21,10 +25,13 @@ class Product(models.Model):
     Класс Meta:
     - verbose_name: Человеко-читаемое имя для объекта Product в единственном числе.
     - verbose_name_plural: Человеко-читаемое имя для объектов Product во множественном числе.
+    - indexes: Индексы триграмм для поиска по названию и модели продукта и индекс по времени изменения.
+    - constraints: Уникальность пары (название, модель), по которой продукты обновляются при импорте.
     """
     product_name = models.CharField(max_length=25, verbose_name='название продукта')
     product_model = models.CharField(max_length=25, verbose_name='модель продукта')
     date_release = models.DateField(verbose_name='дата выхода на рынок', **NULLABLE)
+    updated_at = models.DateTimeField(auto_now=True, db_default=Now(), verbose_name='время изменения')
 
     def __str__(self):
         return f'{self.product_name}'
@@ -32,3 +39,11 @@ class Product(models.Model):
     class Meta:
         verbose_name = 'продукт'
         verbose_name_plural = 'продукты'
+        indexes = [
+            GinIndex(fields=('product_name',), name='product_name_trgm_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=('product_model',), name='product_model_trgm_idx', opclasses=['gin_trgm_ops']),
+            models.Index(fields=('updated_at',), name='product_updated_at_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=('product_name', 'product_model'), name='unique_product_name_model'),
+        ]
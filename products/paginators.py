@@ -1,12 +1,15 @@
 from rest_framework.pagination import PageNumberPagination
 
+from trading_networks.paginators import KeysetPaginationMixin
 
-class ProductPaginator(PageNumberPagination):
+
+class ProductPaginator(KeysetPaginationMixin, PageNumberPagination):
     """
     Пагинатор для списка продуктов.
 
     Этот класс управляет пагинацией для API, связанного с продуктами, устанавливая размер страницы и позволяя
-    пользователю указывать свой собственный размер страницы через параметр запроса.
+    пользователю указывать свой собственный размер страницы через параметр запроса. Помимо номеров страниц
+    поддерживает пагинацию по курсору (`?pagination=cursor`), см. KeysetPaginationMixin.
 
     Атрибуты:
     - page_size (int): Количество элементов на странице. По умолчанию 30.
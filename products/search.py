@@ -0,0 +1,18 @@
+from products.models import Product
+from trading_networks.search import trigram_search
+
+PRODUCT_SEARCH_FIELDS = ('product_name', 'product_model')
+
+
+def search_products(query, queryset=None):
+    """
+    Ищет продукты по названию и модели.
+
+    Аргументы:
+    - query (str): Строка поиска.
+    - queryset (QuerySet): Необязательный исходный QuerySet продуктов.
+
+    Возвращает:
+    - QuerySet: Найденные продукты с аннотацией rank, упорядоченные по убыванию ранга.
+    """
+    return trigram_search(Product.objects.all() if queryset is None else queryset, query, PRODUCT_SEARCH_FIELDS)
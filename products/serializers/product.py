@@ -20,3 +20,17 @@ class ProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = ('pk', 'product_name', 'product_model', 'date_release',)
+
+
+class ProductSearchResultSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для результата поиска продуктов.
+
+    Атрибуты:
+    - rank (FloatField): Сходство продукта со строкой поиска от 0 до 1.
+    """
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Product
+        fields = ('pk', 'product_name', 'product_model', 'rank')
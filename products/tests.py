@@ -1,3 +1,48 @@
+from datetime import date
+from io import BytesIO
+
 from django.test import TestCase
 
-# Create your tests here.
+from products.importer import CSV, NDJSON, ProductImportRowSerializer, import_products, read_product_rows
+from products.models import Product
+
+
+class ProductImportTests(TestCase):
+    """
+    Тесты потокового импорта продуктов (import_products).
+    """
+
+    def import_content(self, content, file_format):
+        return import_products(read_product_rows(BytesIO(content), file_format))
+
+    def test_missing_release_date_keeps_existing_date(self):
+        Product.objects.create(product_name='Телефон', product_model='A1', date_release=date(2020, 1, 1))
+        Product.objects.create(product_name='Планшет', product_model='B2', date_release=date(2020, 1, 1))
+        content = 'product_name,product_model,date_release\nТелефон,A1,\nПланшет,B2,2021-02-03\nНоутбук,C3\n'
+        summary = self.import_content(content.encode(), CSV)
+
+        self.assertEqual((summary['upserted'], summary['error_count']), (3, 0))
+        self.assertEqual(dict(Product.objects.values_list('product_name', 'date_release')),
+                         {'Телефон': date(2020, 1, 1), 'Планшет': date(2021, 2, 3), 'Ноутбук': None})
+
+    def test_explicit_null_clears_release_date(self):
+        Product.objects.create(product_name='Телефон', product_model='A1', date_release=date(2020, 1, 1))
+        self.import_content('{"product_name": "Телефон", "product_model": "A1", "date_release": null}\n'.encode(),
+                            NDJSON)
+        self.assertIsNone(Product.objects.get(product_name='Телефон').date_release)
+
+    def test_decode_errors_are_reported_per_line(self):
+        for file_format, content in (
+            (CSV, 'product_name,product_model\nТелефон,A1\n'.encode() + b'\xff,B2\n' + 'Ноутбук,C3\n'.encode()),
+            (NDJSON, '{"product_name": "Телефон", "product_model": "A1"}\n'.encode() + b'\xff\n'
+             + '{"product_name": "Ноутбук", "product_model": "C3"}\n'.encode()),
+        ):
+            with self.subTest(file_format=file_format):
+                summary = self.import_content(content, file_format)
+                self.assertEqual((summary['processed'], summary['upserted'], summary['error_count']), (3, 2, 1))
+                self.assertEqual(summary['errors'][0]['line'], 3 if file_format == CSV else 2)
+
+    def test_max_length_matches_model(self):
+        for name in ('product_name', 'product_model'):
+            self.assertEqual(ProductImportRowSerializer().fields[name].max_length,
+                             Product._meta.get_field(name).max_length)
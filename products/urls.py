@@ -1,7 +1,8 @@
 from django.urls import path
 
 from products.api_views.api_product import ProductCreateAPIView, ProductListAPIView, ProductRetrieveAPIView, \
-    ProductUpdateAPIView, ProductDestroyAPIView
+    ProductUpdateAPIView, ProductDestroyAPIView, ProductSearchAPIView, \
+    ProductImportAPIView
 from products.apps import ProductsConfig
 
 app_name = ProductsConfig.name
@@ -9,6 +10,8 @@ app_name = ProductsConfig.name
 urlpatterns = [
     path('create/', ProductCreateAPIView.as_view(), name='product-create'),
     path('list/', ProductListAPIView.as_view(), name='product-list'),
+    path('import/', ProductImportAPIView.as_view(), name='product-import'),
+    path('search/', ProductSearchAPIView.as_view(), name='product-search'),
     path('detail/<int:pk>/', ProductRetrieveAPIView.as_view(), name='product-detail'),
     path('update/<int:pk>/', ProductUpdateAPIView.as_view(), name='product-update'),
     path('delete/<int:pk>/', ProductDestroyAPIView.as_view(), name='product-delete'),
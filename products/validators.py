@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from datetime import date
 
+RELEASE_DATE_MESSAGE = "Дата выпуска не может быть новее сегодняшней!"
+
+
 def validate_release_date(value):
     """
     Проверяет, что вводимая дата не новее сегодняшней.
@@ -12,5 +15,21 @@ def validate_release_date(value):
     - serializers.ValidationError: Выдается, если дата новее сегодняшней.
     """
     if value > date.today():
-        raise serializers.ValidationError("Дата выпуска не может быть новее сегодняшней!")
+        raise serializers.ValidationError(RELEASE_DATE_MESSAGE)
     return value
+
+
+def validate_release_dates(values):
+    """
+    Проверяет пакет дат выпуска: ни одна дата не должна быть новее сегодняшней.
+
+    Текущая дата вычисляется один раз для всего пакета.
+
+    Аргументы:
+    - values (list): Даты, переданные для проверки. Пустые значения (None) допустимы.
+
+    Возвращает:
+    - list: Сообщение об ошибке для каждой даты или None, если дата корректна.
+    """
+    today = date.today()
+    return [RELEASE_DATE_MESSAGE if value is not None and value > today else None for value in values]
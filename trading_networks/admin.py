@@ -1,9 +1,40 @@
+from django import forms
 from django.contrib import admin
 from django.contrib import messages
+from django.contrib.admin.views.main import SEARCH_VAR
 from django.utils.html import format_html
+from rest_framework import serializers
 
-from trading_networks.models import Network
+from trading_networks.debt import record_debt_clear, rollup_debt
+from trading_networks.models import DebtTransaction, Network
+from trading_networks.search import ADMIN_NETWORK_SEARCH_FIELDS, search_networks
 from trading_networks.tasks import clear_debt_async
+from trading_networks.validators import validate_network_supplier, validate_supplier_for_factory, \
+    validate_supplier_hierarchy
+
+
+class NetworkAdminForm(forms.ModelForm):
+    """
+    Форма сети в админ-панели.
+
+    Проверяет поставщика и тип сети теми же валидаторами, что и API, чтобы через админ-панель нельзя было
+    создать цикл в иерархии или превысить максимальный уровень.
+    """
+
+    class Meta:
+        model = Network
+        fields = '__all__'
+
+    def clean(self):
+        cleaned_data = super().clean()
+        try:
+            validate_supplier_for_factory(cleaned_data)
+            validate_network_supplier(cleaned_data)
+            if self.instance.pk:
+                validate_supplier_hierarchy(self.instance, cleaned_data)
+        except serializers.ValidationError as error:
+            raise forms.ValidationError(error.detail)
+        return cleaned_data
 
 
 class NetworkAdmin(admin.ModelAdmin):
@@ -14,25 +45,57 @@ class NetworkAdmin(admin.ModelAdmin):
     информации о сетях.
 
     Атрибуты:
+    - form: Форма сети с проверкой поставщика и типа сети.
     - list_display: Список полей, отображаемых в таблице сетей на странице администрирования.
     - list_filter: Поля, по которым можно фильтровать списки сетей.
     - readonly_fields: Поля, которые доступны только для чтения в форме редактирования.
-    - search_fields: Поля, по которым можно выполнять поиск сетей.
+    - search_fields: Поля, по которым можно выполнять поиск сетей, включая название поставщика. Поиск выполняется
+    по индексам триграмм.
     - ordering: Порядок сортировки при отображении сетей.
     - actions: Список действий, доступных для выполнения над выделенными объектами.
 
     Методы:
+    - get_readonly_fields(self, request, obj=None): Делает задолженность существующей сети доступной только для чтения,
+    так как она изменяется через журнал задолженности.
+    - get_search_results(self, request, queryset, search_term): Ищет сети по сходству триграмм вместо поиска
+    подстроки, который выполняется последовательным сканированием таблицы.
+    - get_ordering(self, request): При поиске упорядочивает сети по убыванию сходства со строкой поиска.
+    - save_model(self, request, obj, form, change): Сохраняет сеть и фиксирует начальную задолженность новой сети
+    в журнале как ручную операцию.
     - supplier_link(self, obj): Создает ссылку на поставщика, если он существует.
     - clear_debt(self, request, queryset): Очищает задолженность для выбранных сетей. Если выбрано более 20 сетей,
     задолженность очищается асинхронно.
     """
+    form = NetworkAdminForm
     list_display = ('pk', 'network_type', 'network_name', 'email', 'copy_email', 'city', 'debt', 'created_at', 'supplier_link')
     list_filter = ('city',)
     readonly_fields = ('network_level',)
-    search_fields = ('network_name', 'city', 'supplier__network_name')
+    search_fields = ADMIN_NETWORK_SEARCH_FIELDS
     ordering = ('pk',)
     actions = ['clear_debt']
 
+    def get_readonly_fields(self, request, obj=None):
+        if obj:
+            return self.readonly_fields + ('debt',)
+        return self.readonly_fields
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return search_networks(search_term, queryset, self.search_fields), False
+
+    def get_ordering(self, request):
+        if request.GET.get(SEARCH_VAR, '').strip():
+            return ('-rank', 'pk')
+        return super().get_ordering(request)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if not change and obj.debt:
+            DebtTransaction.objects.create(network=obj, amount=obj.debt, source=DebtTransaction.MANUAL,
+                                           is_applied=True)
+
     def supplier_link(self, obj):
         """
         Создает ссылку на поставщика.
@@ -51,7 +114,8 @@ class NetworkAdmin(admin.ModelAdmin):
         """
         Очищает задолженность для выбранных сетей.
 
-        Если выбрано более 20 сетей, задолженность очищается асинхронно.
+        Очистка выполняется через журнал задолженности: добавляются обнуляющие операции, которые затем сводятся
+        в задолженность сетей. Если выбрано более 20 сетей, задолженность очищается асинхронно.
         В противном случае задолженность очищается синхронно.
         """
         selected = queryset.count()
@@ -61,7 +125,9 @@ class NetworkAdmin(admin.ModelAdmin):
             self.message_user(request, f'Очистка задолженности для {selected} сетей запущена асинхронно.',
                               level=messages.INFO)
         else:
-            updated_count = queryset.update(debt=0)
+            network_ids = list(queryset.values_list('id', flat=True))
+            updated_count = record_debt_clear(network_ids)
+            rollup_debt(network_ids=network_ids)
             self.message_user(request, f'Задолженность очищена у {updated_count} сетей.', level=messages.SUCCESS)
 
     clear_debt.short_description = 'Очистить задолженность перед поставщиком'
@@ -85,3 +151,29 @@ class NetworkAdmin(admin.ModelAdmin):
         }
 
 admin.site.register(Network, NetworkAdmin)
+
+
+@admin.register(DebtTransaction)
+class DebtTransactionAdmin(admin.ModelAdmin):
+    """
+    Админ-панель для журнала операций по задолженности.
+
+    Журнал только дополняется, поэтому операции доступны исключительно для просмотра.
+
+    Атрибуты:
+    - list_display: Список полей, отображаемых в таблице операций на странице администрирования.
+    - list_filter: Поля, по которым можно фильтровать операции.
+    - list_select_related: Связанные объекты, загружаемые вместе со списком операций.
+    """
+    list_display = ('pk', 'network', 'amount', 'source', 'is_applied', 'created_at')
+    list_filter = ('source', 'is_applied')
+    list_select_related = ('network',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
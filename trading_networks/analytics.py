@@ -0,0 +1,160 @@
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import connection, transaction
+from django.db.models import Avg, Count, Max, Q, QuerySet, Sum
+from django.utils import timezone
+
+from trading_networks.hierarchy import build_hierarchy_path, get_root_id_expression
+from trading_networks.models import Network, NetworkDebtCube, SubtreeDebtRollup
+
+SUBTREE_DEBT_FIELDS = ('network_level', 'network_type', 'total_debt', 'average_debt', 'max_debt', 'network_count')
+
+# Измерения в порядке аргументов GROUPING в материализованном представлении NetworkDebtCube
+DEBT_DIMENSIONS = ('country', 'city', 'network_type', 'network_level')
+DEBT_METRICS = ('network_count', 'total_debt', 'average_debt', 'min_debt', 'max_debt', 'median_debt', 'p90_debt')
+
+
+def aggregate_subtree_debt(root_ids):
+    """
+    Вычисляет агрегаты задолженности поддеревьев заданных корней одним запросом.
+
+    Корень каждой сети определяется по её материализованному пути, агрегаты группируются по корню, уровню
+    в иерархии и типу сети. Для списка корней сети поддеревьев выбираются условиями по префиксам путей,
+    объединёнными через OR, поэтому читаются только строки этих поддеревьев по индексу пути. QuerySet корней
+    (например, все заводы при пересчёте сводки) агрегируется по всей таблице сетей.
+
+    Аргументы:
+    - root_ids (list | QuerySet): Идентификаторы корней поддеревьев.
+
+    Возвращает:
+    - dict: Словарь {идентификатор корня: список строк с ключами SUBTREE_DEBT_FIELDS}.
+    """
+    if isinstance(root_ids, QuerySet):
+        networks = Network.objects.annotate(root_id=get_root_id_expression()).filter(root_id__in=root_ids)
+    elif root_ids:
+        networks = (Network.objects.filter(reduce(or_, (Q(hierarchy_path__startswith=build_hierarchy_path(root_id))
+                                                         for root_id in root_ids)))
+                    .annotate(root_id=get_root_id_expression()))
+    else:
+        return {}
+
+    rows = (networks.values('root_id', 'network_level', 'network_type')
+            .annotate(total_debt=Sum('debt'), average_debt=Avg('debt'), max_debt=Max('debt'), network_count=Count('id'))
+            .order_by('root_id', 'network_level', 'network_type'))
+
+    breakdown = defaultdict(list)
+    for row in rows:
+        breakdown[row.pop('root_id')].append(row)
+    return breakdown
+
+
+def get_cached_subtree_debt(root_ids):
+    """
+    Возвращает кэшированные агрегаты задолженности поддеревьев заданных корней.
+
+    Аргументы:
+    - root_ids (list): Идентификаторы корней поддеревьев.
+
+    Возвращает:
+    - dict: Словарь {идентификатор корня: список строк с ключами SUBTREE_DEBT_FIELDS}.
+    """
+    rows = (SubtreeDebtRollup.objects.filter(root_id__in=root_ids)
+            .order_by('root_id', 'network_level', 'network_type')
+            .values('root_id', *SUBTREE_DEBT_FIELDS))
+
+    breakdown = defaultdict(list)
+    for row in rows:
+        breakdown[row.pop('root_id')].append(row)
+    return breakdown
+
+
+def summarize_subtree_debt(breakdown):
+    """
+    Сводит разбивку задолженности поддерева в итоговые показатели.
+
+    Аргументы:
+    - breakdown (list): Строки разбивки с ключами SUBTREE_DEBT_FIELDS.
+
+    Возвращает:
+    - dict: Словарь с ключами total_debt, average_debt, max_debt, network_count.
+    """
+    total_debt = sum(row['total_debt'] for row in breakdown)
+    network_count = sum(row['network_count'] for row in breakdown)
+    return {
+        'total_debt': total_debt,
+        'average_debt': total_debt / network_count if network_count else 0,
+        'max_debt': max((row['max_debt'] for row in breakdown), default=0),
+        'network_count': network_count,
+    }
+
+
+def refresh_subtree_debt_rollup():
+    """
+    Пересчитывает кэшированную сводку задолженности поддеревьев всех заводов.
+
+    Сводка заменяется целиком в одной транзакции, поэтому читатели всегда видят согласованные данные.
+
+    Возвращает:
+    - int: Количество строк сводки.
+    """
+    factory_ids = Network.objects.filter(network_type='Factory').values_list('id', flat=True)
+    refreshed_at = timezone.now()
+    rollup = [
+        SubtreeDebtRollup(root_id=root_id, refreshed_at=refreshed_at, **row)
+        for root_id, rows in aggregate_subtree_debt(factory_ids).items()
+        for row in rows
+    ]
+    with transaction.atomic():
+        SubtreeDebtRollup.objects.all().delete()
+        SubtreeDebtRollup.objects.bulk_create(rollup)
+    return len(rollup)
+
+
+def get_debt_cube_grouping(dimensions):
+    """
+    Возвращает значение маски grouping строк NetworkDebtCube, группирующих сети ровно по заданным измерениям.
+
+    Аргументы:
+    - dimensions (iterable): Измерения из DEBT_DIMENSIONS.
+
+    Возвращает:
+    - int: Маска, в которой установлены биты измерений, не участвующих в группировке.
+    """
+    return sum(1 << (len(DEBT_DIMENSIONS) - 1 - position)
+               for position, dimension in enumerate(DEBT_DIMENSIONS) if dimension not in dimensions)
+
+
+def get_debt_breakdown(group_by, filters=None, ordering=None):
+    """
+    Возвращает агрегаты задолженности сетей, сгруппированных по заданным измерениям.
+
+    Строки читаются из материализованного представления NetworkDebtCube без обращения к таблице сетей.
+    Измерения фильтров добавляются к группировке: строка группы с единственным значением измерения содержит
+    те же агрегаты (включая медиану и перцентиль), что и группировка отфильтрованных сетей.
+
+    Аргументы:
+    - group_by (list): Измерения группировки из DEBT_DIMENSIONS. Пустой список — итоги по всем сетям.
+    - filters (dict): Необязательные значения измерений, по которым отбираются сети.
+    - ordering (list): Необязательная сортировка по измерениям и показателям. По умолчанию по измерениям группировки.
+
+    Возвращает:
+    - QuerySet: Строки со значениями измерений group_by и показателями DEBT_METRICS.
+    """
+    filters = filters or {}
+    dimensions = {*group_by, *filters}
+    return (NetworkDebtCube.objects.filter(grouping=get_debt_cube_grouping(dimensions), **filters)
+            .order_by(*(ordering or group_by), 'pk')
+            .values(*group_by, *DEBT_METRICS))
+
+
+def refresh_debt_cube():
+    """
+    Обновляет материализованное представление NetworkDebtCube по текущей задолженности сетей.
+
+    Обновление выполняется с параметром CONCURRENTLY: представление остаётся доступным для чтения, а строки,
+    агрегаты которых не изменились, не перезаписываются.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {NetworkDebtCube._meta.db_table}')
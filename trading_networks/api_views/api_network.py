@@ -1,18 +1,41 @@
-from django.db.models import Avg
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics
+from rest_framework.generics import get_object_or_404
 from rest_framework import status
 from rest_framework.filters import OrderingFilter
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from trading_networks.api_views.mixins import ConditionalGetMixin, EagerLoadingMixin, QueryBudgetMixin, \
+    ResponseCacheMixin, ValuesListMixin
+from trading_networks.analytics import DEBT_DIMENSIONS, aggregate_subtree_debt, get_cached_subtree_debt, \
+    get_debt_breakdown, summarize_subtree_debt
+from trading_networks.bulk import bulk_save_networks
+from trading_networks.cache import NETWORK_SCOPE, PRODUCT_SCOPE, get_cache_stats
+from trading_networks.export import CONTENT_TYPES, iter_serialized, render_export
+from trading_networks.hierarchy import HIERARCHY_RELATIONS
+from trading_networks.history import get_debt_history
 from trading_networks.models import Network
-from trading_networks.paginators import NetworkPaginator
-from trading_networks.permissions import IsActiveEmployee, IsSuperUser, IsCompanyEmployee
+from trading_networks.paginators import DebtBreakdownPaginator, NetworkPaginator
+from trading_networks.parsers import NDJSONParser
+from trading_networks.permissions import IsActiveEmployee, IsSuperUser, IsCompanyEmployee, is_network_employee
+from trading_networks.search import search_networks
+from trading_networks.serializers.analytics import DebtBreakdownQuerySerializer, DebtBreakdownSerializer, \
+    SubtreeDebtSerializer
+from trading_networks.serializers.debt_history import DebtHistoryBucketSerializer, DebtHistoryQuerySerializer
+from trading_networks.serializers.debt_statistics import DebtThresholdQuerySerializer
+from trading_networks.serializers.export import ExportQuerySerializer
 from trading_networks.serializers.network import NetworkSerializer
+from trading_networks.serializers.search import NetworkSearchResultSerializer, SearchQuerySerializer
+from trading_networks.statistics import get_debt_threshold_filter
 from trading_networks.tasks import send_qr_code_email
 from trading_networks.utils import generate_qr_code
+from users.authentication import FreshUserMixin
 
 
 class NetworkCreateAPIView(generics.CreateAPIView):
@@ -29,12 +52,51 @@ class NetworkCreateAPIView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated & IsActiveEmployee]
 
 
-class NetworkListAPIView(generics.ListAPIView):
+class NetworkBulkAPIView(APIView):
+    """
+    Представление для пакетного создания и изменения сетей.
+
+    Принимает список сетей в JSON или поток NDJSON (по одной сети в строке). Сети без pk создаются, сети с pk
+    изменяются; новые сети могут ссылаться на поставщиков из того же пакета полями ref и supplier_ref.
+    Ошибки проверки возвращаются для каждой сети отдельно и не прерывают обработку остальных сетей пакета.
+
+    Атрибуты:
+    - parser_classes: Парсеры тела запроса: JSON и NDJSON.
+    - permission_classes: Список классов разрешений; доступ разрешен только аутентифицированным и активным сотрудникам.
+    Изменять сеть могут только её сотрудники и суперпользователи.
+
+    Методы:
+    - post(request): Сохраняет пакет сетей и возвращает количество созданных, изменённых и ошибочных сетей
+    и результат для каждой сети.
+    """
+    parser_classes = [JSONParser, NDJSONParser]
+    permission_classes = [IsAuthenticated & IsActiveEmployee]
+
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            return Response({'error': 'Ожидается список сетей'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.NETWORK_BULK_MAX_ITEMS:
+            return Response({'error': f'Пакет не может содержать больше {settings.NETWORK_BULK_MAX_ITEMS} сетей'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        results = bulk_save_networks(items, request.user)
+        return Response({
+            'created': sum(result['status'] == 'created' for result in results),
+            'updated': sum(result['status'] == 'updated' for result in results),
+            'errors': sum(result['status'] == 'error' for result in results),
+            'results': results,
+        }, status=status.HTTP_200_OK)
+
+
+class NetworkListAPIView(EagerLoadingMixin, QueryBudgetMixin, ResponseCacheMixin, ConditionalGetMixin, ValuesListMixin,
+                         generics.ListAPIView):
     """
     Представление для отображения списка всех сетей.
 
     Позволяет аутентифицированным суперпользователям получать список всех доступных объектов сети,
-    с возможностью фильтрации и сортировки.
+    с возможностью фильтрации и сортировки. Поддерживает условные запросы (см. ConditionalGetMixin), ответы
+    кэшируются (см. ResponseCacheMixin).
 
     Атрибуты:
     - serializer_class: Класс сериализатора, используемого для представления данных сети.
@@ -42,34 +104,123 @@ class NetworkListAPIView(generics.ListAPIView):
     - pagination_class: Класс пагинации для управления количеством объектов на странице.
     - permission_classes: Список классов разрешений; доступ разрешен только аутентифицированным суперпользователям.
     - filter_backends: Список бэкендов фильтрации, используемых для обработки фильтрации и сортировки.
-    - filterset_fields: Поля, по которым разрешена фильтрация.
+    - filterset_fields: Поля, по которым разрешена фильтрация: страна и уровень в иерархии.
     - ordering_fields: Поля, по которым разрешена сортировка.
+    - query_budget: Максимальное количество SQL-запросов за один запрос к API (см. QueryBudgetMixin).
+    - cache_scope, cache_dependencies: Области кэша ответов (см. ResponseCacheMixin).
     """
     serializer_class = NetworkSerializer
-    queryset = Network.objects.all()
+    queryset = Network.objects.order_by('pk')
     pagination_class = NetworkPaginator
     permission_classes = [IsAuthenticated & IsSuperUser]
+    query_budget = 6
+    cache_scope = NETWORK_SCOPE
+    cache_dependencies = (PRODUCT_SCOPE,)
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ('country', 'network_level')
+    ordering_fields = ('network_level', 'debt')
+
+
+class NetworkEmployeeListAPIView(EagerLoadingMixin, QueryBudgetMixin, ConditionalGetMixin, ValuesListMixin,
+                                 generics.ListAPIView):
+    """
+    Представление для отображения списка сетей, сотрудником которых является пользователь.
+
+    Позволяет аутентифицированным и активным сотрудникам получать свои сети с теми же фильтрами и сортировкой,
+    что и список всех сетей. Сети выбираются условием EXISTS по индексу (пользователь, сеть) промежуточной таблицы
+    сотрудников. Для пользователей с большим количеством сетей подходит пагинация по курсору
+    (`?pagination=cursor`), при которой сети не подсчитываются. Поддерживает условные запросы
+    (см. ConditionalGetMixin); ответы зависят от пользователя и поэтому не кэшируются.
+
+    Атрибуты:
+    - serializer_class: Класс сериализатора, используемого для представления данных сети.
+    - pagination_class: Класс пагинации для управления количеством объектов на странице.
+    - permission_classes: Список классов разрешений; доступ разрешен только аутентифицированным и активным сотрудникам.
+    - filter_backends: Список бэкендов фильтрации, используемых для обработки фильтрации и сортировки.
+    - filterset_fields: Поля, по которым разрешена фильтрация: страна и уровень в иерархии.
+    - ordering_fields: Поля, по которым разрешена сортировка.
+    - query_budget: Максимальное количество SQL-запросов за один запрос к API (см. QueryBudgetMixin).
+
+    Методы:
+    - get_queryset(): Возвращает сети, сотрудником которых является пользователь запроса.
+    """
+    serializer_class = NetworkSerializer
+    pagination_class = NetworkPaginator
+    permission_classes = [IsAuthenticated & IsActiveEmployee]
+    query_budget = 6
     filter_backends = [DjangoFilterBackend, OrderingFilter]
-    filterset_fields = ('country',)
-    ordering_fields = ('network_level',)
+    filterset_fields = ('country', 'network_level')
+    ordering_fields = ('network_level', 'debt')
 
+    def get_queryset(self):
+        # Условие EXISTS вместо JOIN не размножает строки сетей, поэтому DISTINCT не требуется
+        memberships = Network.employees.through.objects.filter(network=OuterRef('pk'), user_id=self.request.user.pk)
+        return Network.objects.filter(Exists(memberships)).order_by('pk')
 
-class NetworkRetrieveAPIView(generics.RetrieveAPIView):
+
+class NetworkExportAPIView(generics.GenericAPIView):
+    """
+    Представление для потоковой выгрузки всех сетей в формате NDJSON или CSV.
+
+    Сети читаются курсором на стороне сервера блоками, связанные продукты и сотрудники загружаются отдельно для
+    каждого блока, а строки отправляются клиенту по мере чтения, поэтому расход памяти не зависит от количества сетей.
+    Представление сети совпадает с представлением в списке сетей, включая параметры `fields` и `expand`.
+
+    Атрибуты:
+    - serializer_class: Класс сериализатора, используемого для представления данных сети.
+    - queryset: QuerySet объектов Network, упорядоченных по ID.
+    - permission_classes: Список классов разрешений; доступ разрешен только аутентифицированным суперпользователям.
+    - filter_backends: Список бэкендов фильтрации.
+    - filterset_fields: Поля, по которым разрешена фильтрация, как в списке сетей.
+
+    Методы:
+    - get(request): Проверяет параметр export_format и возвращает потоковый ответ с выгрузкой.
+    """
+    serializer_class = NetworkSerializer
+    queryset = Network.objects.order_by('pk')
+    permission_classes = [IsAuthenticated & IsSuperUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ('country', 'network_level')
+
+    def get(self, request):
+        query_serializer = ExportQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        export_format = query_serializer.validated_data['export_format']
+
+        serializer = self.get_serializer()
+        queryset = serializer.setup_eager_loading(self.filter_queryset(self.get_queryset()))
+        rows = iter_serialized(queryset, serializer)
+        response = StreamingHttpResponse(render_export(rows, export_format, list(serializer.fields)),
+                                         content_type=CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = f'attachment; filename="networks.{export_format}"'
+        return response
+
+
+class NetworkRetrieveAPIView(EagerLoadingMixin, QueryBudgetMixin, ResponseCacheMixin, ConditionalGetMixin,
+                             generics.RetrieveAPIView):
     """
     Представление для отображения одной сети по её ID.
 
     Позволяет аутентифицированным пользователям с активным статусом и сотрудникам компании, а также суперпользователям
-    получать детальную информацию о конкретном объекте сети.
+    получать детальную информацию о конкретном объекте сети. Поддерживает условные запросы (см. ConditionalGetMixin),
+    ответы кэшируются (см. ResponseCacheMixin).
 
     Атрибуты:
     - serializer_class: Класс сериализатора, используемого для представления данных сети.
     - queryset: QuerySet объектов Network, среди которых производится поиск по ID.
     - permission_classes: Список классов разрешений; доступ разрешен аутентифицированным пользователям с активным статусом,
     сотрудникам компании и суперпользователям.
+    - query_budget: Максимальное количество SQL-запросов за один запрос к API (см. QueryBudgetMixin).
+    - cache_scope, cache_dependencies: Области кэша ответов (см. ResponseCacheMixin).
+    - cache_object_kwarg: Аргумент адреса с ID сети, права доступа к которой проверяются перед ответом из кэша.
     """
     serializer_class = NetworkSerializer
     queryset = Network.objects.all()
     permission_classes = [IsAuthenticated & IsActiveEmployee & IsCompanyEmployee | IsSuperUser]
+    query_budget = 6
+    cache_scope = NETWORK_SCOPE
+    cache_dependencies = (PRODUCT_SCOPE,)
+    cache_object_kwarg = 'pk'
 
 
 class NetworkUpdateAPIView(generics.UpdateAPIView):
@@ -90,12 +241,13 @@ class NetworkUpdateAPIView(generics.UpdateAPIView):
     permission_classes = [IsAuthenticated & IsActiveEmployee & IsCompanyEmployee | IsSuperUser]
 
 
-class NetworkDestroyAPIView(generics.DestroyAPIView):
+class NetworkDestroyAPIView(FreshUserMixin, generics.DestroyAPIView):
     """
     Представление для удаления сети.
 
     Позволяет аутентифицированным пользователям с активным статусом и сотрудникам компании, а также суперпользователям
-    удалять конкретный объект сети.
+    удалять конкретный объект сети. Удаление необратимо, поэтому пользователь загружается из базы данных
+    (см. FreshUserMixin).
 
     Атрибуты:
     - queryset: QuerySet объектов Network, среди которых производится поиск по ID.
@@ -106,63 +258,292 @@ class NetworkDestroyAPIView(generics.DestroyAPIView):
     permission_classes = [IsAuthenticated & IsActiveEmployee & IsCompanyEmployee | IsSuperUser]
 
 
-class NetworkDebtAverageAPIView(generics.ListAPIView):
+class NetworkDebtAverageAPIView(EagerLoadingMixin, QueryBudgetMixin, ResponseCacheMixin, ValuesListMixin,
+                                generics.ListAPIView):
     """
     Представление для отображения сетей с задолженностью выше средней.
 
     Позволяет аутентифицированным и активным сотрудникам получать список объектов сети, где задолженность превышает
-    среднюю задолженность всех сетей.
+    среднюю задолженность всех сетей. Средняя задолженность берётся из инкрементально поддерживаемой статистики,
+    поэтому сети выбираются одним запросом без агрегации всей таблицы. Параметр `threshold` позволяет выбрать
+    другой порог: перцентиль задолженности (`threshold=percentile&percentile=90`) или сети с наибольшей
+    задолженностью (`threshold=top&limit=100`). Ответы кэшируются (см. ResponseCacheMixin).
 
     Атрибуты:
     - serializer_class: Класс сериализатора, используемого для представления данных сети.
     - permission_classes: Список классов разрешений; доступ разрешен только аутентифицированным и активным сотрудникам.
     - pagination_class: Класс пагинации для управления количеством объектов на странице.
+    - query_budget: Максимальное количество SQL-запросов за один запрос к API (см. QueryBudgetMixin).
+    - cache_scope, cache_dependencies: Области кэша ответов (см. ResponseCacheMixin).
 
     Методы:
-    - get_queryset(): Вычисляет среднюю задолженность и фильтрует сети, оставляя те, у которых задолженность больше средней.
+    - get_queryset(): Проверяет параметры порога и фильтрует сети, оставляя те, у которых задолженность выше порога.
     """
     serializer_class = NetworkSerializer
     permission_classes = [IsAuthenticated & IsActiveEmployee]
+    query_budget = 5
     pagination_class = NetworkPaginator
+    cache_scope = NETWORK_SCOPE
+    cache_dependencies = (PRODUCT_SCOPE,)
 
     def get_queryset(self):
-        # Вычисляем среднюю задолженность
-        average_debt = Network.objects.aggregate(Avg('debt'))['debt__avg'] or 0
-        # Фильтруем сети с задолженностью выше среднего
-        return Network.objects.filter(debt__gt=average_debt)
+        query_serializer = DebtThresholdQuerySerializer(data=self.request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        # Порог вычисляется подзапросом к статистике задолженности в том же запросе, что и выборка сетей
+        return Network.objects.filter(**get_debt_threshold_filter(**query_serializer.validated_data)).order_by('pk')
 
 
-class NetworkByProductAPIView(generics.ListAPIView):
+class NetworkByProductAPIView(EagerLoadingMixin, QueryBudgetMixin, ResponseCacheMixin, ConditionalGetMixin,
+                              ValuesListMixin, generics.ListAPIView):
     """
     Представление для отображения сетей, связанных с определённым продуктом.
 
     Позволяет аутентифицированным и активным сотрудникам получать список объектов сети, которые связаны
-    с указанным продуктом.
+    с указанным продуктом. Поддерживает условные запросы (см. ConditionalGetMixin), ответы кэшируются
+    (см. ResponseCacheMixin).
 
     Атрибуты:
     - serializer_class: Класс сериализатора, используемого для представления данных сети.
     - permission_classes: Список классов разрешений; доступ разрешен только аутентифицированным и активным сотрудникам.
     - pagination_class: Класс пагинации для управления количеством объектов на странице.
+    - query_budget: Максимальное количество SQL-запросов за один запрос к API (см. QueryBudgetMixin).
+    - cache_scope, cache_dependencies: Области кэша ответов (см. ResponseCacheMixin).
 
     Методы:
     - get_queryset(): Фильтрует сети по ID указанного продукта, возвращая только те, которые связаны с ним.
     """
     serializer_class = NetworkSerializer
     permission_classes = [IsAuthenticated & IsActiveEmployee]
+    query_budget = 6
     pagination_class = NetworkPaginator
+    cache_scope = NETWORK_SCOPE
+    cache_dependencies = (PRODUCT_SCOPE,)
 
     def get_queryset(self):
         product_id = self.kwargs.get('product_id')
-        # Фильтруем сети, связанные с указанным продуктом
-        return Network.objects.filter(products__id=product_id)
+        # Фильтруем сети, связанные с указанным продуктом. Условие EXISTS вместо JOIN не размножает строки сетей,
+        # поэтому DISTINCT не требуется
+        offers = Network.products.through.objects.filter(network=OuterRef('pk'), product_id=product_id)
+        return Network.objects.filter(Exists(offers)).order_by('pk')
+
+
+class NetworkSearchAPIView(generics.GenericAPIView):
+    """
+    Представление для поиска сетей по названию и адресу.
+
+    Возвращает сети, упорядоченные по убыванию сходства со строкой поиска. Поиск выполняется по индексам триграмм
+    и устойчив к опечаткам, поэтому подходит для автодополнения.
+
+    Атрибуты:
+    - serializer_class: Класс сериализатора, используемого для представления результатов поиска.
+    - permission_classes: Список классов разрешений; доступ разрешен только аутентифицированным и активным сотрудникам.
+
+    Методы:
+    - get(request): Проверяет параметры q и limit и возвращает найденные сети.
+    """
+    serializer_class = NetworkSearchResultSerializer
+    permission_classes = [IsAuthenticated & IsActiveEmployee]
+
+    def get(self, request):
+        query_serializer = SearchQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        params = query_serializer.validated_data
+
+        networks = search_networks(params['q'], Network.objects.only(
+            'pk', 'network_type', 'network_name', 'country', 'city', 'street'))
+        return Response(self.get_serializer(networks[:params['limit']], many=True).data)
+
+
+class NetworkHierarchyAPIView(EagerLoadingMixin, QueryBudgetMixin, ResponseCacheMixin, ValuesListMixin,
+                              generics.ListAPIView):
+    """
+    Базовое представление для списков сетей, связанных с заданной сетью в иерархии поставщиков.
+
+    Перед построением списка проверяет права доступа к заданной сети так же, как представление детальной информации.
+    Связанные сети выбираются одним запросом по материализованному пути в иерархии. Ответы кэшируются
+    (см. ResponseCacheMixin).
+
+    Атрибуты:
+    - serializer_class: Класс сериализатора, используемого для представления данных сети.
+    - pagination_class: Класс пагинации для управления количеством объектов на странице.
+    - permission_classes: Список классов разрешений; доступ разрешен аутентифицированным пользователям с активным статусом,
+    сотрудникам компании и суперпользователям.
+    - query_budget: Максимальное количество SQL-запросов за один запрос к API (см. QueryBudgetMixin).
+    - cache_scope, cache_dependencies: Области кэша ответов (см. ResponseCacheMixin).
+    - cache_object_kwarg: Аргумент адреса с ID сети, права доступа к которой проверяются перед ответом из кэша.
+    - relation: Связь с заданной сетью, по которой выбираются сети: 'ancestors' — поставщики, 'descendants' — потомки
+    (см. HIERARCHY_RELATIONS).
+
+    Методы:
+    - get_network(): Возвращает заданную сеть, проверив права доступа к ней.
+    - get_queryset(): Возвращает сети, связанные с заданной сетью связью relation, по уровню в иерархии.
+    """
+    serializer_class = NetworkSerializer
+    pagination_class = NetworkPaginator
+    permission_classes = [IsAuthenticated & IsActiveEmployee & IsCompanyEmployee | IsSuperUser]
+    query_budget = 7
+    cache_scope = NETWORK_SCOPE
+    cache_dependencies = (PRODUCT_SCOPE,)
+    cache_object_kwarg = 'pk'
+    relation = 'descendants'
+
+    def get_network(self):
+        network = get_object_or_404(Network, pk=self.kwargs['pk'])
+        self.check_object_permissions(self.request, network)
+        return network
+
+    def get_queryset(self):
+        return HIERARCHY_RELATIONS[self.relation](self.get_network()).order_by('network_level', 'pk')
+
+
+class NetworkAncestorsAPIView(NetworkHierarchyAPIView):
+    """
+    Представление для отображения цепочки поставщиков сети от корня иерархии (завода) до прямого поставщика.
+    """
+    relation = 'ancestors'
+
+
+class NetworkDescendantsAPIView(NetworkHierarchyAPIView):
+    """
+    Представление для отображения всех сетей, находящихся ниже заданной сети в иерархии поставщиков.
+    """
+    relation = 'descendants'
+
+
+class NetworkSubtreeDebtAPIView(generics.GenericAPIView):
+    """
+    Представление со статистикой задолженности цепочек поставок заводов.
 
+    Для каждого завода возвращает суммарную, среднюю и максимальную задолженность всех сетей его поддерева
+    с разбивкой по уровню в иерархии и типу сети. Агрегаты страницы заводов вычисляются в базе данных одним
+    запросом по материализованным путям. С параметром `cached=true` данные читаются из сводки, которую
+    пересчитывают задачи задолженности, что подходит для частого опроса дашбордами.
 
-class GenerateQrCodeAPIView(APIView):
+    Атрибуты:
+    - serializer_class: Класс сериализатора, используемого для представления сводки.
+    - queryset: QuerySet заводов, являющихся корнями поддеревьев.
+    - pagination_class: Класс пагинации для управления количеством заводов на странице.
+    - permission_classes: Список классов разрешений; доступ разрешен только аутентифицированным и активным сотрудникам.
+
+    Методы:
+    - get(request): Возвращает страницу сводок задолженности. Параметр `root` ограничивает выдачу одним заводом.
+    """
+    serializer_class = SubtreeDebtSerializer
+    queryset = Network.objects.filter(network_type='Factory').order_by('pk')
+    pagination_class = NetworkPaginator
+    permission_classes = [IsAuthenticated & IsActiveEmployee]
+
+    def get(self, request):
+        roots = self.get_queryset()
+        root_id = request.query_params.get('root')
+        if root_id:
+            roots = roots.filter(pk=root_id) if root_id.isdigit() else roots.none()
+        page = self.paginate_queryset(roots.only('id', 'network_name'))
+
+        root_ids = [root.pk for root in page]
+        if request.query_params.get('cached') == 'true':
+            breakdowns = get_cached_subtree_debt(root_ids)
+        else:
+            breakdowns = aggregate_subtree_debt(root_ids)
+
+        data = [
+            {'root': root.pk, 'network_name': root.network_name, 'breakdown': breakdowns.get(root.pk, []),
+             **summarize_subtree_debt(breakdowns.get(root.pk, []))}
+            for root in page
+        ]
+        return self.get_paginated_response(self.get_serializer(data, many=True).data)
+
+
+class NetworkDebtBreakdownAPIView(generics.GenericAPIView):
+    """
+    Представление с агрегатами задолженности сетей по стране, городу, типу сети и уровню в иерархии.
+
+    Параметр `group_by` задаёт произвольный набор измерений группировки (например, `group_by=country,network_type`),
+    параметры country, city, network_type и network_level отбирают сети. Для каждой группы возвращаются количество
+    сетей, суммарная, средняя, минимальная и максимальная задолженность, медиана и 90-й перцентиль. Данные
+    читаются из материализованного представления, которое обновляется после каждого запуска задач задолженности,
+    поэтому запросы не обращаются к таблице сетей.
+
+    Атрибуты:
+    - serializer_class: Класс сериализатора, используемого для представления строк агрегатов.
+    - pagination_class: Класс пагинации для управления количеством строк на странице.
+    - permission_classes: Список классов разрешений; доступ разрешен только аутентифицированным и активным сотрудникам.
+
+    Методы:
+    - get(request): Проверяет параметры группировки и возвращает страницу агрегатов.
+    """
+    serializer_class = DebtBreakdownSerializer
+    pagination_class = DebtBreakdownPaginator
+    permission_classes = [IsAuthenticated & IsActiveEmployee]
+
+    def get(self, request):
+        query_serializer = DebtBreakdownQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        params = query_serializer.validated_data
+
+        filters = {dimension: params[dimension] for dimension in DEBT_DIMENSIONS if dimension in params}
+        ordering = [params['ordering']] if 'ordering' in params else None
+        page = self.paginate_queryset(get_debt_breakdown(params['group_by'], filters, ordering))
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+
+class NetworkDebtHistoryAPIView(generics.GenericAPIView):
+    """
+    Представление для получения истории задолженности сети.
+
+    Возвращает историю задолженности за произвольный диапазон, сжатую на стороне сервера до заданного количества
+    интервалов с минимальным, максимальным и средним значением в каждом, поэтому длинные диапазоны остаются
+    дешёвыми для получения.
+
+    Атрибуты:
+    - queryset: QuerySet объектов Network, среди которых производится поиск по ID.
+    - permission_classes: Список классов разрешений; доступ разрешен аутентифицированным пользователям с активным статусом,
+    сотрудникам компании и суперпользователям.
+
+    Методы:
+    - get(request, pk): Проверяет параметры date_from, date_to и buckets и возвращает интервалы истории.
+    """
+    queryset = Network.objects.all()
+    permission_classes = [IsAuthenticated & IsActiveEmployee & IsCompanyEmployee | IsSuperUser]
+
+    def get(self, request, pk):
+        network = self.get_object()
+        query_serializer = DebtHistoryQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        params = query_serializer.validated_data
+
+        buckets = get_debt_history(network, params['date_from'], params['date_to'], params['buckets'])
+        return Response({
+            'network': network.pk,
+            'date_from': query_serializer.fields['date_from'].to_representation(params['date_from']),
+            'date_to': query_serializer.fields['date_to'].to_representation(params['date_to']),
+            'buckets': DebtHistoryBucketSerializer(buckets, many=True).data,
+        })
+
+
+class ResponseCacheStatsAPIView(APIView):
+    """
+    Представление со счётчиками попаданий и промахов кэша ответов по областям (сети и продукты).
+
+    Атрибуты:
+    - permission_classes: Список классов разрешений; доступ разрешен только аутентифицированным суперпользователям.
+
+    Методы:
+    - get(request): Возвращает количество попаданий, промахов и долю попаданий для каждой области кэша.
+    """
+    permission_classes = [IsAuthenticated & IsSuperUser]
+
+    def get(self, request):
+        return Response({'enabled': settings.RESPONSE_CACHE_ENABLED, 'scopes': get_cache_stats()})
+
+
+class GenerateQrCodeAPIView(FreshUserMixin, APIView):
     """
     Представление для генерации QR-кода для определённой сети.
 
     Позволяет аутентифицированным активным сотрудникам компании генерировать QR-код для сети и отправлять его
-    на указанный email.
+    на указанный email. Email берётся из данных пользователя, поэтому пользователь загружается из базы данных
+    (см. FreshUserMixin).
 
     Атрибуты:
     - permission_classes: Список классов разрешений; доступ разрешен только аутентифицированным, активным сотрудникам компании.
@@ -175,10 +556,9 @@ class GenerateQrCodeAPIView(APIView):
     def get(self, request, network_id):
         try:
             network = Network.objects.get(id=network_id)
-
-            if not IsCompanyEmployee().has_object_permission(request, self, network):
-                return Response({'error': 'Вы не являетесь сотрудником компании, данные которой хотите получить!'},
-                                status=status.HTTP_403_FORBIDDEN)
+            # Составное разрешение теряет сообщение IsCompanyEmployee, поэтому членство проверяется напрямую
+            if not is_network_employee(request, network.pk):
+                return Response({'error': IsCompanyEmployee.message}, status=status.HTTP_403_FORBIDDEN)
 
             qr_code_bytes = generate_qr_code(network)
             send_qr_code_email.delay(request.user.email, qr_code_bytes)
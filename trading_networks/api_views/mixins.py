@@ -0,0 +1,263 @@
+import hashlib
+import logging
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework.generics import get_object_or_404
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+
+from trading_networks.cache import KEY_PREFIX, get_cache_entry, get_list_key, get_object_key, get_scope_key, \
+    get_versions, store_cache_entry
+from trading_networks.renderers import FastJSONRenderer
+from trading_networks.serializers.values import ValuesRepresentation
+
+logger = logging.getLogger(__name__)
+
+CACHED_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control')
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Исключение, возникающее, когда представление выполнило больше SQL-запросов, чем допускает его бюджет.
+    """
+
+
+class QueryCounter:
+    """
+    Обёртка выполнения SQL-запросов (connection.execute_wrapper), подсчитывающая количество запросов.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def get_expanded_fields(view):
+    """
+    Возвращает поля, встроенные в ответ представления параметром `expand` (см. SparseFieldsetMixin).
+    """
+    return getattr(view.get_serializer(), 'get_expanded_fields', list)()
+
+
+class EagerLoadingMixin:
+    """
+    Миксин, загружающий связанные объекты вместе с основным QuerySet представления.
+
+    Если у сериализатора есть метод setup_eager_loading(queryset), он применяется к QuerySet после фильтрации
+    и сортировки, поэтому страница списка или объект обходятся постоянным количеством запросов независимо
+    от количества связанных объектов. Сериализатор создаётся с контекстом запроса, поэтому метод может учитывать
+    запрошенные поля. Метод применяется и к представлениям с собственным get_queryset().
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        setup_eager_loading = getattr(self.get_serializer(), 'setup_eager_loading', None)
+        return setup_eager_loading(queryset) if setup_eager_loading else queryset
+
+
+class QueryBudgetMixin:
+    """
+    Миксин, ограничивающий количество SQL-запросов, выполняемых представлением за один запрос к API.
+
+    Бюджет задаётся атрибутом query_budget и проверяется тестами (QueryBudgetTests), поэтому появление N+1
+    запросов приводит к ошибке CI. Для отладки бюджет можно проверять и в запросах к API, включив настройку
+    QUERY_BUDGET_ENABLED (по умолчанию выключена): при превышении бюджета в журнал пишется предупреждение,
+    а с настройкой QUERY_BUDGET_STRICT возбуждается QueryBudgetExceeded.
+
+    Атрибуты:
+    - query_budget (int): Максимальное количество SQL-запросов. None отключает проверку.
+    """
+    query_budget = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.query_budget is None or not settings.QUERY_BUDGET_ENABLED:
+            return super().dispatch(request, *args, **kwargs)
+
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = super().dispatch(request, *args, **kwargs)
+
+        if counter.count > self.query_budget:
+            message = (f'{self.__class__.__name__} выполнило {counter.count} SQL-запросов '
+                       f'при бюджете {self.query_budget}')
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
+class ValuesListMixin:
+    """
+    Миксин списка, формирующий страницу по строкам QuerySet.values() вместо сериализации объектов модели.
+
+    Ответ совпадает с ответом сериализатора представления (см. ValuesRepresentation), включая выбор полей
+    параметром `fields`, и отрисовывается рендерером FastJSONRenderer. Если сериализатор содержит поля, которые
+    нельзя получить из столбцов (например, встроенные параметром `expand` объекты), используется обычный путь
+    сериализации.
+
+    Атрибуты:
+    - renderer_classes: Рендереры ответа: FastJSONRenderer и просматриваемый API.
+    """
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def list(self, request, *args, **kwargs):
+        representation = ValuesRepresentation.from_serializer(self.get_serializer())
+        if representation is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        ordering = [field.lstrip('-') for field in queryset.query.order_by if isinstance(field, str)]
+        rows = queryset.values(*dict.fromkeys(representation.columns + ordering))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(representation.represent(list(page)))
+        return Response(representation.represent(list(rows)))
+
+
+class ConditionalGetMixin:
+    """
+    Миксин, отвечающий на условные GET-запросы (If-None-Match, If-Modified-Since) статусом 304 без сериализации.
+
+    Версия ответа определяется одним запросом: для объекта — временем изменения, прочитанным по первичному ключу
+    после проверки прав доступа к объекту, для списка — наибольшим временем изменения и количеством объектов после
+    фильтрации. Если у клиента уже есть эта версия, возвращается 304 без загрузки и сериализации объектов, иначе
+    ответ формируется обычным образом. Ответ дополняется заголовками ETag и Last-Modified, а заголовок
+    Cache-Control требует проверки версии при каждом использовании. Встроенные объекты (`expand`) меняются
+    независимо от основных, поэтому такие ответы отдаются без проверки версии.
+
+    Атрибуты:
+    - version_field (str): Поле модели со временем последнего изменения объекта.
+
+    Методы:
+    - get_object_version(): Возвращает время изменения объекта и количество объектов (1).
+    - get_list_version(): Возвращает наибольшее время изменения и количество объектов списка.
+    """
+    version_field = 'updated_at'
+
+    def supports_conditional_get(self):
+        return not get_expanded_fields(self)
+
+    def get_object_version(self):
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None).only('pk', self.version_field)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        instance = get_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        self.check_object_permissions(self.request, instance)
+        return getattr(instance, self.version_field), 1
+
+    def get_list_version(self):
+        version = self.filter_queryset(self.get_queryset()).aggregate(last_modified=Max(self.version_field),
+                                                                      count=Count('pk'))
+        return version['last_modified'], version['count']
+
+    def get_validators(self, last_modified, count):
+        # Версия зависит и от формата ответа, поэтому JSON и просматриваемый API получают разные ETag
+        key = f'{self.request.accepted_renderer.format}:{count}:{last_modified.isoformat() if last_modified else ""}'
+        etag = quote_etag(hashlib.md5(key.encode(), usedforsecurity=False).hexdigest())
+        return etag, int(last_modified.timestamp()) if last_modified else None
+
+    def set_validators(self, response, etag, last_modified):
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.supports_conditional_get():
+            return super().retrieve(request, *args, **kwargs)
+        etag, last_modified = self.get_validators(*self.get_object_version())
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        return self.set_validators(response or super().retrieve(request, *args, **kwargs), etag, last_modified)
+
+    def list(self, request, *args, **kwargs):
+        if not self.supports_conditional_get():
+            return super().list(request, *args, **kwargs)
+        etag, last_modified = self.get_validators(*self.get_list_version())
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        return self.set_validators(response or super().list(request, *args, **kwargs), etag, last_modified)
+
+
+class ResponseCacheMixin:
+    """
+    Миксин, кэширующий ответы списков и детальной информации в кэше Django (Redis).
+
+    Ключ ответа строится из адреса запроса, формата ответа и версий данных, от которых зависит ответ: ответ
+    с объектом зависит от версии объекта и версии всей области, список — от версии списков области, а ответ
+    со встроенными объектами (`expand`) — ещё и от версий списков зависимых областей. Версии меняются при
+    изменении данных (см. trading_networks.cache), поэтому устаревший ответ никогда не возвращается, а точечное
+    изменение объекта не сбрасывает ответы с другими объектами. Одновременные промахи по одному ключу формируют
+    ответ один раз (см. get_cache_entry).
+
+    Сохраняются только успешные ответы вместе с заголовками ETag и Last-Modified, по которым ответ из кэша
+    проверяется на условные запросы (см. ConditionalGetMixin). Права доступа к представлению проверяются до
+    обращения к кэшу, а права доступа к объекту из cache_object_kwarg проверяются по объекту без загрузки его
+    полей. Кэш включается настройкой RESPONSE_CACHE_ENABLED.
+
+    Атрибуты:
+    - cache_scope (str): Область кэша, к которой относятся объекты представления.
+    - cache_dependencies (tuple): Области кэша встроенных объектов.
+    - cache_object_kwarg (str): Аргумент адреса с первичным ключом объекта, права доступа к которому проверяются
+    перед ответом из кэша. None, если у представления нет прав доступа к объекту.
+    """
+    cache_scope = None
+    cache_dependencies = ()
+    cache_object_kwarg = None
+
+    def get_list_version_keys(self):
+        scopes = (self.cache_scope, *self.cache_dependencies) if get_expanded_fields(self) else (self.cache_scope,)
+        return [get_list_key(scope) for scope in scopes]
+
+    def get_object_version_keys(self):
+        pk = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        keys = [get_scope_key(self.cache_scope), get_object_key(self.cache_scope, pk)]
+        if get_expanded_fields(self):
+            keys.extend(self.get_list_version_keys())
+        return keys
+
+    def get_response_cache_key(self, version_keys):
+        variant = ':'.join([self.request.accepted_renderer.format, self.request.build_absolute_uri(),
+                            *get_versions(version_keys)])
+        return f'{KEY_PREFIX}:{self.cache_scope}:{hashlib.md5(variant.encode(), usedforsecurity=False).hexdigest()}'
+
+    def check_cached_object_permissions(self):
+        if self.cache_object_kwarg is not None:
+            model = self.get_serializer_class().Meta.model
+            self.check_object_permissions(self.request, model(pk=self.kwargs[self.cache_object_kwarg]))
+
+    def get_cached_response(self, version_keys, handler, request, *args, **kwargs):
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return handler(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(version_keys)
+        entry, locked = get_cache_entry(self.cache_scope, key)
+        if entry is not None:
+            self.check_cached_object_permissions()
+            response = Response(entry['data'], headers=entry['headers'])
+            return get_conditional_response(request, etag=entry['headers'].get('ETag'),
+                                            last_modified=parse_http_date_safe(entry['headers'].get('Last-Modified')),
+                                            response=response)
+
+        response = None
+        try:
+            response = handler(request, *args, **kwargs)
+        finally:
+            if isinstance(response, Response) and response.status_code == 200:
+                entry = {'data': response.data, 'headers': {
+                    header: response[header] for header in CACHED_HEADERS if header in response
+                }}
+            store_cache_entry(key, entry, locked)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(self.get_list_version_keys(), super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(self.get_object_version_keys(), super().retrieve, request, *args, **kwargs)
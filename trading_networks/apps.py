@@ -5,3 +5,6 @@ class TradingNetworksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'trading_networks'
     verbose_name = 'Торговые сети'
+
+    def ready(self):
+        import trading_networks.signals  # noqa: F401
@@ -0,0 +1,350 @@
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.exceptions import PermissionDenied
+
+from products.models import Product
+from trading_networks.cache import NETWORK_SCOPE, invalidate_employee_networks, invalidate_objects, invalidate_scope
+from trading_networks.debt import DEFAULT_CHUNK_SIZE
+from trading_networks.graph import invalidate_hierarchy_graph
+from trading_networks.hierarchy import FACTORY_TYPE, build_hierarchy_path, get_network_level, sync_hierarchy
+from trading_networks.models import DebtTransaction, Network
+from trading_networks.serializers.bulk import NetworkBulkItemSerializer
+from trading_networks.statistics import apply_debt_statistics_change
+from trading_networks.validators import MAX_NETWORK_LEVEL, MAX_NETWORK_LEVEL_MESSAGE
+from users.models import User
+
+M2M_FIELDS = ('products', 'employees')
+BATCH_FIELDS = ('ref', 'supplier_ref')
+
+CREATED = 'created'
+UPDATED = 'updated'
+ERROR = 'error'
+
+
+def parse_ids(value):
+    """
+    Возвращает целые идентификаторы из значения поля пакета (числа или строки из цифр), пропуская остальное.
+    """
+    values = value if isinstance(value, list) else [value]
+    return {int(item) for item in values
+            if (isinstance(item, int) and not isinstance(item, bool)) or (isinstance(item, str) and item.isdigit())}
+
+
+def load_bulk_objects(items):
+    """
+    Загружает все объекты, на которые ссылаются сети пакета, тремя запросами.
+
+    Аргументы:
+    - items (list): Словари сетей пакета.
+
+    Возвращает:
+    - dict: Словарь {модель: {pk: объект}} для контекста NetworkBulkItemSerializer.
+    """
+    network_ids, product_ids, user_ids = set(), set(), set()
+    for item in items:
+        network_ids |= parse_ids(item.get('pk')) | parse_ids(item.get('supplier'))
+        product_ids |= parse_ids(item.get('products'))
+        user_ids |= parse_ids(item.get('employees'))
+    return {
+        Network: Network.objects.select_related('supplier').in_bulk(network_ids),
+        Product: Product.objects.only('pk').in_bulk(product_ids),
+        User: User.objects.only('pk').in_bulk(user_ids),
+    }
+
+
+def allocate_network_ids(count):
+    """
+    Резервирует идентификаторы для новых сетей одним запросом к последовательности таблицы сетей.
+
+    Идентификаторы известны до вставки, поэтому пути в иерархии новых сетей вычисляются заранее и сети
+    вставляются одним запросом bulk_create без последующего обновления путей.
+    """
+    if not count:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+                       [Network._meta.db_table, count])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def resolve_batch_levels(creates, errors):
+    """
+    Вычисляет уровни новых сетей пакета в топологическом порядке ссылок на поставщиков.
+
+    Каждая цепочка ссылок проходится один раз от сети к поставщику, после чего уровни вычисляются в обратном
+    порядке. Сети с неизвестной ссылкой, циклом ссылок, поставщиком с ошибкой или превышением максимального
+    уровня получают ошибку в errors.
+
+    Аргументы:
+    - creates (dict): Проверенные данные новых сетей {номер в пакете: данные}.
+    - errors (dict): Ошибки сетей пакета {номер в пакете: ошибки}; дополняется.
+
+    Возвращает:
+    - dict: Уровни сетей {номер в пакете: уровень}.
+    """
+    refs = {}
+    for index, data in creates.items():
+        if 'ref' not in data:
+            continue
+        if data['ref'] in refs:
+            errors[index] = {'ref': [f'Ссылка "{data["ref"]}" уже используется в пакете']}
+        else:
+            refs[data['ref']] = index
+
+    levels = {}
+    for start in creates:
+        chain, node = [], start
+        while node not in levels and node not in errors:
+            if node in chain:
+                for member in chain[chain.index(node):]:
+                    errors[member] = {'supplier_ref': ['Ссылки на поставщиков образуют цикл']}
+                break
+            chain.append(node)
+            supplier_ref = creates[node].get('supplier_ref')
+            if supplier_ref is None:
+                break
+            if supplier_ref not in refs:
+                errors[node] = {'supplier_ref': [f'Сеть со ссылкой "{supplier_ref}" отсутствует в пакете']}
+                break
+            node = refs[supplier_ref]
+
+        for index in reversed(chain):
+            if index in errors:
+                continue
+            data = creates[index]
+            if 'supplier_ref' in data:
+                supplier_index = refs[data['supplier_ref']]
+                if supplier_index in errors:
+                    errors[index] = {'supplier_ref': ['Поставщик не создан из-за ошибок']}
+                    continue
+                supplier_level = levels[supplier_index]
+            else:
+                supplier_level = data['supplier'].network_level if data.get('supplier') else None
+            if supplier_level is not None and supplier_level >= MAX_NETWORK_LEVEL:
+                errors[index] = {'supplier_ref': [MAX_NETWORK_LEVEL_MESSAGE]}
+                continue
+            levels[index] = get_network_level(data['network_type'], supplier_level)
+    return levels
+
+
+def find_moving_conflicts(moved, suppliers):
+    """
+    Находит сети, которые затрагиваются сразу несколькими переносами поддеревьев в одном пакете.
+
+    Проверка уровней и циклов каждого переноса выполняется по иерархии до пакета, поэтому перенос сети внутри
+    другого переносимого поддерева или под сеть из него, как и создание сети под такой сетью, отклоняется.
+
+    Аргументы:
+    - moved (dict): Переносимые сети {номер в пакете: сеть до изменения}.
+    - suppliers (dict): Поставщики сетей после изменения {номер в пакете: поставщик или None}, включая новые сети.
+
+    Возвращает:
+    - set: Номера сетей пакета с конфликтом.
+    """
+    moved_ids = {network.pk: index for index, network in moved.items()}
+    conflicts = set()
+    for index, network in moved.items():
+        ancestors = moved_ids.keys() & set(network.get_ancestor_ids())
+        if ancestors:
+            conflicts |= {index, *(moved_ids[network_id] for network_id in ancestors)}
+    for index, supplier in suppliers.items():
+        if supplier and moved_ids.keys() & {*supplier.get_ancestor_ids(), supplier.pk}:
+            conflicts.add(index)
+    return conflicts
+
+
+def create_networks(creates, levels, batch_size):
+    """
+    Вставляет новые сети пакета вместе со связями, операциями журнала и изменением статистики задолженности
+    и сбрасывает кэшированные списки сетей.
+
+    Аргументы:
+    - creates (dict): Проверенные данные новых сетей {номер в пакете: данные}.
+    - levels (dict): Уровни новых сетей {номер в пакете: уровень}.
+    - batch_size (int): Размер пакета вставки.
+
+    Возвращает:
+    - dict: Идентификаторы созданных сетей {номер в пакете: pk}.
+    """
+    # Уровень поставщика из пакета меньше уровня сети, поэтому при обходе по уровням путь поставщика уже известен
+    order = sorted(creates, key=lambda index: levels[index])
+    created_ids = dict(zip(order, allocate_network_ids(len(order))))
+    refs = {creates[index]['ref']: index for index in order if 'ref' in creates[index]}
+    paths, networks = {}, []
+    for index in order:
+        data = {name: value for name, value in creates[index].items() if name not in M2M_FIELDS + BATCH_FIELDS}
+        supplier_index = refs.get(creates[index].get('supplier_ref'))
+        if supplier_index is not None:
+            data['supplier_id'] = created_ids[supplier_index]
+            supplier_path = paths[supplier_index]
+        else:
+            supplier_path = data['supplier'].hierarchy_path if data.get('supplier') else None
+        if data['network_type'] == FACTORY_TYPE:
+            data['debt'] = 0
+        paths[index] = build_hierarchy_path(created_ids[index], supplier_path)
+        networks.append(Network(id=created_ids[index], network_level=levels[index], hierarchy_path=paths[index],
+                                **data))
+
+    Network.objects.bulk_create(networks, batch_size=batch_size)
+    add_m2m_links({created_ids[index]: creates[index] for index in order}, batch_size)
+    DebtTransaction.objects.bulk_create([
+        DebtTransaction(network_id=network.pk, amount=network.debt, source=DebtTransaction.MANUAL, is_applied=True)
+        for network in networks if network.debt
+    ], batch_size=batch_size)
+    apply_debt_statistics_change(sum((network.debt for network in networks), Decimal('0')), len(networks))
+    invalidate_objects(NETWORK_SCOPE, created_ids.values())
+    return created_ids
+
+
+def update_networks(updates, moved, batch_size):
+    """
+    Сохраняет изменения существующих сетей пакета.
+
+    Поля сетей и время их изменения обновляются одним запросом bulk_update, связи с продуктами и сотрудниками
+    заменяются пакетно, а сети с новым поставщиком или типом переносятся вместе с поддеревом. Кэшированные ответы
+    с изменёнными сетями (а при переносе поддерева — все ответы с сетями) и кэш сетей прежних сотрудников
+    сбрасываются.
+
+    Аргументы:
+    - updates (dict): Изменяемые сети {номер в пакете: (сеть, проверенные данные)}.
+    - moved (list): Сети, у которых изменился поставщик или тип.
+    - batch_size (int): Размер пакета запроса.
+    """
+    # bulk_update не заполняет поля auto_now, поэтому время изменения устанавливается явно
+    updated_at = timezone.now()
+    fields = {'updated_at'}
+    for instance, data in updates.values():
+        instance.updated_at = updated_at
+        for name, value in data.items():
+            if name not in M2M_FIELDS + BATCH_FIELDS:
+                setattr(instance, name, value)
+                fields.add(name)
+    instances = [instance for instance, data in updates.values()]
+    if instances:
+        Network.objects.bulk_update(instances, sorted(fields), batch_size=batch_size)
+    for field_name in M2M_FIELDS:
+        replaced = [instance.pk for instance, data in updates.values() if field_name in data]
+        links = getattr(Network, field_name).through.objects.filter(network_id__in=replaced)
+        if field_name == 'employees':
+            invalidate_employee_networks(links.values_list('user_id', flat=True))
+        links.delete()
+    add_m2m_links({instance.pk: data for instance, data in updates.values()}, batch_size)
+    for instance in moved:
+        sync_hierarchy(instance)
+    invalidate_objects(NETWORK_SCOPE, [instance.pk for instance in instances])
+    if moved:
+        invalidate_scope(NETWORK_SCOPE)
+
+
+def add_m2m_links(data_by_id, batch_size):
+    """
+    Добавляет связи сетей с продуктами и сотрудниками пакетной вставкой в промежуточные таблицы.
+
+    Пакетная вставка не вызывает сигнал m2m_changed, поэтому кэш сетей добавленных сотрудников сбрасывается здесь же.
+
+    Аргументы:
+    - data_by_id (dict): Проверенные данные сетей {pk сети: данные}.
+    - batch_size (int): Размер пакета вставки.
+    """
+    for field_name in M2M_FIELDS:
+        field = Network._meta.get_field(field_name)
+        through = field.remote_field.through
+        target_column = f'{field.m2m_reverse_field_name()}_id'
+        through.objects.bulk_create([
+            through(network_id=network_id, **{target_column: related.pk})
+            for network_id, data in data_by_id.items() for related in data.get(field_name, [])
+        ], batch_size=batch_size, ignore_conflicts=True)
+    invalidate_employee_networks(user.pk for data in data_by_id.values() for user in data.get('employees', []))
+
+
+def bulk_save_networks(items, user, batch_size=DEFAULT_CHUNK_SIZE):
+    """
+    Создаёт и изменяет сети пакетом.
+
+    Сети без pk создаются, сети с pk изменяются. Все сети проверяются по объектам, загруженным заранее
+    несколькими запросами, а ошибки возвращаются для каждой сети отдельно и не прерывают обработку остальных.
+    Новые сети вставляются одним запросом bulk_create в топологическом порядке ссылок на поставщиков с заранее
+    вычисленными уровнями и путями в иерархии, связи с продуктами и сотрудниками — пакетной вставкой в промежуточные
+    таблицы. Пакетные запросы не вызывают сигналы сети, поэтому начальная задолженность фиксируется в журнале,
+    статистика задолженности и граф иерархии обновляются здесь же. Изменённые сети с новым поставщиком или типом
+    переносятся функцией sync_hierarchy. Все изменения выполняются в одной транзакции.
+
+    Аргументы:
+    - items (list): Словари сетей в формате NetworkSerializer с необязательными полями ref и supplier_ref.
+    - user (User): Пользователь, выполняющий запрос. Изменять сеть могут её сотрудники и суперпользователи.
+    - batch_size (int): Размер пакета вставки.
+
+    Возвращает:
+    - list: Результат для каждой сети в порядке пакета: номер, статус (created, updated или error), pk, ссылка
+    и ошибки.
+    """
+    items = [item if isinstance(item, dict) else {} for item in items]
+    context = {'bulk_objects': load_bulk_objects(items)}
+    networks = context['bulk_objects'][Network]
+    update_ids = {network_id for item in items for network_id in parse_ids(item.get('pk'))}
+    if user.is_superuser:
+        allowed_ids = update_ids
+    else:
+        allowed_ids = set(Network.employees.through.objects.filter(network_id__in=update_ids, user_id=user.pk)
+                          .values_list('network_id', flat=True))
+
+    errors, creates, updates, seen_ids = {}, {}, {}, set()
+    for index, item in enumerate(items):
+        if not item:
+            errors[index] = {'non_field_errors': ['Ожидается объект сети']}
+            continue
+        instance = None
+        if item.get('pk') is not None:
+            network_id = next(iter(parse_ids(item['pk'])), None)
+            instance = networks.get(network_id)
+            if instance is None or network_id in seen_ids:
+                errors[index] = {'pk': ['Сеть не найдена' if instance is None else 'Сеть уже изменяется в пакете']}
+                continue
+            if network_id not in allowed_ids:
+                errors[index] = {'pk': [str(PermissionDenied.default_detail)]}
+                continue
+            seen_ids.add(network_id)
+
+        serializer = NetworkBulkItemSerializer(instance, data=item, partial=bool(instance), context=context)
+        if not serializer.is_valid():
+            errors[index] = serializer.errors
+        elif instance:
+            updates[index] = (instance, serializer.validated_data)
+        else:
+            creates[index] = serializer.validated_data
+
+    moved = {
+        index: instance for index, (instance, data) in updates.items()
+        if data.get('supplier', instance.supplier) != instance.supplier
+        or data.get('network_type', instance.network_type) != instance.network_type
+    }
+    suppliers = {index: updates[index][1].get('supplier', instance.supplier) for index, instance in moved.items()}
+    suppliers.update({index: data.get('supplier') for index, data in creates.items()})
+    for index in find_moving_conflicts(moved, suppliers):
+        errors[index] = {'non_field_errors': ['Сеть затрагивается другим переносом в пакете, '
+                                              'измените её отдельным запросом']}
+    # Конфликты проверяются до вычисления уровней, чтобы сети, ссылающиеся на отклонённую сеть через supplier_ref,
+    # тоже получили ошибку
+    levels = resolve_batch_levels(creates, errors)
+
+    creates = {index: data for index, data in creates.items() if index not in errors}
+    updates = {index: update for index, update in updates.items() if index not in errors}
+    with transaction.atomic():
+        created_ids = create_networks(creates, levels, batch_size)
+        update_networks(updates, [instance for index, instance in moved.items() if index not in errors], batch_size)
+        if creates or updates:
+            transaction.on_commit(invalidate_hierarchy_graph)
+
+    results = []
+    for index, item in enumerate(items):
+        result = {'index': index, 'ref': item.get('ref')}
+        if index in errors:
+            result.update(status=ERROR, pk=None, errors=errors[index])
+        elif index in created_ids:
+            result.update(status=CREATED, pk=created_ids[index], errors=None)
+        else:
+            result.update(status=UPDATED, pk=updates[index][0].pk, errors=None)
+        results.append(result)
+    return results
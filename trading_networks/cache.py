@@ -0,0 +1,212 @@
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from trading_networks.models import Network
+
+KEY_PREFIX = 'response-cache'
+EMPLOYEE_NETWORKS_KEY_PREFIX = 'employee-networks'
+NETWORK_SCOPE = 'network'
+PRODUCT_SCOPE = 'product'
+SCOPES = (NETWORK_SCOPE, PRODUCT_SCOPE)
+
+HIT = 'hits'
+MISS = 'misses'
+LOCK_POLL_INTERVAL = 0.05
+
+
+def get_scope_key(scope):
+    """
+    Возвращает ключ версии всех объектов области кэша (меняется, когда изменённые объекты заранее неизвестны).
+    """
+    return f'{KEY_PREFIX}:{scope}:version'
+
+
+def get_list_key(scope):
+    """
+    Возвращает ключ версии списков области кэша (меняется при любом изменении объектов области).
+    """
+    return f'{KEY_PREFIX}:{scope}:list-version'
+
+
+def get_object_key(scope, pk):
+    """
+    Возвращает ключ версии объекта области кэша.
+    """
+    return f'{KEY_PREFIX}:{scope}:object-version:{pk}'
+
+
+def get_versions(keys):
+    """
+    Возвращает текущие версии по ключам версий.
+
+    Версия — случайная строка. Отсутствующая (ещё не созданная или вытесненная из кэша) версия создаётся заново,
+    поэтому после вытеснения ключа версии старые ответы не используются повторно.
+
+    Аргументы:
+    - keys (list): Ключи версий.
+
+    Возвращает:
+    - list: Версии в порядке ключей.
+    """
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid4().hex, timeout=None)
+        versions.update(cache.get_many(missing))
+    return [versions[key] for key in keys]
+
+
+def bump_versions(keys):
+    """
+    Присваивает ключам версий новые версии после фиксации текущей транзакции.
+
+    Ответы, сохранённые под прежними версиями, перестают использоваться. Ответ, сформированный параллельным
+    запросом по данным до фиксации, сохраняется под прежней версией и поэтому тоже не используется.
+    """
+    if not settings.RESPONSE_CACHE_ENABLED or not keys:
+        return
+    transaction.on_commit(lambda: cache.set_many({key: uuid4().hex for key in keys}, timeout=None))
+
+
+def invalidate_objects(scope, ids):
+    """
+    Сбрасывает кэшированные ответы с объектами области scope с идентификаторами ids и все списки области.
+    """
+    bump_versions([get_list_key(scope), *(get_object_key(scope, pk) for pk in set(ids))])
+
+
+def invalidate_scope(scope):
+    """
+    Сбрасывает все кэшированные ответы области scope. Используется, когда изменённые объекты заранее неизвестны.
+    """
+    bump_versions([get_scope_key(scope), get_list_key(scope)])
+
+
+def invalidate_lists(scope):
+    """
+    Сбрасывает кэшированные списки области scope, не затрагивая ответы с отдельными объектами.
+    """
+    bump_versions([get_list_key(scope)])
+
+
+def record_cache_event(scope, event):
+    """
+    Увеличивает счётчик попаданий (HIT) или промахов (MISS) кэша ответов области scope.
+    """
+    key = f'{KEY_PREFIX}:stats:{scope}:{event}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_cache_stats():
+    """
+    Возвращает счётчики попаданий и промахов кэша ответов по областям.
+
+    Возвращает:
+    - dict: Словарь {область: {'hits': int, 'misses': int, 'hit_ratio': float | None}}.
+    """
+    counters = cache.get_many([f'{KEY_PREFIX}:stats:{scope}:{event}' for scope in SCOPES for event in (HIT, MISS)])
+    stats = {}
+    for scope in SCOPES:
+        hits = counters.get(f'{KEY_PREFIX}:stats:{scope}:{HIT}', 0)
+        misses = counters.get(f'{KEY_PREFIX}:stats:{scope}:{MISS}', 0)
+        total = hits + misses
+        stats[scope] = {HIT: hits, MISS: misses, 'hit_ratio': round(hits / total, 4) if total else None}
+    return stats
+
+
+def get_employee_networks_key(user_id):
+    """
+    Возвращает ключ кэша идентификаторов сетей, сотрудником которых является пользователь.
+    """
+    return f'{EMPLOYEE_NETWORKS_KEY_PREFIX}:{user_id}'
+
+
+def get_employee_network_ids(user_id):
+    """
+    Возвращает идентификаторы сетей, сотрудником которых является пользователь, из кэша или базы данных.
+
+    Идентификаторы загружаются одним запросом к промежуточной таблице сотрудников и кэшируются
+    на EMPLOYEE_NETWORKS_CACHE_TTL секунд.
+
+    Аргументы:
+    - user_id (int): Идентификатор пользователя.
+
+    Возвращает:
+    - frozenset: Идентификаторы сетей.
+    """
+    key = get_employee_networks_key(user_id)
+    network_ids = cache.get(key)
+    if network_ids is None:
+        network_ids = frozenset(Network.employees.through.objects.filter(user_id=user_id)
+                                .values_list('network_id', flat=True))
+        cache.set(key, network_ids, timeout=settings.EMPLOYEE_NETWORKS_CACHE_TTL)
+    return network_ids
+
+
+def invalidate_employee_networks(user_ids):
+    """
+    Сбрасывает кэш идентификаторов сетей пользователей user_ids после фиксации текущей транзакции.
+    """
+    if not settings.EMPLOYEE_NETWORKS_CACHE_ENABLED:
+        return
+    keys = [get_employee_networks_key(user_id) for user_id in set(user_ids)]
+    if not keys:
+        return
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def get_cache_entry(scope, key):
+    """
+    Возвращает запись кэша ответов или право сформировать её.
+
+    При промахе ответ формирует только один запрос: он получает блокировку на время формирования ответа,
+    а остальные запросы с тем же ключом ждут появления записи, пока блокировка не снята или не истекло время
+    RESPONSE_CACHE_LOCK_TIMEOUT, после чего формируют ответ сами. Так одновременные запросы после сброса кэша
+    не нагружают базу данных одинаковыми запросами.
+
+    Аргументы:
+    - scope (str): Область кэша (для счётчиков).
+    - key (str): Ключ записи.
+
+    Возвращает:
+    - tuple: Запись (None при промахе) и признак полученной блокировки, которую нужно снять функцией
+    store_cache_entry.
+    """
+    lock_key = f'{key}:lock'
+    entry = cache.get(key)
+    locked = False
+    if entry is None:
+        locked = cache.add(lock_key, 1, timeout=settings.RESPONSE_CACHE_LOCK_TIMEOUT)
+        deadline = time.monotonic() + settings.RESPONSE_CACHE_LOCK_TIMEOUT
+        while not locked and time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            values = cache.get_many([key, lock_key])
+            entry = values.get(key)
+            if entry is not None or lock_key not in values:
+                break
+    record_cache_event(scope, MISS if entry is None else HIT)
+    return entry, locked
+
+
+def store_cache_entry(key, entry, locked):
+    """
+    Сохраняет запись кэша ответов на RESPONSE_CACHE_TTL секунд и снимает блокировку, полученную get_cache_entry.
+
+    Аргументы:
+    - key (str): Ключ записи.
+    - entry: Запись или None, если ответ не подлежит кэшированию.
+    - locked (bool): Признак полученной блокировки.
+    """
+    if entry is not None:
+        cache.set(key, entry, timeout=settings.RESPONSE_CACHE_TTL)
+    if locked:
+        cache.delete(f'{key}:lock')
@@ -0,0 +1,305 @@
+import random
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import DecimalField, F, Max, Min, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Now
+from django.utils import timezone
+
+from trading_networks.cache import NETWORK_SCOPE, invalidate_objects
+from trading_networks.models import DebtTaskChunk, DebtTaskRun, DebtTransaction, Network
+from trading_networks.statistics import apply_debt_statistics_change
+
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_SHARD_SIZE = 50000
+DEFAULT_CONCURRENCY = 4
+
+
+def pending_debt_subquery():
+    """
+    Возвращает выражение с суммой ещё не сведённых операций журнала для сети из внешнего запроса.
+
+    Используется для вычисления фактического баланса сети как `debt + pending_debt_subquery()`.
+    """
+    pending = (DebtTransaction.objects.filter(network=OuterRef('pk'), is_applied=False)
+               .order_by().values('network').annotate(total=Sum('amount')).values('total'))
+    return Coalesce(Subquery(pending), Value(Decimal('0')),
+                    output_field=DecimalField(max_digits=20, decimal_places=2))
+
+
+def get_schedule_slot(task_path, now=None, eta=None):
+    """
+    Возвращает слот расписания Celery Beat, к которому относится текущий вызов задачи.
+
+    Если задача отправлена с eta (например, планировщиком, который передаёт время срабатывания), слотом считается
+    это время: оно совпадает с реальным срабатыванием и одинаково для всех повторных доставок сообщения.
+    Иначе слот — это время последнего срабатывания расписания задачи, не позже текущего момента. Для crontab оно
+    вычисляется точно. Стандартный Celery Beat не передаёт eta, а интервальное расписание (timedelta) отсчитывает
+    срабатывания от запуска beat, поэтому время выравнивается по интервалу от начала эпохи и может не совпадать
+    с реальными срабатываниями: после перезапуска beat срабатывание, попавшее в то же окно, что и предыдущий
+    запуск, продолжит этот запуск и не изменит задолженность повторно, а следующее срабатывание создаст новый
+    запуск. Если задача отсутствует в CELERY_BEAT_SCHEDULE (ручной вызов), слотом считается текущий момент.
+
+    Аргументы:
+    - task_path (str): Полное имя задачи Celery, например 'trading_networks.tasks.increase_debt'.
+    - now (datetime): Текущий момент. По умолчанию timezone.now().
+    - eta (datetime | str): Время выполнения из запроса задачи Celery (task.request.eta). Может быть None.
+
+    Возвращает:
+    - datetime: Время слота.
+    """
+    if eta:
+        return datetime.fromisoformat(eta) if isinstance(eta, str) else eta
+
+    now = now or timezone.now()
+    schedules = [entry['schedule'] for entry in settings.CELERY_BEAT_SCHEDULE.values() if entry['task'] == task_path]
+    if not schedules:
+        return now
+
+    schedule = schedules[0]
+    if isinstance(schedule, timedelta):
+        epoch = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+        return now - (now - epoch) % schedule
+
+    # Ищем последнее срабатывание crontab, постепенно увеличивая окно поиска
+    lookback = timedelta(hours=1)
+    while lookback <= timedelta(days=366):
+        moment = now - lookback
+        slot = None
+        while True:
+            last_run_at, delta, _ = schedule.remaining_delta(moment)
+            next_run_at = last_run_at + delta
+            if next_run_at > now:
+                break
+            slot = moment = next_run_at
+        if slot:
+            return slot
+        lookback *= 2
+    return now
+
+
+def get_or_create_debt_run(task_name, amount_range, chunk_size=DEFAULT_CHUNK_SIZE, slot=None, task_id=None):
+    """
+    Возвращает запуск задачи задолженности из реестра запусков или создаёт новый.
+
+    Повторно доставленная задача находит свой запуск по идентификатору задачи Celery, перекрывающиеся
+    срабатывания расписания — по слоту. В обоих случаях продолжается существующий запуск с той же суммой и тем же
+    диапазоном идентификаторов. Для нового запуска выбирается случайная сумма из указанного диапазона и фиксируются
+    текущие границы идентификаторов сетей.
+
+    Аргументы:
+    - task_name (str): Название задачи (DebtTaskRun.INCREASE или DebtTaskRun.DECREASE).
+    - amount_range (tuple): Границы случайной суммы изменения задолженности.
+    - chunk_size (int): Размер пакета идентификаторов для нового запуска.
+    - slot (datetime): Слот расписания запуска. По умолчанию текущий момент.
+    - task_id (str): Идентификатор задачи Celery.
+
+    Возвращает:
+    - DebtTaskRun: Запуск задачи.
+    """
+    if task_id:
+        run = DebtTaskRun.objects.filter(task_name=task_name, task_id=task_id).first()
+        if run:
+            return run
+
+    bounds = Network.objects.aggregate(first_id=Min('id'), last_id=Max('id'))
+    run, _ = DebtTaskRun.objects.get_or_create(task_name=task_name, slot=slot or timezone.now(), defaults={
+        'task_id': task_id,
+        'amount': random.randint(*amount_range),
+        'first_id': bounds['first_id'] or 0,
+        'last_id': bounds['last_id'] or 0,
+        'chunk_size': chunk_size,
+    })
+    return run
+
+
+def get_debt_run_updated_count(run):
+    """
+    Возвращает количество сетей, задолженность которых изменена уже применёнными пакетами запуска.
+
+    Аргументы:
+    - run (DebtTaskRun): Запуск задачи.
+
+    Возвращает:
+    - int: Количество сетей.
+    """
+    return run.chunks.aggregate(total=Sum('updated_count'))['total'] or 0
+
+
+def apply_debt_chunk(run, start_id):
+    """
+    Применяет изменение задолженности к одному пакету сетей.
+
+    Для каждой сети пакета в журнал добавляется операция; строки сетей при этом не блокируются. Условие
+    достаточной задолженности для уменьшения проверяется на стороне базы данных с учётом ещё не сведённых
+    операций. Запись о пакете создаётся в той же транзакции, поэтому повторный вызов для уже применённого пакета
+    ничего не меняет.
+
+    Аргументы:
+    - run (DebtTaskRun): Запуск задачи.
+    - start_id (int): Начальный идентификатор сети пакета.
+
+    Возвращает:
+    - int: Количество сетей, задолженность которых изменена в пакете.
+    """
+    end_id = min(start_id + run.chunk_size, run.last_id + 1)
+    try:
+        with transaction.atomic():
+            chunk = DebtTaskChunk.objects.create(run=run, start_id=start_id, end_id=end_id)
+            networks = Network.objects.filter(id__gte=start_id, id__lt=end_id)
+            if run.task_name == DebtTaskRun.DECREASE:
+                networks = networks.alias(balance=F('debt') + pending_debt_subquery()).filter(balance__gte=run.amount)
+            transactions = DebtTransaction.objects.bulk_create([
+                DebtTransaction(network_id=network_id, amount=run.get_change(), source=run.get_source(), run=run)
+                for network_id in networks.values_list('id', flat=True)
+            ])
+            chunk.updated_count = len(transactions)
+            chunk.save(update_fields=('updated_count',))
+    except IntegrityError:
+        # Пакет уже применён этим запуском
+        chunk = DebtTaskChunk.objects.get(run=run, start_id=start_id)
+    return chunk.updated_count
+
+
+def split_debt_run(run, shard_size=DEFAULT_SHARD_SIZE):
+    """
+    Разбивает диапазон идентификаторов запуска на части для параллельной обработки.
+
+    Границы частей выравниваются по границам пакетов запуска, поэтому каждый пакет принадлежит ровно одной части.
+
+    Аргументы:
+    - run (DebtTaskRun): Запуск задачи.
+    - shard_size (int): Желаемый размер части в идентификаторах сетей.
+
+    Возвращает:
+    - list: Список пар (начальный id, конечный id не включительно).
+    """
+    step = max(1, -(-shard_size // run.chunk_size)) * run.chunk_size
+    return [(start_id, min(start_id + step, run.last_id + 1))
+            for start_id in range(run.first_id, run.last_id + 1, step)]
+
+
+def process_debt_shard(run, start_id, end_id, on_progress=None):
+    """
+    Последовательно применяет пакеты запуска из диапазона идентификаторов [start_id, end_id).
+
+    Уже применённые пакеты пропускаются, их результат учитывается в итоговом количестве. Каждый пакет
+    фиксируется в отдельной транзакции.
+
+    Аргументы:
+    - run (DebtTaskRun): Запуск задачи.
+    - start_id (int): Начальный идентификатор диапазона, совпадающий с началом пакета.
+    - end_id (int): Конечный идентификатор диапазона (не включительно).
+    - on_progress (callable): Необязательная функция, вызываемая после каждого пакета с аргументами
+    (обработано пакетов, всего пакетов, обновлено сетей).
+
+    Возвращает:
+    - int: Количество сетей, задолженность которых изменена в диапазоне.
+    """
+    applied = dict(run.chunks.filter(start_id__gte=start_id, start_id__lt=end_id)
+                   .values_list('start_id', 'updated_count'))
+    chunk_starts = range(start_id, min(end_id, run.last_id + 1), run.chunk_size)
+    updated_count = 0
+
+    for number, chunk_start in enumerate(chunk_starts, start=1):
+        if chunk_start in applied:
+            updated_count += applied[chunk_start]
+            continue
+        updated_count += apply_debt_chunk(run, chunk_start)
+        if on_progress:
+            on_progress(number, len(chunk_starts), updated_count)
+    return updated_count
+
+
+def finish_debt_run(run):
+    """
+    Отмечает запуск задачи задолженности завершённым.
+
+    Аргументы:
+    - run (DebtTaskRun): Запуск задачи.
+    """
+    run.is_finished = True
+    run.finished_at = timezone.now()
+    run.save(update_fields=('is_finished', 'finished_at'))
+
+
+def process_debt_run(run, on_progress=None):
+    """
+    Последовательно применяет все пакеты запуска и завершает его.
+
+    Аргументы:
+    - run (DebtTaskRun): Запуск задачи.
+    - on_progress (callable): Необязательная функция прогресса, см. process_debt_shard.
+
+    Возвращает:
+    - int: Общее количество сетей, задолженность которых изменена.
+    """
+    updated_count = process_debt_shard(run, run.first_id, run.last_id + 1, on_progress=on_progress)
+    finish_debt_run(run)
+    return updated_count
+
+
+def record_debt_clear(network_ids, source=DebtTransaction.ADMIN_CLEAR):
+    """
+    Добавляет в журнал операции, обнуляющие задолженность выбранных сетей.
+
+    Сумма каждой операции равна фактическому балансу сети с обратным знаком (с учётом ещё не сведённых операций).
+
+    Аргументы:
+    - network_ids (list): Список идентификаторов сетей.
+    - source (str): Источник операций.
+
+    Возвращает:
+    - int: Количество найденных сетей.
+    """
+    balances = list(Network.objects.filter(id__in=network_ids)
+                    .annotate(balance=F('debt') + pending_debt_subquery())
+                    .values_list('id', 'balance'))
+    DebtTransaction.objects.bulk_create([
+        DebtTransaction(network_id=network_id, amount=-balance, source=source)
+        for network_id, balance in balances if balance
+    ], batch_size=DEFAULT_CHUNK_SIZE)
+    return len(balances)
+
+
+def rollup_debt(network_ids=None, batch_size=DEFAULT_CHUNK_SIZE):
+    """
+    Сводит неприменённые операции журнала в поле Network.debt.
+
+    Операции обрабатываются пакетами: для каждого пакета задолженность затронутых сетей обновляется одним
+    запросом UPDATE на сумму их операций, а сами операции помечаются сведёнными в той же транзакции, в которой
+    учитывается и изменение суммарной задолженности в статистике. После фиксации пакета сбрасываются
+    кэшированные ответы с затронутыми сетями. Операции, заблокированные параллельно работающей сводкой,
+    пропускаются.
+
+    Аргументы:
+    - network_ids (list): Необязательный список идентификаторов сетей, операции которых нужно свести.
+    - batch_size (int): Количество операций в одном пакете.
+
+    Возвращает:
+    - int: Количество сведённых операций.
+    """
+    pending = DebtTransaction.objects.filter(is_applied=False)
+    if network_ids is not None:
+        pending = pending.filter(network_id__in=network_ids)
+
+    applied_count = 0
+    while True:
+        with transaction.atomic():
+            rows = list(pending.select_for_update(skip_locked=True).order_by('id')
+                        .values_list('id', 'network_id')[:batch_size])
+            if not rows:
+                break
+            batch_ids = [transaction_id for transaction_id, network_id in rows]
+            batch = DebtTransaction.objects.filter(id__in=batch_ids)
+            change = (batch.filter(network=OuterRef('pk')).order_by()
+                      .values('network').annotate(total=Sum('amount')).values('total'))
+            Network.objects.filter(id__in=batch.values('network')).update(debt=F('debt') + Subquery(change),
+                                                                       updated_at=Now())
+            batch.update(is_applied=True)
+            apply_debt_statistics_change(batch.aggregate(total=Sum('amount'))['total'])
+            invalidate_objects(NETWORK_SCOPE, [network_id for transaction_id, network_id in rows])
+        applied_count += len(batch_ids)
+    return applied_count
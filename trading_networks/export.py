@@ -0,0 +1,95 @@
+import csv
+import json
+
+from rest_framework.utils.encoders import JSONEncoder
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+EXPORT_FORMATS = (NDJSON, CSV)
+CONTENT_TYPES = {NDJSON: 'application/x-ndjson', CSV: 'text/csv; charset=utf-8'}
+
+DEFAULT_EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """
+    Псевдобуфер для csv.writer, возвращающий записанную строку вместо её сохранения.
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_serialized(queryset, serializer, chunk_size=DEFAULT_EXPORT_CHUNK_SIZE):
+    """
+    Сериализует объекты QuerySet по мере чтения их курсором на стороне сервера.
+
+    QuerySet читается методом iterator(chunk_size), поэтому в памяти находится только текущий блок объектов,
+    а предварительная загрузка связанных объектов (prefetch_related) выполняется отдельно для каждого блока.
+    Один экземпляр сериализатора используется для всех объектов.
+
+    Аргументы:
+    - queryset (QuerySet): Выгружаемые объекты.
+    - serializer (Serializer): Сериализатор, формирующий представление объекта.
+    - chunk_size (int): Количество объектов, читаемых из курсора за один раз.
+
+    Возвращает:
+    - generator: Представления объектов.
+    """
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        yield serializer.to_representation(instance)
+
+
+def to_csv_value(value):
+    """
+    Преобразует значение представления объекта в значение ячейки CSV: список идентификаторов записывается через ';',
+    вложенные объекты — в JSON.
+    """
+    if value is None:
+        return ''
+    if isinstance(value, list) and all(not isinstance(item, (dict, list)) for item in value):
+        return ';'.join(str(item) for item in value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, cls=JSONEncoder, ensure_ascii=False)
+    return value
+
+
+def render_ndjson(rows, chunk_size=DEFAULT_EXPORT_CHUNK_SIZE):
+    """
+    Формирует поток NDJSON из представлений объектов блоками по chunk_size строк.
+    """
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row, cls=JSONEncoder, ensure_ascii=False) + '\n')
+        if len(lines) >= chunk_size:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def render_csv(rows, fields, chunk_size=DEFAULT_EXPORT_CHUNK_SIZE):
+    """
+    Формирует поток CSV с заголовком из представлений объектов блоками по chunk_size строк.
+
+    Аргументы:
+    - rows (iterable): Представления объектов.
+    - fields (list): Названия столбцов в порядке вывода.
+    - chunk_size (int): Количество строк в блоке.
+    """
+    writer = csv.writer(Echo())
+    lines = [writer.writerow(fields)]
+    for row in rows:
+        lines.append(writer.writerow([to_csv_value(row.get(field)) for field in fields]))
+        if len(lines) >= chunk_size:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def render_export(rows, export_format, fields):
+    """
+    Возвращает поток выгрузки в формате export_format (ndjson или csv).
+    """
+    return render_csv(rows, fields) if export_format == CSV else render_ndjson(rows)
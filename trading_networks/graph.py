@@ -0,0 +1,170 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import connection
+
+from trading_networks.models import Network
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+class HierarchyGraph:
+    """
+    Компактный граф иерархии поставщиков, хранимый в памяти процесса.
+
+    Граф используется для вычисления высоты поддерева при проверке переноса сети без запроса к базе данных.
+    Поставщики и уровень сети известны по её материализованному пути, а выборка потомков выполняется одним запросом
+    по индексу пути, поэтому граф хранит только то, что нужно для обхода вниз по иерархии.
+
+    Сети хранятся в параллельных массивах, упорядоченных по идентификатору: идентификатор и индекс поставщика
+    (-1 для корня). Прямые потомки хранятся в таблице смещений: потомки сети с индексом i занимают
+    позиции child_offsets[i]..child_offsets[i + 1] массива children. Таблица строится лениво при первом обходе
+    вниз по иерархии.
+
+    Атрибуты:
+    - ids (array): Идентификаторы сетей по возрастанию.
+    - parents (array): Индексы поставщиков сетей или -1.
+    - built_at (float): Момент построения графа (time.monotonic()).
+
+    Методы:
+    - from_database(): Строит граф одним запросом к таблице сетей.
+    - append(network_id, supplier_id): Добавляет новую сеть без перестройки графа.
+    - get_subtree_height(network_id): Возвращает высоту поддерева сети.
+    """
+    __slots__ = ('ids', 'parents', 'built_at', '_child_offsets', '_children')
+
+    def __init__(self, rows):
+        rows = sorted(rows)
+        self.ids = array('q', (network_id for network_id, _ in rows))
+        self.parents = array('l', (self._find(supplier_id) for _, supplier_id in rows))
+        self.built_at = time.monotonic()
+        self._child_offsets = None
+        self._children = None
+
+    @classmethod
+    def from_database(cls):
+        return cls(Network.objects.order_by().values_list('id', 'supplier_id'))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, network_id):
+        return self._find(network_id) >= 0
+
+    def _find(self, network_id):
+        if network_id is None:
+            return -1
+        index = bisect_left(self.ids, network_id)
+        return index if index < len(self.ids) and self.ids[index] == network_id else -1
+
+    def _index(self, network_id):
+        index = self._find(network_id)
+        if index < 0:
+            raise KeyError(network_id)
+        return index
+
+    def _build_children(self):
+        offsets = array('l', bytes(array('l').itemsize * (len(self.ids) + 1)))
+        for parent in self.parents:
+            if parent >= 0:
+                offsets[parent + 1] += 1
+        for index in range(len(self.ids)):
+            offsets[index + 1] += offsets[index]
+
+        children = array('l', bytes(array('l').itemsize * offsets[-1]))
+        positions = array('l', offsets[:-1])
+        for index, parent in enumerate(self.parents):
+            if parent >= 0:
+                children[positions[parent]] = index
+                positions[parent] += 1
+        self._child_offsets = offsets
+        self._children = children
+
+    def _iter_children(self, index):
+        if self._children is None:
+            self._build_children()
+        return self._children[self._child_offsets[index]:self._child_offsets[index + 1]]
+
+    def append(self, network_id, supplier_id):
+        """
+        Добавляет новую сеть в граф.
+
+        Возвращает False, если сеть нельзя добавить без перестройки (идентификатор меньше последнего в графе
+        или поставщик отсутствует в графе).
+        """
+        parent = self._find(supplier_id)
+        if (self.ids and network_id <= self.ids[-1]) or (supplier_id is not None and parent < 0):
+            return False
+        self.ids.append(network_id)
+        self.parents.append(parent)
+        self._child_offsets = None
+        self._children = None
+        return True
+
+    def get_subtree_height(self, network_id):
+        level = [self._index(network_id)]
+        height = -1
+        while level and height < len(self.ids):
+            level = [child for index in level for child in self._iter_children(index)]
+            height += 1
+        return height
+
+
+def get_hierarchy_graph():
+    """
+    Возвращает граф иерархии текущего процесса, при необходимости построив его.
+
+    Граф включается настройкой HIERARCHY_GRAPH_CACHE_ENABLED и перестраивается не реже, чем раз
+    в HIERARCHY_GRAPH_CACHE_TTL секунд, чтобы изменения из других процессов учитывались с ограниченной задержкой.
+    Внутри транзакции граф не используется: он может не отражать ещё не зафиксированные изменения,
+    а построенный в транзакции граф — содержать изменения, которые будут откачены.
+
+    Возвращает:
+    - HierarchyGraph | None: Граф или None, если кэш выключен или вызов выполняется внутри транзакции.
+    """
+    global _graph
+    if not settings.HIERARCHY_GRAPH_CACHE_ENABLED or connection.in_atomic_block:
+        return None
+
+    graph = _graph
+    if graph is None or time.monotonic() - graph.built_at > settings.HIERARCHY_GRAPH_CACHE_TTL:
+        with _graph_lock:
+            graph = _graph
+            if graph is None or time.monotonic() - graph.built_at > settings.HIERARCHY_GRAPH_CACHE_TTL:
+                graph = _graph = HierarchyGraph.from_database()
+    return graph
+
+
+def invalidate_hierarchy_graph():
+    """
+    Сбрасывает граф иерархии текущего процесса; он будет построен заново при следующем обращении.
+    """
+    global _graph
+    _graph = None
+
+
+def patch_hierarchy_graph(network_id, supplier_id):
+    """
+    Отражает в графе иерархии сохранение сети.
+
+    Новая сеть добавляется в граф без перестройки. Если у существующей сети изменился поставщик, граф сбрасывается,
+    так как изменение затрагивает всё поддерево сети.
+
+    Аргументы:
+    - network_id (int): Идентификатор сети.
+    - supplier_id (int): Идентификатор поставщика сети или None.
+    """
+    graph = _graph
+    if graph is None:
+        return
+    with _graph_lock:
+        if network_id in graph:
+            if graph.parents[graph._find(network_id)] == graph._find(supplier_id):
+                return
+        elif graph.append(network_id, supplier_id):
+            return
+        invalidate_hierarchy_graph()
@@ -0,0 +1,278 @@
+from django.db import transaction
+from django.db.models import BigIntegerField, Case, CharField, Exists, F, Func, IntegerField, Max, OuterRef, \
+    Subquery, Value, When
+from django.db.models.functions import Cast, Concat, Length, Now, NullIf, Replace, StrIndex, Substr
+
+from trading_networks.cache import NETWORK_SCOPE, invalidate_scope
+from trading_networks.graph import get_hierarchy_graph, invalidate_hierarchy_graph
+from trading_networks.models import Network
+
+PATH_SEPARATOR = '/'
+FACTORY_TYPE = 'Factory'
+
+
+class SplitPart(Func):
+    """
+    Выражение PostgreSQL `split_part(строка, разделитель, номер)`.
+    """
+    function = 'split_part'
+    arity = 3
+    output_field = CharField()
+
+
+def build_hierarchy_path(network_id, supplier_path=None):
+    """
+    Вычисляет материализованный путь сети по пути её поставщика.
+
+    Аргументы:
+    - network_id (int): Идентификатор сети.
+    - supplier_path (str): Путь поставщика или None для корневой сети.
+
+    Возвращает:
+    - str: Путь вида '/1/5/12/'.
+    """
+    return f'{supplier_path or PATH_SEPARATOR}{network_id}{PATH_SEPARATOR}'
+
+
+def get_network_level(network_type, supplier_level=None):
+    """
+    Вычисляет уровень сети в иерархии по её типу и уровню поставщика.
+
+    Завод всегда находится на уровне 0, остальные сети — на уровень ниже поставщика или на уровне 1,
+    если поставщик не указан.
+
+    Аргументы:
+    - network_type (str): Тип сети.
+    - supplier_level (int): Уровень поставщика или None, если поставщика нет.
+
+    Возвращает:
+    - int: Уровень сети.
+    """
+    if network_type == FACTORY_TYPE:
+        return 0
+    return supplier_level + 1 if supplier_level is not None else 1
+
+
+def get_path_depth(path):
+    """
+    Возвращает глубину сети в иерархии по её пути (0 для корня).
+    """
+    return path.count(PATH_SEPARATOR) - 2
+
+
+def get_path_depth_expression(path='hierarchy_path'):
+    """
+    Возвращает выражение с глубиной сети в иерархии по её пути (0 для корня).
+
+    Аргументы:
+    - path (str | Expression): Поле или выражение с путём.
+    """
+    separator_count = Length(path) - Length(Replace(path, Value(PATH_SEPARATOR), Value('')))
+    return Cast(separator_count - 2, output_field=IntegerField())
+
+
+def move_subtree(old_path, new_path, new_level):
+    """
+    Переносит поддерево с путём old_path под путь new_path и пересчитывает уровни его сетей одним запросом UPDATE.
+
+    Внутри поддерева нет заводов, поэтому уровень каждой сети равен уровню корня поддерева плюс её глубина
+    относительно корня.
+
+    Аргументы:
+    - old_path (str): Текущий путь корня поддерева.
+    - new_path (str): Новый путь корня поддерева.
+    - new_level (int): Новый уровень корня поддерева.
+
+    Возвращает:
+    - int: Количество обновлённых сетей.
+    """
+    return Network.objects.filter(hierarchy_path__startswith=old_path).update(
+        hierarchy_path=Concat(Value(new_path), Substr('hierarchy_path', len(old_path) + 1), output_field=CharField()),
+        network_level=get_path_depth_expression() + (new_level - get_path_depth(old_path)),
+        updated_at=Now(),
+    )
+
+
+def sync_hierarchy(network):
+    """
+    Приводит путь и уровень сети и всего её поддерева в соответствие с текущими поставщиком и типом сети.
+
+    Новой сети путь и уровень присваиваются по поставщику. Если у существующей сети сменился поставщик или тип,
+    затронутое поддерево переносится и пересчитывается одним запросом UPDATE в транзакции; остальные сети
+    не затрагиваются.
+
+    Аргументы:
+    - network (Network): Сохранённая сеть.
+    """
+    rows = {
+        network_id: (path, level) for network_id, path, level in
+        Network.objects.filter(pk__in=(network.pk, network.supplier_id))
+        .values_list('id', 'hierarchy_path', 'network_level')
+    }
+    old_path, old_level = rows[network.pk]
+    supplier_path, supplier_level = rows.get(network.supplier_id, (None, None))
+    new_path = build_hierarchy_path(network.pk, supplier_path)
+    new_level = get_network_level(network.network_type, supplier_level)
+    if (old_path, old_level) == (new_path, new_level):
+        return
+
+    with transaction.atomic():
+        if old_path:
+            move_subtree(old_path, new_path, new_level)
+        else:
+            Network.objects.filter(pk=network.pk).update(hierarchy_path=new_path, network_level=new_level,
+                                                         updated_at=Now())
+    network.hierarchy_path = new_path
+    network.network_level = new_level
+
+
+def detach_subtree(network_id):
+    """
+    Делает потомков удалённой сети корнями собственных поддеревьев.
+
+    После удаления поставщика у его прямых потомков поле supplier становится NULL, поэтому из путей всех потомков
+    удаляется часть до удалённой сети включительно, а уровни пересчитываются от уровня 1. Поиск ведётся
+    по идентификатору, а не по сохранённому пути, так как при удалении нескольких сетей путь удаляемого объекта
+    в памяти может быть устаревшим.
+
+    Аргументы:
+    - network_id (int): Идентификатор удалённой сети.
+
+    Возвращает:
+    - int: Количество обновлённых сетей.
+    """
+    segment = f'{PATH_SEPARATOR}{network_id}{PATH_SEPARATOR}'
+    new_path = Substr('hierarchy_path', StrIndex('hierarchy_path', Value(segment)) + len(segment) - 1,
+                      output_field=CharField())
+    return Network.objects.filter(hierarchy_path__contains=segment).update(
+        hierarchy_path=new_path,
+        network_level=get_path_depth_expression(new_path) + get_network_level(None),
+        updated_at=Now(),
+    )
+
+
+def rebuild_hierarchy_paths(max_depth=100):
+    """
+    Полностью перестраивает пути всех сетей.
+
+    Сначала пути получают корневые сети, затем на каждом проходе одним запросом UPDATE обновляются сети,
+    путь которых не совпадает с путём поставщика. Количество проходов равно глубине иерархии.
+
+    Аргументы:
+    - max_depth (int): Максимальное количество проходов (защита от циклов в данных).
+
+    Возвращает:
+    - int: Количество выполненных проходов.
+    """
+    network_id = Cast('id', output_field=CharField())
+    root_path = Concat(Value(PATH_SEPARATOR), network_id, Value(PATH_SEPARATOR), output_field=CharField())
+    Network.objects.filter(supplier__isnull=True).alias(root_path=root_path).exclude(
+        hierarchy_path=F('root_path')).update(hierarchy_path=root_path, updated_at=Now())
+
+    supplier_path = Network.objects.filter(pk=OuterRef('supplier_id')).values('hierarchy_path')
+    expected_path = Concat(Subquery(supplier_path), network_id, Value(PATH_SEPARATOR), output_field=CharField())
+    try:
+        for depth in range(1, max_depth + 1):
+            updated_count = (Network.objects.filter(supplier__isnull=False)
+                             .alias(expected_path=expected_path).exclude(hierarchy_path=F('expected_path'))
+                             .update(hierarchy_path=expected_path, updated_at=Now()))
+            if not updated_count:
+                return depth
+        return max_depth
+    finally:
+        invalidate_hierarchy_graph()
+        invalidate_scope(NETWORK_SCOPE)
+
+
+def repair_network_levels():
+    """
+    Пересчитывает уровни всех сетей по их путям одним запросом UPDATE.
+
+    Уровень сети равен её глубине в иерархии, если корень иерархии — завод, и глубине плюс один в противном случае.
+    Пути должны быть актуальны (см. rebuild_hierarchy_paths).
+
+    Возвращает:
+    - int: Количество сетей, уровень которых исправлен.
+    """
+    factory_root = Network.objects.filter(pk=get_root_id_expression(OuterRef('hierarchy_path')),
+                                          network_type=FACTORY_TYPE)
+    expected_level = get_path_depth_expression() + Case(
+        When(Exists(factory_root), then=Value(get_network_level(FACTORY_TYPE))),
+        default=Value(get_network_level(None)),
+    )
+    updated_count = (Network.objects.alias(expected_level=expected_level).exclude(network_level=F('expected_level'))
+                     .update(network_level=expected_level, updated_at=Now()))
+    invalidate_hierarchy_graph()
+    invalidate_scope(NETWORK_SCOPE)
+    return updated_count
+
+
+def get_root_id_expression(path='hierarchy_path'):
+    """
+    Возвращает выражение с идентификатором корня иерархии сети, извлечённым из её пути.
+
+    Аргументы:
+    - path (str | Expression): Поле или выражение с путём.
+    """
+    root_id = SplitPart(path, Value(PATH_SEPARATOR), Value(2))
+    return Cast(NullIf(root_id, Value('')), output_field=BigIntegerField())
+
+
+def get_subtree_queryset(root_id):
+    """
+    Возвращает QuerySet всех сетей поддерева с корнем root_id, включая сам корень.
+
+    Аргументы:
+    - root_id (int): Идентификатор корня поддерева.
+    """
+    return Network.objects.filter(hierarchy_path__startswith=build_hierarchy_path(root_id))
+
+
+def get_ancestors_queryset(network):
+    """
+    Возвращает QuerySet поставщиков сети от корня иерархии до прямого поставщика.
+
+    Идентификаторы поставщиков берутся из пути сети, поэтому сети выбираются одним запросом по первичному ключу.
+
+    Аргументы:
+    - network (Network): Сеть.
+    """
+    return Network.objects.filter(id__in=network.get_ancestor_ids())
+
+
+def get_descendants_queryset(network):
+    """
+    Возвращает QuerySet всех сетей, находящихся ниже сети в иерархии, одним запросом по индексу пути.
+
+    Аргументы:
+    - network (Network): Сеть.
+    """
+    return Network.objects.filter(hierarchy_path__startswith=network.hierarchy_path).exclude(pk=network.pk)
+
+
+# Связи сети в иерархии поставщиков и функции, возвращающие связанные сети
+HIERARCHY_RELATIONS = {
+    'ancestors': get_ancestors_queryset,
+    'descendants': get_descendants_queryset,
+}
+
+
+def get_subtree_height(network):
+    """
+    Возвращает высоту поддерева сети — на сколько уровней ниже неё находятся самые глубокие потомки.
+
+    Если включён граф иерархии в памяти процесса, высота вычисляется по нему без запросов к базе данных,
+    иначе — одним запросом по индексу пути.
+
+    Аргументы:
+    - network (Network): Сеть.
+
+    Возвращает:
+    - int: Высота поддерева (0 для сети без потомков).
+    """
+    graph = get_hierarchy_graph()
+    if graph is not None and network.pk in graph:
+        return graph.get_subtree_height(network.pk)
+    depth = (Network.objects.filter(hierarchy_path__startswith=network.hierarchy_path).order_by()
+             .aggregate(depth=Max(get_path_depth_expression()))['depth'])
+    return depth - get_path_depth(network.hierarchy_path) if depth is not None else 0
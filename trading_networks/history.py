@@ -0,0 +1,95 @@
+from django.contrib.postgres.fields import ArrayField
+from django.db import connection, transaction
+from django.db.models import DateTimeField, Func, Max, Min, OuterRef, Subquery, Value
+from django.utils import timezone
+
+from trading_networks.debt import DEFAULT_CHUNK_SIZE
+from trading_networks.models import Network, NetworkDebtHistory
+
+
+class ArrayAppend(Func):
+    """
+    Выражение PostgreSQL `array_append(массив, элемент)`.
+    """
+    function = 'array_append'
+    arity = 2
+
+
+def record_debt_snapshot(taken_at=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Добавляет снимок текущей задолженности всех сетей в историю.
+
+    Сети обрабатываются пакетами по диапазонам идентификаторов. Для сетей без строки истории за текущие сутки
+    строка создаётся, затем задолженность и момент снимка дописываются в массивы одним запросом UPDATE на пакет.
+
+    Аргументы:
+    - taken_at (datetime): Момент снимка. По умолчанию timezone.now().
+    - chunk_size (int): Размер пакета идентификаторов сетей.
+    """
+    taken_at = taken_at or timezone.now()
+    day = taken_at.date()
+    bounds = Network.objects.aggregate(first_id=Min('id'), last_id=Max('id'))
+    if bounds['first_id'] is None:
+        return
+
+    for start_id in range(bounds['first_id'], bounds['last_id'] + 1, chunk_size):
+        end_id = start_id + chunk_size
+        with transaction.atomic():
+            missing_ids = (Network.objects.filter(id__gte=start_id, id__lt=end_id)
+                           .exclude(debt_history__day=day).values_list('id', flat=True))
+            NetworkDebtHistory.objects.bulk_create(
+                [NetworkDebtHistory(network_id=network_id, day=day) for network_id in missing_ids],
+                ignore_conflicts=True,
+            )
+            debt = Network.objects.filter(pk=OuterRef('network_id')).values('debt')
+            NetworkDebtHistory.objects.filter(day=day, network_id__gte=start_id, network_id__lt=end_id).update(
+                timestamps=ArrayAppend('timestamps', Value(taken_at, output_field=DateTimeField()),
+                                       output_field=ArrayField(DateTimeField())),
+                debts=ArrayAppend('debts', Subquery(debt), output_field=NetworkDebtHistory._meta.get_field('debts')),
+            )
+
+
+def get_debt_history(network, date_from, date_to, buckets):
+    """
+    Возвращает историю задолженности сети, сжатую до заданного количества интервалов.
+
+    Диапазон [date_from, date_to) делится на равные интервалы, для каждого непустого интервала вычисляются
+    минимальное, максимальное и среднее значение задолженности. Массивы снимков разворачиваются (unnest),
+    распределяются по интервалам (width_bucket) и агрегируются в базе данных, поэтому из неё читается не больше
+    buckets строк и размер ответа не зависит от длины диапазона.
+
+    Аргументы:
+    - network (Network): Сеть.
+    - date_from (datetime): Начало диапазона.
+    - date_to (datetime): Конец диапазона (не включительно).
+    - buckets (int): Количество интервалов.
+
+    Возвращает:
+    - list: Список словарей с ключами start, end, min, max, avg, count.
+    """
+    width = (date_to - date_from) / buckets
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT width_bucket(extract(epoch FROM snapshot.taken_at), extract(epoch FROM %s::timestamptz), '
+            'extract(epoch FROM %s::timestamptz), %s) - 1 AS bucket, '
+            'min(snapshot.debt), max(snapshot.debt), avg(snapshot.debt), count(*) '
+            f'FROM {NetworkDebtHistory._meta.db_table} AS history '
+            'CROSS JOIN LATERAL unnest(history.timestamps, history.debts) AS snapshot (taken_at, debt) '
+            'WHERE history.network_id = %s AND history.day >= %s AND history.day <= %s '
+            'AND snapshot.taken_at >= %s AND snapshot.taken_at < %s '
+            'GROUP BY bucket ORDER BY bucket',
+            [date_from, date_to, buckets, network.pk, date_from.date(), date_to.date(), date_from, date_to],
+        )
+        rows = cursor.fetchall()
+
+    return [
+        {
+            'start': date_from + width * index,
+            'end': date_from + width * (index + 1),
+            'min': min_debt,
+            'max': max_debt,
+            'avg': avg_debt,
+            'count': count,
+        }
+        for index, min_debt, max_debt, avg_debt, count in rows
+    ]
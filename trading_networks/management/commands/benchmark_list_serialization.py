@@ -0,0 +1,81 @@
+from time import perf_counter
+
+from django.core.management import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from products.models import Product
+from products.serializers.product import ProductSerializer
+from trading_networks.models import Network
+from trading_networks.renderers import FastJSONRenderer, orjson
+from trading_networks.serializers.network import NetworkSerializer
+from trading_networks.serializers.values import ValuesRepresentation
+
+
+def render_with_serializer(queryset, serializer_class):
+    """
+    Формирует ответ обычным путём: объекты модели, ModelSerializer и JSONRenderer.
+    """
+    serializer = serializer_class()
+    if hasattr(serializer, 'setup_eager_loading'):
+        queryset = serializer.setup_eager_loading(queryset)
+    return JSONRenderer().render(serializer_class(queryset, many=True).data)
+
+
+def render_with_values(queryset, serializer_class):
+    """
+    Формирует ответ быстрым путём: строки QuerySet.values(), ValuesRepresentation и FastJSONRenderer.
+    """
+    representation = ValuesRepresentation.from_serializer(serializer_class())
+    rows = list(queryset.values(*representation.columns))
+    return FastJSONRenderer().render(representation.represent(rows))
+
+
+def measure(render, queryset, serializer_class, repeat):
+    """
+    Возвращает лучшее время формирования ответа из repeat попыток и сам ответ.
+    """
+    best, content = None, None
+    for _ in range(repeat):
+        started = perf_counter()
+        content = render(queryset, serializer_class)
+        elapsed = perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, content
+
+
+class Command(BaseCommand):
+    """
+    Команда для сравнения скорости обычной сериализации списков и сериализации по строкам QuerySet.values().
+
+    Для сетей и продуктов формируется JSON списка из первых `--rows` объектов обоими способами, время каждого
+    способа берётся как лучшее из `--repeat` попыток (вместе с запросами к базе данных). Команда завершается
+    ошибкой, если ответы различаются хотя бы одним байтом.
+    """
+    help = 'Сравнивает скорость сериализации списков сетей и продуктов через ModelSerializer и через values()'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Количество объектов в списке')
+        parser.add_argument('--repeat', type=int, default=5, help='Количество попыток для каждого способа')
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['repeat'] < 1:
+            raise CommandError('Параметры --rows и --repeat должны быть положительными.')
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson не установлен: используется стандартный JSONRenderer.'))
+
+        cases = {
+            'сети': (Network.objects.order_by('pk'), NetworkSerializer),
+            'продукты': (Product.objects.order_by('pk'), ProductSerializer),
+        }
+        for name, (queryset, serializer_class) in cases.items():
+            queryset = queryset[:options['rows']]
+            count = queryset.count()
+            if not count:
+                self.stdout.write(f'{name}: нет объектов')
+                continue
+            regular, regular_content = measure(render_with_serializer, queryset, serializer_class, options['repeat'])
+            fast, fast_content = measure(render_with_values, queryset, serializer_class, options['repeat'])
+            if regular_content != fast_content:
+                raise CommandError(f'{name}: ответы ModelSerializer и values() различаются.')
+            self.stdout.write(f'{name} ({count}): ModelSerializer {count / regular:,.0f} строк/с, '
+                              f'values() {count / fast:,.0f} строк/с, ускорение {regular / fast:.1f}x')
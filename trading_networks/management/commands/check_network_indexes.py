@@ -0,0 +1,127 @@
+import json
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q
+
+from products.models import Product
+from trading_networks.models import DebtTransaction, Network
+from trading_networks.search import search_networks
+from trading_networks.statistics import get_debt_threshold_filter
+
+
+def get_hot_queries():
+    """
+    Возвращает запросы горячих представлений, задач и админ-панели в том виде, в котором они выполняются.
+
+    Значения фильтров берутся из первой сети и первого продукта, чтобы запросы были реалистичными.
+
+    Возвращает:
+    - dict: Словарь {описание: (QuerySet, имя индекса, который должен использовать запрос)}.
+    """
+    network = Network.objects.order_by('pk').first() or Network(pk=0, country='', city='', hierarchy_path='/0/')
+    product_id = Product.objects.order_by('pk').values_list('pk', flat=True).first() or 0
+    offers = Network.products.through.objects.filter(network=OuterRef('pk'), product_id=product_id)
+    keyset = Q(network_level__gt=network.network_level) | Q(network_level=network.network_level, pk__gt=network.pk)
+
+    pk_index = f'{Network._meta.db_table}_pkey'
+    return {
+        'список сетей с фильтром по стране': (
+            Network.objects.filter(country=network.country).order_by('pk')[:15], 'network_country_id_idx'),
+        'список сетей по уровню (курсор)': (
+            Network.objects.filter(keyset).order_by('network_level', 'pk')[:16], 'network_level_id_idx'),
+        'список сетей по задолженности': (
+            Network.objects.order_by('-debt', '-pk')[:15], 'network_debt_id_idx'),
+        'сети с задолженностью выше средней': (
+            Network.objects.filter(**get_debt_threshold_filter('average')).order_by('pk')[:15], 'network_debt_id_idx'),
+        'сети с наибольшей задолженностью': (
+            Network.objects.filter(**get_debt_threshold_filter('top', limit=100)).order_by('pk')[:15],
+            'network_debt_id_idx'),
+        'сети по продукту': (
+            Network.objects.filter(Exists(offers)).order_by('pk')[:15], 'network_products_product_network_idx'),
+        'потомки сети': (
+            Network.objects.filter(hierarchy_path__startswith=network.hierarchy_path)
+            .order_by('network_level', 'pk')[:15], 'network_hierarchy_path_idx'),
+        'заводы для сводки задолженности': (
+            Network.objects.filter(network_type='Factory').order_by('pk')[:15], 'network_factory_idx'),
+        'поиск сетей': (
+            search_networks(network.network_name[:4] or 'сеть')[:10], 'network_name_trgm_idx'),
+        'админ-панель: фильтр по городу': (
+            Network.objects.filter(city=network.city).order_by('pk')[:100], 'network_city_id_idx'),
+        'задача задолженности: пакет сетей': (
+            Network.objects.filter(id__gte=network.pk, id__lt=network.pk + 5000), pk_index),
+        'сводка журнала задолженности': (
+            DebtTransaction.objects.filter(is_applied=False).order_by('id')[:5000], 'debt_transaction_pending_idx'),
+    }
+
+
+def find_sequential_scans(plan, tables):
+    """
+    Возвращает таблицы из tables, которые план запроса читает последовательным сканированием.
+
+    Аргументы:
+    - plan (dict): Узел плана EXPLAIN в формате JSON.
+    - tables (set): Имена проверяемых таблиц.
+
+    Возвращает:
+    - list: Имена таблиц.
+    """
+    scans = []
+    if plan.get('Node Type') == 'Seq Scan' and plan.get('Relation Name') in tables:
+        scans.append(plan['Relation Name'])
+    for child in plan.get('Plans', []):
+        scans.extend(find_sequential_scans(child, tables))
+    return scans
+
+
+def find_indexes(plan):
+    """
+    Возвращает имена индексов, которые использует план запроса.
+
+    Аргументы:
+    - plan (dict): Узел плана EXPLAIN в формате JSON.
+
+    Возвращает:
+    - list: Имена индексов.
+    """
+    indexes = [plan['Index Name']] if 'Index Name' in plan else []
+    for child in plan.get('Plans', []):
+        indexes.extend(find_indexes(child))
+    return indexes
+
+
+class Command(BaseCommand):
+    """
+    Команда для проверки, что горячие запросы сетей выполняются по индексам.
+
+    Для каждого запроса строится план EXPLAIN с отключённым последовательным сканированием (enable_seqscan = off):
+    если подходящего индекса нет, PostgreSQL всё равно выбирает последовательное сканирование. Проверка завершается
+    ошибкой, если план читает таблицу последовательно или не использует индекс, предназначенный для запроса.
+    Отключение последовательного сканирования делает результат независимым от размера таблиц в проверяемой
+    базе данных.
+    """
+    help = 'Проверяет по планам EXPLAIN, что горячие запросы сетей используют индексы'
+
+    def handle(self, *args, **options):
+        tables = {Network._meta.db_table, Network.products.through._meta.db_table, DebtTransaction._meta.db_table}
+        failures = []
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            for name, (queryset, index_name) in get_hot_queries().items():
+                plan = json.loads(queryset.explain(format='json'))[0]['Plan']
+                scans = find_sequential_scans(plan, tables)
+                indexes = find_indexes(plan)
+                if scans:
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(f'{name}: последовательное сканирование {", ".join(scans)}'))
+                elif index_name not in indexes:
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(f'{name}: не используется {index_name} '
+                                                       f'(используются: {", ".join(indexes) or "нет"})'))
+                else:
+                    self.stdout.write(f'{name}: {index_name}')
+
+        if failures:
+            raise CommandError(f'Запросы без индекса: {len(failures)}.')
+        self.stdout.write(self.style.SUCCESS('Все горячие запросы используют индексы.'))
@@ -0,0 +1,18 @@
+from django.core.management import BaseCommand
+
+from trading_networks.hierarchy import rebuild_hierarchy_paths, repair_network_levels
+
+
+class Command(BaseCommand):
+    """
+    Команда для полной перестройки материализованных путей и уровней сетей в иерархии.
+
+    Используется после загрузки фикстур и массовых изменений поставщиков в обход модели (например, queryset.update).
+    """
+    help = 'Перестраивает пути и уровни всех сетей в иерархии поставщиков'
+
+    def handle(self, *args, **options):
+        depth = rebuild_hierarchy_paths()
+        updated_count = repair_network_levels()
+        self.stdout.write(self.style.SUCCESS(f'Пути в иерархии перестроены, проходов: {depth}, '
+                                             f'исправлено уровней: {updated_count}.'))
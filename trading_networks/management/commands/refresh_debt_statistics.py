@@ -0,0 +1,18 @@
+from django.core.management import BaseCommand
+
+from trading_networks.statistics import refresh_debt_statistics
+
+
+class Command(BaseCommand):
+    """
+    Команда для полного пересчёта статистики задолженности сетей.
+
+    Используется после загрузки фикстур и изменений задолженности в обход журнала (например, queryset.update).
+    """
+    help = 'Пересчитывает суммарную задолженность, количество сетей и перцентили задолженности'
+
+    def handle(self, *args, **options):
+        statistics = refresh_debt_statistics()
+        self.stdout.write(self.style.SUCCESS(
+            f'Статистика пересчитана: задолженность {statistics.total_debt} у {statistics.network_count} сетей.'
+        ))
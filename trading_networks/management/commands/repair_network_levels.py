@@ -0,0 +1,22 @@
+from django.core.management import BaseCommand
+
+from trading_networks.hierarchy import rebuild_hierarchy_paths, repair_network_levels
+
+
+class Command(BaseCommand):
+    """
+    Команда для исправления уровней всех сетей в иерархии одним запросом UPDATE.
+
+    Уровни вычисляются по материализованным путям. Если пути могли устареть (например, после изменения поставщиков
+    в обход модели), их можно предварительно перестроить параметром --rebuild-paths.
+    """
+    help = 'Пересчитывает уровни всех сетей в иерархии поставщиков'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild-paths', action='store_true', help='Предварительно перестроить пути сетей')
+
+    def handle(self, *args, **options):
+        if options['rebuild_paths']:
+            rebuild_hierarchy_paths()
+        updated_count = repair_network_levels()
+        self.stdout.write(self.style.SUCCESS(f'Уровни в иерархии исправлены у {updated_count} сетей.'))
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading_networks', '0003_alter_network_network_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DebtTaskRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_name', models.CharField(choices=[('increase_debt', 'Увеличение задолженности'), ('decrease_debt', 'Уменьшение задолженности')], max_length=30, verbose_name='задача')),
+                ('amount', models.PositiveIntegerField(verbose_name='сумма изменения')),
+                ('first_id', models.BigIntegerField(verbose_name='первый id сети')),
+                ('last_id', models.BigIntegerField(verbose_name='последний id сети')),
+                ('chunk_size', models.PositiveIntegerField(verbose_name='размер пакета')),
+                ('is_finished', models.BooleanField(default=False, verbose_name='завершён')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='время запуска')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='время завершения')),
+            ],
+            options={
+                'verbose_name': 'запуск задачи задолженности',
+                'verbose_name_plural': 'запуски задач задолженности',
+            },
+        ),
+        migrations.CreateModel(
+            name='DebtTaskChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_id', models.BigIntegerField(verbose_name='начальный id сети')),
+                ('end_id', models.BigIntegerField(verbose_name='конечный id сети')),
+                ('updated_count', models.PositiveIntegerField(default=0, verbose_name='обновлено сетей')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='время применения')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='trading_networks.debttaskrun', verbose_name='запуск')),
+            ],
+            options={
+                'verbose_name': 'пакет задачи задолженности',
+                'verbose_name_plural': 'пакеты задач задолженности',
+                'constraints': [models.UniqueConstraint(fields=('run', 'start_id'), name='unique_debt_task_chunk')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading_networks', '0004_debt_task_run'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DebtTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=20, verbose_name='изменение задолженности')),
+                ('source', models.CharField(choices=[('beat_increase', 'Периодическое увеличение'), ('daily_decrease', 'Ежедневное уменьшение'), ('admin_clear', 'Очистка из админки'), ('manual', 'Ручное изменение')], max_length=20, verbose_name='источник')),
+                ('is_applied', models.BooleanField(default=False, verbose_name='сведена')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='время создания')),
+                ('network', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='debt_transactions', to='trading_networks.network', verbose_name='сеть')),
+                ('run', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transactions', to='trading_networks.debttaskrun', verbose_name='запуск задачи')),
+            ],
+            options={
+                'verbose_name': 'операция по задолженности',
+                'verbose_name_plural': 'операции по задолженности',
+                'indexes': [models.Index(condition=models.Q(('is_applied', False)), fields=['id'], name='debt_transaction_pending_idx')],
+            },
+        ),
+    ]
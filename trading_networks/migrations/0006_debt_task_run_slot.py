@@ -0,0 +1,39 @@
+# Generated by Django 5.1.1 on 2026-10-18 11:00
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_slot(apps, schema_editor):
+    DebtTaskRun = apps.get_model('trading_networks', 'DebtTaskRun')
+    DebtTaskRun.objects.update(slot=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading_networks', '0005_debt_transaction'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='debttaskrun',
+            name='slot',
+            field=models.DateTimeField(null=True, verbose_name='слот расписания'),
+        ),
+        migrations.AddField(
+            model_name='debttaskrun',
+            name='task_id',
+            field=models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='id задачи Celery'),
+        ),
+        migrations.RunPython(fill_slot, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='debttaskrun',
+            name='slot',
+            field=models.DateTimeField(verbose_name='слот расписания'),
+        ),
+        migrations.AddConstraint(
+            model_name='debttaskrun',
+            constraint=models.UniqueConstraint(fields=('task_name', 'slot'), name='unique_debt_task_run_slot'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-18 11:30
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading_networks', '0006_debt_task_run_slot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NetworkDebtHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='сутки')),
+                ('timestamps', django.contrib.postgres.fields.ArrayField(base_field=models.DateTimeField(), default=list, size=None, verbose_name='моменты снимков')),
+                ('debts', django.contrib.postgres.fields.ArrayField(base_field=models.DecimalField(decimal_places=2, max_digits=20), default=list, size=None, verbose_name='значения задолженности')),
+                ('network', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='debt_history', to='trading_networks.network', verbose_name='сеть')),
+            ],
+            options={
+                'verbose_name': 'история задолженности',
+                'verbose_name_plural': 'история задолженности',
+                'constraints': [models.UniqueConstraint(fields=('network', 'day'), name='unique_network_debt_history_day')],
+            },
+        ),
+    ]
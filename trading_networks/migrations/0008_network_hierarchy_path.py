@@ -0,0 +1,45 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:00
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import CharField, F, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Concat
+
+
+def fill_hierarchy_path(apps, schema_editor):
+    Network = apps.get_model('trading_networks', 'Network')
+    network_id = Cast('id', output_field=CharField())
+    Network.objects.filter(supplier__isnull=True).update(
+        hierarchy_path=Concat(Value('/'), network_id, Value('/'), output_field=CharField())
+    )
+
+    supplier_path = Network.objects.filter(pk=OuterRef('supplier_id')).values('hierarchy_path')
+    expected_path = Concat(Subquery(supplier_path), network_id, Value('/'), output_field=CharField())
+    for _ in range(100):
+        updated_count = (Network.objects.filter(supplier__isnull=False)
+                         .alias(expected_path=expected_path).exclude(hierarchy_path=F('expected_path'))
+                         .update(hierarchy_path=expected_path))
+        if not updated_count:
+            break
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_alter_product_product_model_and_more'),
+        ('trading_networks', '0007_network_debt_history'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='network',
+            name='hierarchy_path',
+            field=models.CharField(default='', editable=False, max_length=255, verbose_name='путь в иерархии'),
+        ),
+        migrations.AddIndex(
+            model_name='network',
+            index=models.Index(fields=['hierarchy_path'], name='network_hierarchy_path_idx', opclasses=('varchar_pattern_ops',)),
+        ),
+        migrations.RunPython(fill_hierarchy_path, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading_networks', '0008_network_hierarchy_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubtreeDebtRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('network_level', models.IntegerField(verbose_name='уровень в иерархии')),
+                ('network_type', models.CharField(choices=[('Factory', 'Завод'), ('Distributor', 'Дистрибьютор'), ('DealerCenter', 'Дилерский центр'), ('RetailNetwork', 'Розничная сеть'), ('IndividualBusinessman', 'Индивидуальный предприниматель')], max_length=35, verbose_name='тип сети')),
+                ('total_debt', models.DecimalField(decimal_places=2, max_digits=20, verbose_name='суммарная задолженность')),
+                ('average_debt', models.DecimalField(decimal_places=2, max_digits=20, verbose_name='средняя задолженность')),
+                ('max_debt', models.DecimalField(decimal_places=2, max_digits=20, verbose_name='максимальная задолженность')),
+                ('network_count', models.PositiveIntegerField(verbose_name='количество сетей')),
+                ('refreshed_at', models.DateTimeField(verbose_name='время пересчёта')),
+                ('root', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subtree_debt', to='trading_networks.network', verbose_name='завод')),
+            ],
+            options={
+                'verbose_name': 'сводка задолженности поддерева',
+                'verbose_name_plural': 'сводки задолженности поддеревьев',
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-18 13:05
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Индексы строятся без блокировки записи в таблицу сетей, что невозможно внутри транзакции
+    atomic = False
+
+    dependencies = [
+        ('trading_networks', '0009_subtree_debt_rollup'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='network',
+            index=models.Index(fields=['network_level', 'id'], name='network_level_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='network',
+            index=models.Index(fields=['debt', 'id'], name='network_debt_id_idx'),
+        ),
+    ]
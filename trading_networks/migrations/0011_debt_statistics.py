@@ -0,0 +1,37 @@
+# Generated by Django 5.1.1 on 2026-10-18 14:10
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_debt_statistics(apps, schema_editor):
+    Network = apps.get_model('trading_networks', 'Network')
+    DebtStatistics = apps.get_model('trading_networks', 'DebtStatistics')
+    totals = Network.objects.aggregate(total_debt=Sum('debt'), network_count=Count('id'))
+    DebtStatistics.objects.create(pk=1, total_debt=totals['total_debt'] or 0, network_count=totals['network_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading_networks', '0010_network_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DebtStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_debt', models.DecimalField(decimal_places=2, default=0, max_digits=24, verbose_name='суммарная задолженность')),
+                ('network_count', models.BigIntegerField(default=0, verbose_name='количество сетей')),
+                ('debt_percentiles', django.contrib.postgres.fields.ArrayField(base_field=models.DecimalField(decimal_places=2, max_digits=20), default=list, size=None, verbose_name='перцентили задолженности')),
+                ('percentiles_refreshed_at', models.DateTimeField(blank=True, null=True, verbose_name='время пересчёта перцентилей')),
+            ],
+            options={
+                'verbose_name': 'статистика задолженности',
+                'verbose_name_plural': 'статистика задолженности',
+            },
+        ),
+        migrations.RunPython(fill_debt_statistics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.1 on 2026-10-18 15:20
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Индексы строятся без блокировки записи в таблицы, что невозможно внутри транзакции
+    atomic = False
+
+    dependencies = [
+        ('trading_networks', '0011_debt_statistics'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='network',
+            index=models.Index(fields=['country', 'id'], name='network_country_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='network',
+            index=models.Index(fields=['city', 'id'], name='network_city_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='network',
+            index=models.Index(condition=models.Q(('network_type', 'Factory')), fields=['id'], name='network_factory_idx'),
+        ),
+        # Промежуточная таблица продуктов создаётся автоматически, поэтому индекс для поиска сетей по продукту
+        # (product_id, network_id) добавляется SQL-запросом
+        migrations.RunSQL(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS network_products_product_network_idx '
+            'ON trading_networks_network_products (product_id, network_id);',
+            'DROP INDEX CONCURRENTLY IF EXISTS network_products_product_network_idx;',
+        ),
+    ]
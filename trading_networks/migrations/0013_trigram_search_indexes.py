@@ -0,0 +1,34 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:05
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Индексы строятся без блокировки записи в таблицы, что невозможно внутри транзакции
+    atomic = False
+
+    dependencies = [
+        ('trading_networks', '0012_network_hot_column_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name='network',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['network_name'], name='network_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='network',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['country'], name='network_country_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='network',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['city'], name='network_city_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='network',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['street'], name='network_street_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+# Агрегаты по всем сочетаниям измерений (GROUP BY CUBE). Измерения в таблице сетей не принимают значение NULL,
+# поэтому NULL в строке означает, что строка не группирует сети по измерению, а JSON-массив значений измерений
+# однозначно определяет строку и служит ключом уникального индекса, необходимого для REFRESH ... CONCURRENTLY
+CREATE_NETWORK_DEBT_CUBE = """
+CREATE MATERIALIZED VIEW trading_networks_network_debt_cube AS
+SELECT json_build_array(country, city, network_type, network_level)::text AS id,
+       GROUPING(country, city, network_type, network_level) AS grouping,
+       country,
+       city,
+       network_type,
+       network_level,
+       COUNT(*) AS network_count,
+       SUM(debt) AS total_debt,
+       ROUND(AVG(debt), 2) AS average_debt,
+       MIN(debt) AS min_debt,
+       MAX(debt) AS max_debt,
+       percentile_disc(0.5) WITHIN GROUP (ORDER BY debt) AS median_debt,
+       percentile_disc(0.9) WITHIN GROUP (ORDER BY debt) AS p90_debt
+FROM trading_networks_network
+GROUP BY CUBE (country, city, network_type, network_level);
+
+CREATE UNIQUE INDEX network_debt_cube_id_idx ON trading_networks_network_debt_cube (id);
+CREATE INDEX network_debt_cube_grouping_idx ON trading_networks_network_debt_cube (grouping);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading_networks', '0014_network_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NetworkDebtCube',
+            fields=[
+                ('id', models.TextField(primary_key=True, serialize=False, verbose_name='ключ')),
+                ('grouping', models.IntegerField(verbose_name='маска группировки')),
+                ('country', models.CharField(blank=True, max_length=40, null=True, verbose_name='страна')),
+                ('city', models.CharField(blank=True, max_length=40, null=True, verbose_name='город')),
+                ('network_type', models.CharField(blank=True, choices=[('Factory', 'Завод'), ('Distributor', 'Дистрибьютор'), ('DealerCenter', 'Дилерский центр'), ('RetailNetwork', 'Розничная сеть'), ('IndividualBusinessman', 'Индивидуальный предприниматель')], max_length=35, null=True, verbose_name='тип сети')),
+                ('network_level', models.IntegerField(blank=True, null=True, verbose_name='уровень в иерархии')),
+                ('network_count', models.BigIntegerField(verbose_name='количество сетей')),
+                ('total_debt', models.DecimalField(blank=True, decimal_places=2, max_digits=24, null=True, verbose_name='суммарная задолженность')),
+                ('average_debt', models.DecimalField(blank=True, decimal_places=2, max_digits=20, null=True, verbose_name='средняя задолженность')),
+                ('min_debt', models.DecimalField(blank=True, decimal_places=2, max_digits=20, null=True, verbose_name='минимальная задолженность')),
+                ('max_debt', models.DecimalField(blank=True, decimal_places=2, max_digits=20, null=True, verbose_name='максимальная задолженность')),
+                ('median_debt', models.DecimalField(blank=True, decimal_places=2, max_digits=20, null=True, verbose_name='медиана задолженности')),
+                ('p90_debt', models.DecimalField(blank=True, decimal_places=2, max_digits=20, null=True, verbose_name='90-й перцентиль задолженности')),
+            ],
+            options={
+                'verbose_name': 'агрегаты задолженности',
+                'verbose_name_plural': 'агрегаты задолженности',
+                'db_table': 'trading_networks_network_debt_cube',
+                'managed': False,
+            },
+        ),
+        migrations.RunSQL(CREATE_NETWORK_DEBT_CUBE, 'DROP MATERIALIZED VIEW IF EXISTS trading_networks_network_debt_cube;'),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Индекс строится без блокировки записи в таблицу, что невозможно внутри транзакции
+    atomic = False
+
+    dependencies = [
+        ('trading_networks', '0015_network_debt_cube'),
+    ]
+
+    operations = [
+        # Промежуточная таблица сотрудников создаётся автоматически, поэтому индекс для выборки сетей сотрудника
+        # (user_id, network_id) добавляется SQL-запросом
+        migrations.RunSQL(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS network_employees_user_network_idx '
+            'ON trading_networks_network_employees (user_id, network_id);',
+            'DROP INDEX CONCURRENTLY IF EXISTS network_employees_user_network_idx;',
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading_networks', '0016_network_employees_user_network_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DebtStatisticsDelta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('debt_change', models.DecimalField(decimal_places=2, default=0, max_digits=24, verbose_name='изменение суммарной задолженности')),
+                ('count_change', models.IntegerField(default=0, verbose_name='изменение количества сетей')),
+            ],
+            options={
+                'verbose_name': 'изменение статистики задолженности',
+                'verbose_name_plural': 'изменения статистики задолженности',
+            },
+        ),
+    ]
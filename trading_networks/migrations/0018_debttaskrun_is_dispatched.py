@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading_networks', '0017_debt_statistics_delta'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='debttaskrun',
+            name='is_dispatched',
+            field=models.BooleanField(default=False, verbose_name='распределён'),
+        ),
+    ]
@@ -1,4 +1,7 @@
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from django.db.models.functions import Now
 
 from products.models import Product
 from users.models import NULLABLE, User
@@ -25,14 +28,27 @@ class Network(models.Model):
     - supplier (ForeignKey): Поставщик сети. Может быть NULL.
     - debt (DecimalField): Задолженность сети. Максимальная длина 20 символов с 2 знаками после запятой.
     - created_at (DateTimeField): Время создания записи о сети. Автоматически устанавливается при создании.
+    - updated_at (DateTimeField): Время последнего изменения сети, включая задолженность, положение в иерархии
+    и связи с продуктами и сотрудниками. Используется для условных запросов (ETag, Last-Modified).
+    - hierarchy_path (CharField): Материализованный путь от корня иерархии до сети вида '/1/5/12/'.
+    Поддерживается автоматически при создании, изменении и удалении сетей.
 
     Методы:
+    - save(): Сохраняет сеть. Для существующей сети не перезаписываются поля, которые поддерживаются отдельно
+    (MAINTAINED_FIELDS): задолженность изменяется только через журнал операций DebtTransaction и сводится на сеть
+    функцией rollup_debt, уровень и путь в иерархии обновляются модулем trading_networks.hierarchy.
+    - get_ancestor_ids(): Возвращает идентификаторы поставщиков цепочки от корня иерархии до сети.
     - __str__(): Возвращает строковое представление объекта Network, отображающее тип, название сети и уровень в иерархии.
 
     Класс Meta:
     - verbose_name: Человеко-читаемое имя для объекта Network в единственном числе.
     - verbose_name_plural: Человеко-читаемое имя для объектов Network во множественном числе.
+    - indexes: Индекс по пути в иерархии для поиска потомков по префиксу, индексы по ключам пагинации
+    по курсору (уровень, id) и (задолженность, id), индексы для фильтров по стране и городу с сортировкой по id,
+    частичный индекс заводов, индекс по времени изменения и индексы триграмм для поиска по названию и адресу.
     """
+    MAINTAINED_FIELDS = ('debt', 'network_level', 'hierarchy_path')
+
     NETWORK_CHOICES = (
         ('Factory', 'Завод'),
         ('Distributor', 'Дистрибьютор'),
@@ -54,6 +70,21 @@ class Network(models.Model):
     supplier = models.ForeignKey('self', on_delete=models.SET_NULL, verbose_name='поставщик', related_name='supplied_networks', **NULLABLE)
     debt = models.DecimalField(max_digits=20, decimal_places=2, verbose_name='задолженность')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='время создания')
+    updated_at = models.DateTimeField(auto_now=True, db_default=Now(), verbose_name='время изменения')
+    hierarchy_path = models.CharField(max_length=255, default='', editable=False, verbose_name='путь в иерархии')
+
+    def save(self, *args, **kwargs):
+        # Задолженность и путь в иерархии существующей сети поддерживаются отдельно,
+        # поэтому при обычном сохранении они не перезаписываются устаревшими значениями
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.MAINTAINED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    def get_ancestor_ids(self):
+        return [int(network_id) for network_id in self.hierarchy_path.strip('/').split('/')[:-1] if network_id]
 
     def __str__(self):
         return f'{self.network_type} - {self.network_name}, уровень в иерархии - {self.network_level}'
@@ -61,3 +92,338 @@ class Network(models.Model):
     class Meta:
         verbose_name = 'сеть'
         verbose_name_plural = 'сети'
+        indexes = [
+            models.Index(fields=('hierarchy_path',), name='network_hierarchy_path_idx',
+                         opclasses=('varchar_pattern_ops',)),
+            models.Index(fields=('network_level', 'id'), name='network_level_id_idx'),
+            models.Index(fields=('debt', 'id'), name='network_debt_id_idx'),
+            models.Index(fields=('country', 'id'), name='network_country_id_idx'),
+            models.Index(fields=('city', 'id'), name='network_city_id_idx'),
+            models.Index(fields=('id',), name='network_factory_idx', condition=models.Q(network_type='Factory')),
+            models.Index(fields=('updated_at',), name='network_updated_at_idx'),
+            GinIndex(fields=('network_name',), name='network_name_trgm_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=('country',), name='network_country_trgm_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=('city',), name='network_city_trgm_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=('street',), name='network_street_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
+
+
+class DebtTaskRun(models.Model):
+    """
+    Модель для учёта запусков периодических задач изменения задолженности (реестр запусков).
+
+    Запуск однозначно определяется задачей и слотом расписания Celery Beat. Каждый запуск фиксирует выбранную
+    сумму изменения и диапазон идентификаторов сетей, который обрабатывается пакетами фиксированного размера,
+    а применённые пакеты учитываются в DebtTaskChunk. Благодаря этому повторная доставка задачи или перекрывающиеся
+    срабатывания расписания продолжают тот же запуск с той же суммой и не применяют пакеты повторно.
+
+    Атрибуты:
+    - task_name (CharField): Название задачи (увеличение или уменьшение задолженности).
+    - slot (DateTimeField): Время срабатывания расписания, к которому относится запуск.
+    - task_id (CharField): Идентификатор задачи Celery, создавшей запуск. Может быть NULL.
+    - amount (PositiveIntegerField): Сумма, на которую изменяется задолженность.
+    - first_id (BigIntegerField): Первый идентификатор сети в обрабатываемом диапазоне.
+    - last_id (BigIntegerField): Последний идентификатор сети в обрабатываемом диапазоне.
+    - chunk_size (PositiveIntegerField): Размер пакета идентификаторов, обрабатываемого в одной транзакции.
+    - is_dispatched (BooleanField): Признак распределения запуска между воркерами Celery.
+    - is_finished (BooleanField): Признак завершения запуска.
+    - created_at (DateTimeField): Время начала запуска.
+    - finished_at (DateTimeField): Время завершения запуска. Может быть NULL.
+
+    Методы:
+    - get_change(): Возвращает изменение задолженности со знаком в зависимости от задачи.
+    - get_chunk_starts(): Возвращает начальные идентификаторы всех пакетов запуска.
+    - get_source(): Возвращает источник операций журнала задолженности, создаваемых запуском.
+    """
+    INCREASE = 'increase_debt'
+    DECREASE = 'decrease_debt'
+
+    TASK_CHOICES = (
+        (INCREASE, 'Увеличение задолженности'),
+        (DECREASE, 'Уменьшение задолженности'),
+    )
+
+    task_name = models.CharField(max_length=30, choices=TASK_CHOICES, verbose_name='задача')
+    slot = models.DateTimeField(verbose_name='слот расписания')
+    task_id = models.CharField(max_length=255, verbose_name='id задачи Celery', db_index=True, **NULLABLE)
+    amount = models.PositiveIntegerField(verbose_name='сумма изменения')
+    first_id = models.BigIntegerField(verbose_name='первый id сети')
+    last_id = models.BigIntegerField(verbose_name='последний id сети')
+    chunk_size = models.PositiveIntegerField(verbose_name='размер пакета')
+    is_dispatched = models.BooleanField(default=False, verbose_name='распределён')
+    is_finished = models.BooleanField(default=False, verbose_name='завершён')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='время запуска')
+    finished_at = models.DateTimeField(verbose_name='время завершения', **NULLABLE)
+
+    def get_change(self):
+        return -self.amount if self.task_name == self.DECREASE else self.amount
+
+    def get_chunk_starts(self):
+        return range(self.first_id, self.last_id + 1, self.chunk_size)
+
+    def get_source(self):
+        return DebtTransaction.DAILY_DECREASE if self.task_name == self.DECREASE else DebtTransaction.BEAT_INCREASE
+
+    def __str__(self):
+        return f'{self.task_name} на {self.amount} ({self.slot})'
+
+    class Meta:
+        verbose_name = 'запуск задачи задолженности'
+        verbose_name_plural = 'запуски задач задолженности'
+        constraints = [
+            models.UniqueConstraint(fields=('task_name', 'slot'), name='unique_debt_task_run_slot'),
+        ]
+
+
+class DebtTaskChunk(models.Model):
+    """
+    Модель для учёта пакетов, уже применённых в рамках запуска задачи задолженности.
+
+    Запись создаётся в той же транзакции, что и обновление задолженности пакета, поэтому уникальность пары
+    (запуск, начальный id) гарантирует, что пакет не будет применён дважды.
+
+    Атрибуты:
+    - run (ForeignKey): Запуск задачи, к которому относится пакет.
+    - start_id (BigIntegerField): Начальный идентификатор сети пакета (включительно).
+    - end_id (BigIntegerField): Конечный идентификатор сети пакета (не включительно).
+    - updated_count (PositiveIntegerField): Количество сетей, задолженность которых изменена в пакете.
+    - created_at (DateTimeField): Время применения пакета.
+    """
+    run = models.ForeignKey(DebtTaskRun, on_delete=models.CASCADE, verbose_name='запуск', related_name='chunks')
+    start_id = models.BigIntegerField(verbose_name='начальный id сети')
+    end_id = models.BigIntegerField(verbose_name='конечный id сети')
+    updated_count = models.PositiveIntegerField(default=0, verbose_name='обновлено сетей')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='время применения')
+
+    def __str__(self):
+        return f'{self.run_id}: [{self.start_id}, {self.end_id})'
+
+    class Meta:
+        verbose_name = 'пакет задачи задолженности'
+        verbose_name_plural = 'пакеты задач задолженности'
+        constraints = [
+            models.UniqueConstraint(fields=('run', 'start_id'), name='unique_debt_task_chunk'),
+        ]
+
+
+class DebtTransaction(models.Model):
+    """
+    Модель журнала операций по задолженности сети.
+
+    Журнал только дополняется: все источники изменения задолженности (периодические задачи, очистка из админки,
+    ручные изменения) добавляют операции, не блокируя строки сетей. Функция rollup_debt периодически сводит
+    неприменённые операции в поле Network.debt, которое и читают API-представления.
+
+    Атрибуты:
+    - network (ForeignKey): Сеть, задолженность которой изменяется.
+    - amount (DecimalField): Изменение задолженности со знаком.
+    - source (CharField): Источник операции. Может быть одним из предопределенных вариантов.
+    - run (ForeignKey): Запуск периодической задачи, создавший операцию. Может быть NULL.
+    - is_applied (BooleanField): Признак того, что операция уже сведена в Network.debt.
+    - created_at (DateTimeField): Время создания операции.
+    """
+    BEAT_INCREASE = 'beat_increase'
+    DAILY_DECREASE = 'daily_decrease'
+    ADMIN_CLEAR = 'admin_clear'
+    MANUAL = 'manual'
+
+    SOURCE_CHOICES = (
+        (BEAT_INCREASE, 'Периодическое увеличение'),
+        (DAILY_DECREASE, 'Ежедневное уменьшение'),
+        (ADMIN_CLEAR, 'Очистка из админки'),
+        (MANUAL, 'Ручное изменение'),
+    )
+
+    network = models.ForeignKey(Network, on_delete=models.CASCADE, verbose_name='сеть',
+                                related_name='debt_transactions')
+    amount = models.DecimalField(max_digits=20, decimal_places=2, verbose_name='изменение задолженности')
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, verbose_name='источник')
+    run = models.ForeignKey(DebtTaskRun, on_delete=models.SET_NULL, verbose_name='запуск задачи',
+                            related_name='transactions', **NULLABLE)
+    is_applied = models.BooleanField(default=False, verbose_name='сведена')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='время создания')
+
+    def __str__(self):
+        return f'{self.network_id}: {self.amount} ({self.source})'
+
+    class Meta:
+        verbose_name = 'операция по задолженности'
+        verbose_name_plural = 'операции по задолженности'
+        indexes = [
+            models.Index(fields=('id',), condition=models.Q(is_applied=False), name='debt_transaction_pending_idx'),
+        ]
+
+
+class NetworkDebtHistory(models.Model):
+    """
+    Модель для хранения истории задолженности сети.
+
+    Вместо отдельной строки на каждый снимок история хранится компактно: одна строка на сеть и сутки, а значения
+    задолженности и моменты снимков накапливаются в параллельных массивах. Снимки добавляются задачами
+    задолженности после каждого запуска.
+
+    Атрибуты:
+    - network (ForeignKey): Сеть, к которой относится история.
+    - day (DateField): Сутки (UTC), за которые накоплены снимки.
+    - timestamps (ArrayField): Моменты снимков.
+    - debts (ArrayField): Значения задолженности в моменты снимков.
+    """
+    network = models.ForeignKey(Network, on_delete=models.CASCADE, verbose_name='сеть', related_name='debt_history')
+    day = models.DateField(verbose_name='сутки')
+    timestamps = ArrayField(models.DateTimeField(), default=list, verbose_name='моменты снимков')
+    debts = ArrayField(models.DecimalField(max_digits=20, decimal_places=2), default=list,
+                       verbose_name='значения задолженности')
+
+    def __str__(self):
+        return f'{self.network_id}: {self.day} ({len(self.debts)} снимков)'
+
+    class Meta:
+        verbose_name = 'история задолженности'
+        verbose_name_plural = 'история задолженности'
+        constraints = [
+            models.UniqueConstraint(fields=('network', 'day'), name='unique_network_debt_history_day'),
+        ]
+
+
+class SubtreeDebtRollup(models.Model):
+    """
+    Модель для кэшированной сводки задолженности поддеревьев заводов.
+
+    Для каждого завода хранит агрегаты задолженности всей нижележащей цепочки поставок в разрезе уровня
+    в иерархии и типа сети. Сводка пересчитывается задачами задолженности после каждого запуска.
+
+    Атрибуты:
+    - root (ForeignKey): Завод, являющийся корнем поддерева.
+    - network_level (IntegerField): Уровень сетей в иерархии.
+    - network_type (CharField): Тип сетей.
+    - total_debt (DecimalField): Суммарная задолженность сетей.
+    - average_debt (DecimalField): Средняя задолженность сетей.
+    - max_debt (DecimalField): Максимальная задолженность сетей.
+    - network_count (PositiveIntegerField): Количество сетей.
+    - refreshed_at (DateTimeField): Время пересчёта сводки.
+    """
+    root = models.ForeignKey(Network, on_delete=models.CASCADE, verbose_name='завод', related_name='subtree_debt')
+    network_level = models.IntegerField(verbose_name='уровень в иерархии')
+    network_type = models.CharField(max_length=35, choices=Network.NETWORK_CHOICES, verbose_name='тип сети')
+    total_debt = models.DecimalField(max_digits=20, decimal_places=2, verbose_name='суммарная задолженность')
+    average_debt = models.DecimalField(max_digits=20, decimal_places=2, verbose_name='средняя задолженность')
+    max_debt = models.DecimalField(max_digits=20, decimal_places=2, verbose_name='максимальная задолженность')
+    network_count = models.PositiveIntegerField(verbose_name='количество сетей')
+    refreshed_at = models.DateTimeField(verbose_name='время пересчёта')
+
+    def __str__(self):
+        return f'{self.root_id}: {self.network_type}, уровень {self.network_level}'
+
+    class Meta:
+        verbose_name = 'сводка задолженности поддерева'
+        verbose_name_plural = 'сводки задолженности поддеревьев'
+
+
+class DebtStatistics(models.Model):
+    """
+    Модель для статистики задолженности всех сетей (единственная строка).
+
+    Сумма задолженности и количество сетей поддерживаются инкрементально: изменения при сводке журнала
+    задолженности, создании и удалении сетей накапливаются в DebtStatisticsDelta и переносятся в статистику задачами
+    задолженности. Пороговые значения перцентилей задолженности пересчитываются после каждого запуска задач
+    задолженности. Статистика позволяет фильтровать сети по средней задолженности и другим порогам без агрегации
+    всей таблицы сетей.
+
+    Атрибуты:
+    - total_debt (DecimalField): Суммарная задолженность всех сетей.
+    - network_count (BigIntegerField): Количество сетей.
+    - debt_percentiles (ArrayField): Пороговые значения задолженности для перцентилей от 0 до 100.
+    - percentiles_refreshed_at (DateTimeField): Время пересчёта перцентилей. Может быть NULL.
+    """
+    total_debt = models.DecimalField(max_digits=24, decimal_places=2, default=0, verbose_name='суммарная задолженность')
+    network_count = models.BigIntegerField(default=0, verbose_name='количество сетей')
+    debt_percentiles = ArrayField(models.DecimalField(max_digits=20, decimal_places=2), default=list,
+                                  verbose_name='перцентили задолженности')
+    percentiles_refreshed_at = models.DateTimeField(verbose_name='время пересчёта перцентилей', **NULLABLE)
+
+    def __str__(self):
+        return f'Задолженность {self.total_debt} у {self.network_count} сетей'
+
+    class Meta:
+        verbose_name = 'статистика задолженности'
+        verbose_name_plural = 'статистика задолженности'
+
+
+class DebtStatisticsDelta(models.Model):
+    """
+    Модель для изменения статистики задолженности, ещё не перенесённого в DebtStatistics.
+
+    Транзакции, изменяющие задолженность или набор сетей, добавляют строку с изменением, а не обновляют единственную
+    строку DebtStatistics, поэтому не ждут друг друга на её блокировке. Накопленные изменения переносятся
+    в статистику и удаляются задачами задолженности.
+
+    Атрибуты:
+    - debt_change (DecimalField): Изменение суммарной задолженности.
+    - count_change (IntegerField): Изменение количества сетей.
+    """
+    debt_change = models.DecimalField(max_digits=24, decimal_places=2, default=0,
+                                      verbose_name='изменение суммарной задолженности')
+    count_change = models.IntegerField(default=0, verbose_name='изменение количества сетей')
+
+    def __str__(self):
+        return f'Задолженность {self.debt_change:+}, сетей {self.count_change:+}'
+
+    class Meta:
+        verbose_name = 'изменение статистики задолженности'
+        verbose_name_plural = 'изменения статистики задолженности'
+
+
+class NetworkDebtCube(models.Model):
+    """
+    Модель материализованного представления с агрегатами задолженности сетей (только для чтения).
+
+    Представление содержит агрегаты задолженности для всех сочетаний группировки по стране, городу, типу сети
+    и уровню в иерархии (`GROUP BY CUBE`). Измерения, по которым строка не группирует сети, равны NULL,
+    а набор измерений строки задаёт битовая маска grouping. Представление создаётся миграцией и обновляется
+    без блокировки чтения после каждого запуска задач задолженности, поэтому аналитические запросы
+    не обращаются к таблице сетей.
+
+    Атрибуты:
+    - id (TextField): Ключ строки — значения измерений в виде JSON-массива.
+    - grouping (IntegerField): Битовая маска измерений, по которым строка не группирует сети (функция GROUPING).
+    - country (CharField): Страна. Может быть NULL.
+    - city (CharField): Город. Может быть NULL.
+    - network_type (CharField): Тип сети. Может быть NULL.
+    - network_level (IntegerField): Уровень в иерархии. Может быть NULL.
+    - network_count (BigIntegerField): Количество сетей.
+    - total_debt (DecimalField): Суммарная задолженность.
+    - average_debt (DecimalField): Средняя задолженность.
+    - min_debt (DecimalField): Минимальная задолженность.
+    - max_debt (DecimalField): Максимальная задолженность.
+    - median_debt (DecimalField): Медиана задолженности.
+    - p90_debt (DecimalField): 90-й перцентиль задолженности.
+    """
+    id = models.TextField(primary_key=True, verbose_name='ключ')
+    grouping = models.IntegerField(verbose_name='маска группировки')
+    country = models.CharField(max_length=40, verbose_name='страна', **NULLABLE)
+    city = models.CharField(max_length=40, verbose_name='город', **NULLABLE)
+    network_type = models.CharField(max_length=35, choices=Network.NETWORK_CHOICES, verbose_name='тип сети',
+                                    **NULLABLE)
+    network_level = models.IntegerField(verbose_name='уровень в иерархии', **NULLABLE)
+    network_count = models.BigIntegerField(verbose_name='количество сетей')
+    total_debt = models.DecimalField(max_digits=24, decimal_places=2, verbose_name='суммарная задолженность',
+                                     **NULLABLE)
+    average_debt = models.DecimalField(max_digits=20, decimal_places=2, verbose_name='средняя задолженность',
+                                       **NULLABLE)
+    min_debt = models.DecimalField(max_digits=20, decimal_places=2, verbose_name='минимальная задолженность',
+                                   **NULLABLE)
+    max_debt = models.DecimalField(max_digits=20, decimal_places=2, verbose_name='максимальная задолженность',
+                                   **NULLABLE)
+    median_debt = models.DecimalField(max_digits=20, decimal_places=2, verbose_name='медиана задолженности',
+                                      **NULLABLE)
+    p90_debt = models.DecimalField(max_digits=20, decimal_places=2, verbose_name='90-й перцентиль задолженности',
+                                   **NULLABLE)
+
+    def __str__(self):
+        return self.id
+
+    class Meta:
+        managed = False
+        db_table = 'trading_networks_network_debt_cube'
+        verbose_name = 'агрегаты задолженности'
+        verbose_name_plural = 'агрегаты задолженности'
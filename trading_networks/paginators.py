@@ -1,11 +1,131 @@
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPaginationMixin:
+    """
+    Миксин, добавляющий к пагинатору по номерам страниц режим пагинации по курсору (keyset).
+
+    Режим включается параметром запроса `pagination=cursor` или наличием параметра `cursor`. Страница выбирается
+    условием по значениям полей сортировки последнего объекта предыдущей страницы, а не смещением OFFSET,
+    и количество объектов не подсчитывается, поэтому стоимость страницы не зависит от её глубины. Сортировка
+    берётся из QuerySet после фильтрации, поэтому режим совместим с OrderingFilter; первичный ключ добавляется
+    в конец сортировки, чтобы набор ключей был уникальным. Поля сортировки не должны принимать значение NULL.
+    Страница может состоять из объектов модели или из строк QuerySet.values(), содержащих поля сортировки.
+    Без параметров используется пагинация по номерам страниц.
+
+    Атрибуты:
+    - pagination_query_param (str): Параметр запроса для выбора режима пагинации.
+    - cursor_query_param (str): Параметр запроса с курсором.
+    - invalid_cursor_message (str): Сообщение об ошибке для неверного курсора.
+
+    Методы:
+    - paginate_queryset(queryset, request, view=None): Возвращает страницу объектов в выбранном режиме.
+    - get_paginated_response(data): Возвращает ответ со ссылками на соседние страницы.
+    """
+    pagination_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = (request.query_params.get(self.pagination_query_param) == 'cursor'
+                           or self.cursor_query_param in request.query_params)
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.keys = self.get_keys(queryset)
+        values, reverse = self.decode_cursor(request)
+        page_size = self.get_page_size(request)
+
+        ordering = [('-' if descending != reverse else '') + field for field, descending in self.keys]
+        if values is not None:
+            queryset = queryset.filter(self.get_keyset_filter(values, reverse))
+        rows = list(queryset.order_by(*ordering)[:page_size + 1])
+
+        has_more = len(rows) > page_size
+        page = rows[:page_size]
+        if reverse:
+            page.reverse()
+        self.has_next = has_more if not reverse else True
+        self.has_previous = has_more if reverse else values is not None
+        self.page = page
+        return page
 
+    def get_keys(self, queryset):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        keys = []
+        for field in ordering:
+            if not isinstance(field, str):
+                raise NotFound('Сортировка не поддерживает пагинацию по курсору.')
+            keys.append((field.lstrip('-'), field.startswith('-')))
+        if not any(field in ('pk', queryset.model._meta.pk.name) for field, _ in keys):
+            keys.append(('pk', False))
+        return keys
 
-class NetworkPaginator(PageNumberPagination):
+    def get_keyset_filter(self, values, reverse):
+        conditions = []
+        for position, (field, descending) in enumerate(self.keys):
+            lookup = 'lt' if descending != reverse else 'gt'
+            equal = {key: value for (key, _), value in zip(self.keys[:position], values)}
+            conditions.append(Q(**equal, **{f'{field}__{lookup}': values[position]}))
+        return reduce(or_, conditions)
+
+    def get_key_values(self, obj):
+        if isinstance(obj, dict):
+            return [obj[field] for field, _ in self.keys]
+        values = []
+        for field, _ in self.keys:
+            value = obj
+            for attribute in field.split('__'):
+                value = getattr(value, attribute)
+            values.append(value)
+        return values
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            values, reverse = payload['v'], bool(payload['r'])
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.keys):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def encode_cursor(self, obj, reverse):
+        payload = json.dumps({'v': self.get_key_values(obj), 'r': int(reverse)}, cls=DjangoJSONEncoder)
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        url = replace_query_param(url, self.pagination_query_param, 'cursor')
+        return replace_query_param(url, self.cursor_query_param, base64.urlsafe_b64encode(payload.encode()).decode())
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.encode_cursor(self.page[-1], reverse=False) if self.has_next and self.page else None,
+            'previous': self.encode_cursor(self.page[0], reverse=True) if self.has_previous and self.page else None,
+            'results': data,
+        })
+
+
+class NetworkPaginator(KeysetPaginationMixin, PageNumberPagination):
     """
     Пагинатор для списка сетей.
 
-    Данный пагинатор управляет пагинацией в API, позволяя разбивать наборы данных на страницы.
+    Данный пагинатор управляет пагинацией в API, позволяя разбивать наборы данных на страницы. Помимо номеров
+    страниц поддерживает пагинацию по курсору (`?pagination=cursor`), см. KeysetPaginationMixin.
 
     Атрибуты:
     - page_size (int): Количество объектов на странице. По умолчанию 15.
@@ -15,3 +135,17 @@ class NetworkPaginator(PageNumberPagination):
     page_size = 15
     page_size_query_param = 'page_size'
     max_page_size = 30
+
+
+class DebtBreakdownPaginator(PageNumberPagination):
+    """
+    Пагинатор для агрегатов задолженности по измерениям сетей.
+
+    Атрибуты:
+    - page_size (int): Количество строк на странице. По умолчанию 50.
+    - page_size_query_param (str): Параметр запроса для указания количества строк на странице.
+    - max_page_size (int): Максимально допустимое количество строк на странице.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
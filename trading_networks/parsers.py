@@ -0,0 +1,41 @@
+import codecs
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Парсер потока NDJSON: каждая непустая строка тела запроса содержит один объект JSON.
+
+    Тело запроса читается построчно, поэтому большой пакет не нужно целиком загружать в память в виде строки.
+
+    Возвращает:
+    - list: Объекты в порядке строк.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return []
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            reader = codecs.getreader(encoding)(stream)
+        except LookupError:
+            raise ParseError(f'Неизвестная кодировка {encoding}')
+
+        items, number = [], 0
+        try:
+            # Строки декодируются при чтении, поэтому ошибка декодирования возникает в заголовке цикла
+            for number, line in enumerate(reader, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    items.append(json.loads(line))
+                except ValueError as error:
+                    raise ParseError(f'Строка {number}: некорректный JSON - {error}')
+        except UnicodeDecodeError as error:
+            raise ParseError(f'После строки {number}: некорректные данные в кодировке {encoding} - {error}')
+        return items
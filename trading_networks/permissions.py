@@ -1,5 +1,40 @@
+from django.conf import settings
 from rest_framework.permissions import BasePermission
 
+from trading_networks.cache import get_employee_network_ids
+from trading_networks.models import Network
+
+
+def is_network_employee(request, network_id):
+    """
+    Проверяет, что пользователь запроса является сотрудником сети.
+
+    Членство проверяется запросом EXISTS по уникальному индексу (сеть, пользователь) промежуточной таблицы
+    сотрудников, а при включённой настройке EMPLOYEE_NETWORKS_CACHE_ENABLED — по кэшу идентификаторов сетей
+    пользователя. Результат запоминается в запросе, поэтому повторные проверки той же сети не обращаются
+    ни к базе данных, ни к кэшу.
+
+    Аргументы:
+    - request (Request): Запрос.
+    - network_id (int): Идентификатор сети.
+
+    Возвращает:
+    - bool: True, если пользователь является сотрудником сети.
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return False
+    memo = getattr(request, '_network_membership', None)
+    if memo is None:
+        memo = request._network_membership = {}
+    if network_id not in memo:
+        if settings.EMPLOYEE_NETWORKS_CACHE_ENABLED:
+            memo[network_id] = network_id in get_employee_network_ids(user.pk)
+        else:
+            memo[network_id] = Network.employees.through.objects.filter(network_id=network_id,
+                                                                        user_id=user.pk).exists()
+    return memo[network_id]
+
 
 class IsSuperUser(BasePermission):
     """
@@ -38,7 +73,12 @@ class IsCompanyEmployee(BasePermission):
     Разрешение, позволяющее доступ только сотрудникам компании (Network).
 
     Доступ разрешен только в том случае, если пользователь является сотрудником объекта сети, к которому обращается.
+    Сотрудники сети не загружаются: членство проверяется функцией is_network_employee.
+
+    Атрибуты:
+    - message (str): Сообщение об ошибке, отображаемое при отказе в доступе.
     """
+    message = 'Вы не являетесь сотрудником компании, данные которой хотите получить!'
 
     def has_object_permission(self, request, view, obj):
-        return request.user in obj.employees.all()
+        return is_network_employee(request, obj.pk)
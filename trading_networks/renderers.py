@@ -0,0 +1,25 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Рендерер JSON, использующий библиотеку orjson, если она установлена.
+
+    Вывод совпадает с компактным выводом JSONRenderer: типы, которые orjson не сериализует сам (например,
+    ленивые строки переводов в сообщениях об ошибках), преобразуются кодировщиком DRF, а символы U+2028 и U+2029
+    экранируются. Без orjson, а также
+    при запросе отформатированного вывода (параметр indent в заголовке Accept), используется JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        content = orjson.dumps(data, default=JSONEncoder().default)
+        # Как и JSONRenderer, экранируем разделители строк, недопустимые в строках JavaScript
+        return content.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
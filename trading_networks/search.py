@@ -0,0 +1,50 @@
+from functools import reduce
+from operator import or_
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Q
+from django.db.models.functions import Greatest
+
+from trading_networks.models import Network
+
+NETWORK_SEARCH_FIELDS = ('network_name', 'country', 'city', 'street')
+# В админ-панели сети ищутся и по названию поставщика. Поставщик — тоже сеть, поэтому для его названия есть индекс
+# триграмм названия сети; поставщик присоединяется к сети (LEFT JOIN по supplier_id)
+ADMIN_NETWORK_SEARCH_FIELDS = NETWORK_SEARCH_FIELDS + ('supplier__network_name',)
+
+
+def trigram_search(queryset, query, fields):
+    """
+    Ищет объекты по сходству триграмм строки запроса со словами заданных полей и ранжирует результаты.
+
+    Условие `поле %> запрос` для каждого поля выполняется по GIN-индексу триграмм этого поля (gin_trgm_ops),
+    а ранг равен наибольшему сходству запроса со словами полей, поэтому поиск устойчив к опечаткам и подходит
+    для автодополнения по началу слова.
+
+    Аргументы:
+    - queryset (QuerySet): Исходный QuerySet.
+    - query (str): Строка поиска.
+    - fields (tuple): Поля, по которым выполняется поиск. Для каждого поля должен существовать индекс триграмм.
+
+    Возвращает:
+    - QuerySet: Найденные объекты с аннотацией rank, упорядоченные по убыванию ранга.
+    """
+    condition = reduce(or_, (Q(**{f'{field}__trigram_word_similar': query}) for field in fields))
+    similarities = [TrigramWordSimilarity(query, field) for field in fields]
+    rank = Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+    return queryset.filter(condition).annotate(rank=rank).order_by('-rank', 'pk')
+
+
+def search_networks(query, queryset=None, fields=NETWORK_SEARCH_FIELDS):
+    """
+    Ищет сети по названию и адресу.
+
+    Аргументы:
+    - query (str): Строка поиска.
+    - queryset (QuerySet): Необязательный исходный QuerySet сетей.
+    - fields (tuple): Поля поиска; по умолчанию NETWORK_SEARCH_FIELDS.
+
+    Возвращает:
+    - QuerySet: Найденные сети с аннотацией rank, упорядоченные по убыванию ранга.
+    """
+    return trigram_search(Network.objects.all() if queryset is None else queryset, query, fields)
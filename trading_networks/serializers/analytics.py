@@ -0,0 +1,111 @@
+from rest_framework import serializers
+
+from trading_networks.analytics import DEBT_DIMENSIONS, DEBT_METRICS
+from trading_networks.models import Network
+
+
+class SubtreeDebtBreakdownSerializer(serializers.Serializer):
+    """
+    Сериализатор для строки разбивки задолженности поддерева по уровню в иерархии и типу сети.
+
+    Атрибуты:
+    - network_level (IntegerField): Уровень сетей в иерархии.
+    - network_type (CharField): Тип сетей.
+    - total_debt (DecimalField): Суммарная задолженность.
+    - average_debt (DecimalField): Средняя задолженность.
+    - max_debt (DecimalField): Максимальная задолженность.
+    - network_count (IntegerField): Количество сетей.
+    """
+    network_level = serializers.IntegerField()
+    network_type = serializers.ChoiceField(choices=Network.NETWORK_CHOICES)
+    total_debt = serializers.DecimalField(max_digits=20, decimal_places=2)
+    average_debt = serializers.DecimalField(max_digits=20, decimal_places=2)
+    max_debt = serializers.DecimalField(max_digits=20, decimal_places=2)
+    network_count = serializers.IntegerField()
+
+
+class SubtreeDebtSerializer(serializers.Serializer):
+    """
+    Сериализатор для сводки задолженности поддерева завода.
+
+    Атрибуты:
+    - root (IntegerField): Идентификатор завода.
+    - network_name (CharField): Название завода.
+    - total_debt (DecimalField): Суммарная задолженность поддерева.
+    - average_debt (DecimalField): Средняя задолженность поддерева.
+    - max_debt (DecimalField): Максимальная задолженность в поддереве.
+    - network_count (IntegerField): Количество сетей в поддереве.
+    - breakdown (SubtreeDebtBreakdownSerializer): Разбивка по уровню в иерархии и типу сети.
+    """
+    root = serializers.IntegerField()
+    network_name = serializers.CharField()
+    total_debt = serializers.DecimalField(max_digits=20, decimal_places=2)
+    average_debt = serializers.DecimalField(max_digits=20, decimal_places=2)
+    max_debt = serializers.DecimalField(max_digits=20, decimal_places=2)
+    network_count = serializers.IntegerField()
+    breakdown = SubtreeDebtBreakdownSerializer(many=True)
+
+
+class DebtBreakdownQuerySerializer(serializers.Serializer):
+    """
+    Сериализатор для параметров запроса агрегатов задолженности по измерениям сетей.
+
+    Атрибуты:
+    - group_by (CharField): Измерения группировки через запятую: country, city, network_type, network_level.
+    Без параметра возвращаются итоги по всем сетям.
+    - country (CharField): Необязательный фильтр по стране.
+    - city (CharField): Необязательный фильтр по городу.
+    - network_type (ChoiceField): Необязательный фильтр по типу сети.
+    - network_level (IntegerField): Необязательный фильтр по уровню в иерархии.
+    - ordering (ChoiceField): Необязательная сортировка по измерению группировки или показателю, `-` — по убыванию.
+    """
+    group_by = serializers.CharField(required=False, allow_blank=True, default='')
+    country = serializers.CharField(required=False, max_length=40)
+    city = serializers.CharField(required=False, max_length=40)
+    network_type = serializers.ChoiceField(choices=Network.NETWORK_CHOICES, required=False)
+    network_level = serializers.IntegerField(required=False, min_value=0)
+    ordering = serializers.ChoiceField(choices=[prefix + field for field in (*DEBT_DIMENSIONS, *DEBT_METRICS)
+                                                for prefix in ('', '-')], required=False)
+
+    def validate_group_by(self, value):
+        group_by = list(dict.fromkeys(dimension.strip() for dimension in value.split(',') if dimension.strip()))
+        unknown = [dimension for dimension in group_by if dimension not in DEBT_DIMENSIONS]
+        if unknown:
+            raise serializers.ValidationError(f'Неизвестные измерения: {", ".join(unknown)}. '
+                                              f'Допустимые: {", ".join(DEBT_DIMENSIONS)}.')
+        return group_by
+
+    def validate(self, attrs):
+        ordering = attrs.get('ordering')
+        if ordering and ordering.lstrip('-') in DEBT_DIMENSIONS and ordering.lstrip('-') not in attrs['group_by']:
+            raise serializers.ValidationError({'ordering': 'Сортировать можно только по измерениям группировки.'})
+        return attrs
+
+
+class DebtBreakdownSerializer(serializers.Serializer):
+    """
+    Сериализатор для строки агрегатов задолженности по измерениям сетей.
+
+    Поля измерений присутствуют в ответе, только если по ним выполнена группировка.
+
+    Атрибуты:
+    - country, city, network_type, network_level: Значения измерений группировки.
+    - network_count (IntegerField): Количество сетей.
+    - total_debt (DecimalField): Суммарная задолженность.
+    - average_debt (DecimalField): Средняя задолженность.
+    - min_debt (DecimalField): Минимальная задолженность.
+    - max_debt (DecimalField): Максимальная задолженность.
+    - median_debt (DecimalField): Медиана задолженности.
+    - p90_debt (DecimalField): 90-й перцентиль задолженности.
+    """
+    country = serializers.CharField(required=False)
+    city = serializers.CharField(required=False)
+    network_type = serializers.ChoiceField(choices=Network.NETWORK_CHOICES, required=False)
+    network_level = serializers.IntegerField(required=False)
+    network_count = serializers.IntegerField()
+    total_debt = serializers.DecimalField(max_digits=24, decimal_places=2, allow_null=True)
+    average_debt = serializers.DecimalField(max_digits=20, decimal_places=2, allow_null=True)
+    min_debt = serializers.DecimalField(max_digits=20, decimal_places=2, allow_null=True)
+    max_debt = serializers.DecimalField(max_digits=20, decimal_places=2, allow_null=True)
+    median_debt = serializers.DecimalField(max_digits=20, decimal_places=2, allow_null=True)
+    p90_debt = serializers.DecimalField(max_digits=20, decimal_places=2, allow_null=True)
@@ -0,0 +1,70 @@
+from rest_framework import serializers
+
+from trading_networks.models import Network
+from trading_networks.validators import validate_network_supplier, validate_supplier_for_factory, \
+    validate_supplier_hierarchy
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Поле первичного ключа, которое ищет связанный объект среди объектов, заранее загруженных для всего пакета.
+
+    Объекты передаются в контексте сериализатора в словаре bulk_objects вида {модель: {pk: объект}}, поэтому
+    проверка связей пакета не выполняет отдельный запрос на каждое значение.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        instance = self.context['bulk_objects'][self.queryset.model].get(pk)
+        if instance is None:
+            self.fail('does_not_exist', pk_value=data)
+        return instance
+
+
+class NetworkBulkItemSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для сети в пакетном создании и изменении сетей.
+
+    Проверяет сеть теми же валидаторами, что и NetworkSerializer. Новая сеть может ссылаться на поставщика,
+    создаваемого в том же пакете: поле ref задаёт сети ссылку внутри пакета, а поле supplier_ref указывает ссылку
+    поставщика. Уровень такого поставщика ещё неизвестен, поэтому его проверяет функция bulk_save_networks.
+
+    Атрибуты:
+    - serializer_related_field: Поле связей, проверяемое по заранее загруженным объектам пакета.
+    - ref (CharField): Ссылка на сеть внутри пакета.
+    - supplier_ref (CharField): Ссылка на поставщика, создаваемого в том же пакете.
+
+    Методы:
+    - __init__(self, *args, **kwargs): Делает поле 'debt' только для чтения, если экземпляр уже существует.
+    - validate(self, data): Проводит валидацию данных сети и её поставщика.
+    """
+    serializer_related_field = BulkPrimaryKeyRelatedField
+
+    ref = serializers.CharField(max_length=50, required=False)
+    supplier_ref = serializers.CharField(max_length=50, required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['debt'].read_only = bool(self.instance)
+
+    def validate(self, data):
+        if 'supplier_ref' in data:
+            if self.instance:
+                raise serializers.ValidationError("Ссылку на поставщика из пакета можно указать только новой сети")
+            if data.get('supplier'):
+                raise serializers.ValidationError("Укажите либо supplier, либо supplier_ref")
+        validate_supplier_for_factory({**data, 'supplier': data.get('supplier') or data.get('supplier_ref')})
+        data = validate_network_supplier(data)
+        if self.instance:
+            data = validate_supplier_hierarchy(self.instance, data)
+        return data
+
+    class Meta:
+        model = Network
+        fields = ('pk', 'network_type', 'network_name', 'email', 'country', 'city', 'street', 'house_number',
+                  'products', 'employees', 'supplier', 'debt', 'ref', 'supplier_ref',)
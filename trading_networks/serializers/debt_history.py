@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import serializers
+
+
+class DebtHistoryQuerySerializer(serializers.Serializer):
+    """
+    Сериализатор для параметров запроса истории задолженности.
+
+    Атрибуты:
+    - date_from (DateTimeField): Начало диапазона. По умолчанию 30 дней до конца диапазона.
+    - date_to (DateTimeField): Конец диапазона. По умолчанию текущий момент.
+    - buckets (IntegerField): Количество интервалов, до которого сжимается история. От 1 до 1000, по умолчанию 100.
+
+    Методы:
+    - validate(self, data): Подставляет значения по умолчанию и проверяет, что начало диапазона раньше конца.
+    """
+    date_from = serializers.DateTimeField(required=False)
+    date_to = serializers.DateTimeField(required=False)
+    buckets = serializers.IntegerField(min_value=1, max_value=1000, default=100)
+
+    def validate(self, data):
+        data.setdefault('date_to', timezone.now())
+        data.setdefault('date_from', data['date_to'] - timedelta(days=30))
+        if data['date_from'] >= data['date_to']:
+            raise serializers.ValidationError("Начало диапазона должно быть раньше его конца")
+        return data
+
+
+class DebtHistoryBucketSerializer(serializers.Serializer):
+    """
+    Сериализатор для интервала истории задолженности.
+
+    Атрибуты:
+    - start (DateTimeField): Начало интервала.
+    - end (DateTimeField): Конец интервала.
+    - min (DecimalField): Минимальная задолженность в интервале.
+    - max (DecimalField): Максимальная задолженность в интервале.
+    - avg (DecimalField): Средняя задолженность в интервале.
+    - count (IntegerField): Количество снимков в интервале.
+    """
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+    min = serializers.DecimalField(max_digits=20, decimal_places=2)
+    max = serializers.DecimalField(max_digits=20, decimal_places=2)
+    avg = serializers.DecimalField(max_digits=20, decimal_places=2)
+    count = serializers.IntegerField()
@@ -0,0 +1,16 @@
+from rest_framework import serializers
+
+
+class DebtThresholdQuerySerializer(serializers.Serializer):
+    """
+    Сериализатор для параметров запроса сетей с задолженностью выше порога.
+
+    Атрибуты:
+    - threshold (ChoiceField): Вид порога: 'average' — выше средней (по умолчанию), 'percentile' — не ниже
+    перцентиля, 'top' — сети с наибольшей задолженностью.
+    - percentile (IntegerField): Перцентиль для порога 'percentile'. От 0 до 100, по умолчанию 90.
+    - limit (IntegerField): Количество сетей для порога 'top'. От 1 до 10 000, по умолчанию 100.
+    """
+    threshold = serializers.ChoiceField(choices=('average', 'percentile', 'top'), default='average')
+    percentile = serializers.IntegerField(min_value=0, max_value=100, default=90)
+    limit = serializers.IntegerField(min_value=1, max_value=10000, default=100)
@@ -0,0 +1,14 @@
+from rest_framework import serializers
+
+from trading_networks.export import EXPORT_FORMATS, NDJSON
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    """
+    Сериализатор для параметров запроса выгрузки.
+
+    Атрибуты:
+    - export_format (ChoiceField): Формат выгрузки: 'ndjson' (по умолчанию) или 'csv'. Параметр не называется
+    `format`, так как этот параметр DRF использует для выбора рендерера.
+    """
+    export_format = serializers.ChoiceField(choices=EXPORT_FORMATS, default=NDJSON)
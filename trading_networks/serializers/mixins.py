@@ -0,0 +1,64 @@
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def parse_field_list(value):
+    """
+    Разбирает список полей из параметра запроса вида 'pk,network_name,debt'.
+
+    Возвращает:
+    - list: Названия полей в порядке указания без пустых значений и повторов.
+    """
+    return list(dict.fromkeys(name.strip() for name in (value or '').split(',') if name.strip()))
+
+
+class SparseFieldsetMixin:
+    """
+    Миксин сериализатора для выбора полей ответа и встраивания связанных объектов.
+
+    При чтении (безопасные методы HTTP) параметр запроса `fields` оставляет в ответе только перечисленные поля,
+    а параметр `expand` заменяет перечисленные поля-идентификаторы вложенными представлениями связанных объектов.
+    Неизвестные поля приводят к ошибке валидации.
+
+    Атрибуты:
+    - fields_query_param (str): Параметр запроса со списком полей.
+    - expand_query_param (str): Параметр запроса со списком встраиваемых полей.
+    - expandable_fields (dict): Встраиваемые поля: название поля -> функция, создающая вложенный сериализатор.
+
+    Методы:
+    - get_requested_fields(): Возвращает названия полей, оставшихся в сериализаторе.
+    - get_expanded_fields(): Возвращает названия встроенных полей.
+    """
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._expanded_fields = []
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+
+        requested = parse_field_list(request.query_params.get(self.fields_query_param))
+        unknown = [name for name in requested if name not in self.fields]
+        if unknown:
+            raise serializers.ValidationError({self.fields_query_param: f'Неизвестные поля: {", ".join(unknown)}'})
+        if requested:
+            for name in set(self.fields) - set(requested):
+                self.fields.pop(name)
+
+        expand = parse_field_list(request.query_params.get(self.expand_query_param))
+        unknown = [name for name in expand if name not in self.expandable_fields]
+        if unknown:
+            raise serializers.ValidationError({self.expand_query_param: f'Неизвестные поля: {", ".join(unknown)}'})
+        for name in expand:
+            if name in self.fields:
+                self.fields[name] = self.expandable_fields[name]()
+                self._expanded_fields.append(name)
+
+    def get_requested_fields(self):
+        return list(self.fields)
+
+    def get_expanded_fields(self):
+        return list(self._expanded_fields)
@@ -1,26 +1,48 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 
-from trading_networks.models import Network
-from trading_networks.validators import validate_network_supplier, validate_supplier_for_factory
+from products.models import Product
+from products.serializers.product import ProductSerializer
+from trading_networks.models import DebtTransaction, Network
+from trading_networks.serializers.mixins import SparseFieldsetMixin
+from trading_networks.serializers.values import get_related_ordering
+from trading_networks.validators import validate_network_supplier, validate_supplier_for_factory, \
+    validate_supplier_hierarchy
+from users.models import User
 
 
-class NetworkSerializer(serializers.ModelSerializer):
+class NetworkSupplierSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор краткого представления поставщика, встраиваемого в сеть параметром `expand=supplier`.
+    """
+
+    class Meta:
+        model = Network
+        fields = ('pk', 'network_type', 'network_level', 'network_name', 'email', 'country', 'city')
+
+
+class NetworkSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Сериализатор для модели Network.
 
     Обеспечивает преобразование объектов Network в формат JSON и обратно, а также валидацию данных при создании
-    и обновлении сетей.
+    и обновлении сетей. При чтении поддерживает параметры запроса `fields` и `expand` (см. SparseFieldsetMixin):
+    поставщик и продукты могут быть встроены в ответ.
 
     Атрибуты:
     - serializer_class: Указывает, что этот сериализатор используется для модели Network.
+    - expandable_fields: Поля, которые можно встроить в ответ: поставщик и продукты.
 
     Методы:
     - __init__(self, *args, **kwargs): Инициализирует сериализатор, делая поле 'debt' только для чтения,
     если экземпляр уже существует.
     - update(self, instance, validated_data): Обновляет существующий объект Network, исключая поле 'debt' из данных для обновления.
-    - validate(self, data): Проводит валидацию данных, используя функции validate_supplier_for_factory и validate_network_supplier.
+    - validate(self, data): Проводит валидацию данных, используя функции validate_supplier_for_factory и validate_network_supplier,
+    а при обновлении — validate_supplier_hierarchy.
+    - setup_eager_loading(queryset): Ограничивает выборку запрошенными полями и добавляет предварительную загрузку
+    запрошенных связанных объектов, чтобы список сетей сериализовался постоянным количеством запросов.
     - create(self, validated_data): Создает новый объект Network, устанавливая уровень сети и задолженность
-    в зависимости от типа сети.
+    в зависимости от типа сети. Начальная задолженность фиксируется в журнале как уже сведённая ручная операция.
 
     Класс Meta:
     - model: Модель, с которой связан сериализатор.
@@ -28,13 +50,38 @@ class NetworkSerializer(serializers.ModelSerializer):
     - read_only_fields: Поля, которые доступны только для чтения.
     """
 
+    expandable_fields = {
+        'supplier': lambda: NetworkSupplierSerializer(read_only=True),
+        'products': lambda: ProductSerializer(many=True, read_only=True),
+    }
+
     def __init__(self, *args, **kwargs):
         super(NetworkSerializer, self).__init__(*args, **kwargs)
+        if 'debt' not in self.fields:
+            return
         if self.instance:
             self.fields['debt'].read_only = True
         else:
             self.fields['debt'].read_only = False
 
+    def setup_eager_loading(self, queryset):
+        requested = self.get_requested_fields()
+        expanded = self.get_expanded_fields()
+
+        # Выбираем только запрошенные столбцы и столбцы сортировки, нужные пагинации по курсору
+        ordering = [field.lstrip('-') for field in queryset.query.order_by if isinstance(field, str)]
+        concrete = {field.name for field in Network._meta.concrete_fields}
+        queryset = queryset.only('pk', *(name for name in requested + ordering if name in concrete))
+
+        if 'supplier' in expanded:
+            suppliers = Network.objects.only(*NetworkSupplierSerializer.Meta.fields[1:])
+            queryset = queryset.prefetch_related(Prefetch('supplier', queryset=suppliers))
+        # Связанные объекты загружаются в том же порядке, что и в ValuesRepresentation
+        return queryset.prefetch_related(*(
+            Prefetch(name, queryset=model.objects.order_by(*get_related_ordering(model)))
+            for name, model in (('products', Product), ('employees', User)) if name in requested
+        ))
+
     def update(self, instance, validated_data):
         validated_data.pop('debt', None)
         return super().update(instance, validated_data)
@@ -42,6 +89,8 @@ class NetworkSerializer(serializers.ModelSerializer):
     def validate(self, data):
         data = validate_supplier_for_factory(data)
         data = validate_network_supplier(data)
+        if self.instance:
+            data = validate_supplier_hierarchy(self.instance, data)
         return data
 
     def create(self, validated_data):
@@ -56,7 +105,11 @@ class NetworkSerializer(serializers.ModelSerializer):
                 validated_data['network_level'] = supplier.network_level + 1
             else:
                 validated_data['network_level'] = 1
-        return super().create(validated_data)
+        network = super().create(validated_data)
+        if network.debt:
+            DebtTransaction.objects.create(network=network, amount=network.debt, source=DebtTransaction.MANUAL,
+                                           is_applied=True)
+        return network
 
     class Meta:
 
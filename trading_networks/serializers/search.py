@@ -0,0 +1,29 @@
+from rest_framework import serializers
+
+from trading_networks.models import Network
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    """
+    Сериализатор для параметров поискового запроса.
+
+    Атрибуты:
+    - q (CharField): Строка поиска. От 2 до 100 символов.
+    - limit (IntegerField): Максимальное количество результатов. От 1 до 50, по умолчанию 10.
+    """
+    q = serializers.CharField(min_length=2, max_length=100)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+
+class NetworkSearchResultSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для результата поиска сетей.
+
+    Атрибуты:
+    - rank (FloatField): Сходство сети со строкой поиска от 0 до 1.
+    """
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Network
+        fields = ('pk', 'network_type', 'network_name', 'country', 'city', 'street', 'rank')
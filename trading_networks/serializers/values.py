@@ -0,0 +1,113 @@
+from collections import defaultdict
+from operator import itemgetter
+
+from rest_framework import serializers
+
+PASS_THROUGH_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.BooleanField,
+                       serializers.PrimaryKeyRelatedField)
+
+
+def get_related_ordering(model):
+    """
+    Возвращает сортировку связанных объектов модели: сортировку модели по умолчанию или по первичному ключу.
+    """
+    return list(model._meta.ordering) or ['pk']
+
+
+def is_column_field(field):
+    """
+    Проверяет, что значение поля сериализатора берётся из одного столбца модели.
+    """
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        return True
+    if isinstance(field, (serializers.BaseSerializer, serializers.RelatedField, serializers.SerializerMethodField)):
+        return False
+    return field.source != '*' and '.' not in field.source
+
+
+class ValuesRepresentation:
+    """
+    Представление объектов модели в формате ModelSerializer, построенное по строкам QuerySet.values().
+
+    Соответствие полей сериализатора столбцам вычисляется один раз: значения простых полей (строки, числа,
+    идентификаторы связанных объектов) переносятся без преобразования, для остальных заранее выбирается метод
+    to_representation поля сериализатора, а связи многие-ко-многим загружаются одним запросом к промежуточной
+    таблице на страницу. Объекты модели и поля сериализатора для каждой строки не создаются, а порядок ключей
+    и значения совпадают с ответом сериализатора.
+
+    Поддерживаются сериализаторы, поля которых соответствуют столбцам модели или связям многие-ко-многим
+    по первичным ключам; для остальных from_serializer возвращает None. Идентификаторы связанных объектов
+    упорядочиваются по сортировке связанной модели по умолчанию или по первичному ключу (get_related_ordering).
+
+    Атрибуты:
+    - columns (list): Столбцы QuerySet.values(), включая первичный ключ.
+
+    Методы:
+    - from_serializer(serializer): Строит представление по полям сериализатора или возвращает None.
+    - represent(rows): Возвращает представления строк.
+    """
+
+    def __init__(self, model, names, columns, converters, many_to_many):
+        self.model = model
+        self.names = names
+        self.columns = columns
+        self.converters = converters
+        self.many_to_many = many_to_many
+        self.template = dict.fromkeys(names)
+        self.value_names = [name for name in names if name not in many_to_many]
+        # itemgetter с одним столбцом возвращает значение, а не кортеж, поэтому к нему добавляется второй столбец
+        self.getter = itemgetter(*columns[:len(self.value_names)], 'pk')
+
+    @classmethod
+    def from_serializer(cls, serializer):
+        model = serializer.Meta.model
+        names, columns, converters, many_to_many = [], [], {}, {}
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.ManyRelatedField):
+                if not isinstance(field.child_relation, serializers.PrimaryKeyRelatedField):
+                    return None
+                many_to_many[name] = model._meta.get_field(field.source)
+            elif is_column_field(field):
+                columns.append(field.source)
+                if not isinstance(field, PASS_THROUGH_FIELDS):
+                    converters[name] = field.to_representation
+            else:
+                return None
+            names.append(name)
+        if 'pk' not in columns:
+            columns.append('pk')
+        return cls(model, names, columns, converters, many_to_many)
+
+    def get_many_to_many_values(self, field, ids):
+        through = field.remote_field.through
+        source = f'{field.m2m_field_name()}_id'
+        target = f'{field.m2m_reverse_field_name()}_id'
+        # Связанные объекты упорядочиваются так же, как при их предварительной загрузке (см. NetworkSerializer)
+        ordering = [f'{"-" if name.startswith("-") else ""}{field.m2m_reverse_field_name()}__{name.lstrip("-")}'
+                    for name in get_related_ordering(field.related_model)]
+        values = defaultdict(list)
+        for object_id, related_id in (through.objects.filter(**{f'{source}__in': ids}).order_by(*ordering)
+                                      .values_list(source, target)):
+            values[object_id].append(related_id)
+        return values
+
+    def represent(self, rows):
+        ids = [row['pk'] for row in rows]
+        many_to_many = {
+            name: self.get_many_to_many_values(field, ids) if ids else {}
+            for name, field in self.many_to_many.items()
+        }
+
+        representation = []
+        for row in rows:
+            item = self.template.copy()
+            item.update(zip(self.value_names, self.getter(row)))
+            for name, converter in self.converters.items():
+                if item[name] is not None:
+                    item[name] = converter(item[name])
+            for name, values_by_id in many_to_many.items():
+                item[name] = values_by_id.get(row['pk'], [])
+            representation.append(item)
+        return representation
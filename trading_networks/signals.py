@@ -0,0 +1,126 @@
+from django.db import transaction
+from django.db.models.functions import Now
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from products.models import Product
+from trading_networks.cache import NETWORK_SCOPE, PRODUCT_SCOPE, invalidate_employee_networks, invalidate_objects, \
+    invalidate_scope
+from trading_networks.graph import invalidate_hierarchy_graph, patch_hierarchy_graph
+from trading_networks.hierarchy import detach_subtree, sync_hierarchy
+from trading_networks.models import Network
+from trading_networks.statistics import apply_debt_statistics_change
+from users.models import User
+
+
+def touch_networks(network_ids):
+    """
+    Обновляет время изменения сетей и сбрасывает кэшированные ответы с ними.
+    """
+    network_ids = list(network_ids)
+    if network_ids:
+        Network.objects.filter(pk__in=network_ids).update(updated_at=Now())
+        invalidate_objects(NETWORK_SCOPE, network_ids)
+
+
+@receiver(post_save, sender=Network)
+def network_saved(sender, instance, created=False, raw=False, **kwargs):
+    """
+    Обновляет путь и уровень сети и её поддерева после создания или изменения сети, а новую сеть учитывает
+    в статистике задолженности.
+
+    При загрузке фикстур (raw) поставщик может быть ещё не загружен, поэтому пути перестраиваются командой
+    rebuild_network_hierarchy. Граф иерархии в памяти процесса обновляется после фиксации транзакции. Кэшированные
+    ответы с сетью сбрасываются, а при переносе поддерева — все ответы с сетями.
+    """
+    invalidate_objects(NETWORK_SCOPE, [instance.pk])
+    if created:
+        apply_debt_statistics_change(instance.debt or 0, 1)
+    if raw:
+        return
+    hierarchy_path = instance.hierarchy_path
+    sync_hierarchy(instance)
+    if not created and instance.hierarchy_path != hierarchy_path:
+        invalidate_scope(NETWORK_SCOPE)
+    network_id, supplier_id = instance.pk, instance.supplier_id
+    transaction.on_commit(lambda: patch_hierarchy_graph(network_id, supplier_id))
+
+
+@receiver(pre_delete, sender=Network)
+def network_deleting(sender, instance, **kwargs):
+    """
+    Сбрасывает кэш сетей сотрудников удаляемой сети.
+
+    Связи с сотрудниками удаляются каскадно без сигнала m2m_changed и до сигнала post_delete, поэтому сотрудники
+    определяются до удаления.
+    """
+    invalidate_employee_networks(instance.employees.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Network)
+def network_deleted(sender, instance, **kwargs):
+    """
+    Обновляет пути и уровни потомков удалённой сети, исключает её из статистики задолженности и сбрасывает граф
+    иерархии в памяти процесса и кэшированные ответы с сетями.
+    """
+    detach_subtree(instance.pk)
+    apply_debt_statistics_change(-instance.debt, -1)
+    transaction.on_commit(invalidate_hierarchy_graph)
+    invalidate_scope(NETWORK_SCOPE)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def product_changed(sender, instance, **kwargs):
+    """
+    Сбрасывает кэшированные ответы с изменённым или удалённым продуктом.
+    """
+    invalidate_objects(PRODUCT_SCOPE, [instance.pk])
+
+
+@receiver(m2m_changed, sender=Network.products.through)
+@receiver(m2m_changed, sender=Network.employees.through)
+def network_links_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Обновляет время изменения сетей, у которых изменились связи с продуктами или сотрудниками, и сбрасывает
+    кэшированные ответы с ними.
+
+    При изменении связей со стороны продукта или пользователя (reverse) обновляются сети из pk_set, а при очистке
+    связей — все сети, связанные с объектом до очистки.
+    """
+    if reverse:
+        field_name = 'products' if sender is Network.products.through else 'employees'
+        if action in ('post_add', 'post_remove'):
+            touch_networks(pk_set)
+        elif action == 'pre_clear':
+            touch_networks(Network.objects.filter(**{field_name: instance}).values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        touch_networks([instance.pk])
+
+
+@receiver(m2m_changed, sender=Network.employees.through)
+def network_employees_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Сбрасывает кэш идентификаторов сетей пользователей, у которых изменились связи с сетями.
+
+    При изменении со стороны пользователя (reverse) сбрасывается кэш самого пользователя, со стороны сети — кэш
+    пользователей из pk_set, а при очистке сотрудников сети — кэш всех её сотрудников до очистки.
+    """
+    if reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_employee_networks([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        invalidate_employee_networks(pk_set)
+    elif action == 'pre_clear':
+        invalidate_employee_networks(instance.employees.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Product)
+@receiver(pre_delete, sender=User)
+def network_link_deleted(sender, instance, **kwargs):
+    """
+    Обновляет время изменения сетей, связанных с удаляемым продуктом или пользователем: связи удаляются каскадно
+    без сигнала m2m_changed.
+    """
+    field_name = 'products' if sender is Product else 'employees'
+    touch_networks(Network.objects.filter(**{field_name: instance}).values_list('pk', flat=True))
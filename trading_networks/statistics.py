@@ -0,0 +1,178 @@
+from decimal import Decimal
+
+from django.contrib.postgres.fields import ArrayField
+from django.db import connection, transaction
+from django.db.models import Aggregate, Count, DecimalField, ExpressionWrapper, F, Subquery, Sum
+from django.db.models.functions import Coalesce, NullIf
+from django.utils import timezone
+
+from trading_networks.cache import NETWORK_SCOPE, invalidate_lists
+from trading_networks.models import DebtStatistics, DebtStatisticsDelta, Network
+
+STATISTICS_ID = 1
+PERCENTILE_FRACTIONS = [percentile / 100 for percentile in range(101)]
+
+DEBT_FIELD = DecimalField(max_digits=20, decimal_places=2)
+
+
+class PercentileDisc(Aggregate):
+    """
+    Агрегат PostgreSQL `percentile_disc(доли) WITHIN GROUP (ORDER BY выражение)` для набора долей.
+    """
+    function = 'percentile_disc'
+    template = '%(function)s(ARRAY[%(fractions)s]::float8[]) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, fractions, **extra):
+        super().__init__(expression, fractions=', '.join(str(float(fraction)) for fraction in fractions),
+                         output_field=ArrayField(DEBT_FIELD), **extra)
+
+
+def get_debt_statistics():
+    """
+    Возвращает статистику задолженности, при отсутствии вычислив её заново.
+
+    Возвращает:
+    - DebtStatistics: Статистика задолженности.
+    """
+    statistics = DebtStatistics.objects.filter(pk=STATISTICS_ID).first()
+    return statistics or refresh_debt_statistics()
+
+
+def apply_debt_statistics_change(debt_change=Decimal('0'), count_change=0):
+    """
+    Учитывает в статистике изменение суммарной задолженности и количества сетей.
+
+    Вызывается в транзакции, изменяющей задолженность или набор сетей, поэтому изменение фиксируется вместе с ней.
+    Изменение добавляется строкой в DebtStatisticsDelta, а не обновляет строку статистики, поэтому параллельные
+    транзакции не ждут друг друга; в статистику изменения переносит функция fold_debt_statistics.
+
+    Аргументы:
+    - debt_change (Decimal): Изменение суммарной задолженности.
+    - count_change (int): Изменение количества сетей.
+    """
+    if not debt_change and not count_change:
+        return
+    DebtStatisticsDelta.objects.create(debt_change=debt_change, count_change=count_change)
+
+
+def fold_debt_statistics():
+    """
+    Переносит накопленные изменения из DebtStatisticsDelta в статистику задолженности.
+
+    Изменения удаляются и прибавляются к статистике одним запросом, поэтому каждое изменение учитывается ровно
+    один раз и при параллельных запусках, а изменения, зафиксированные во время переноса, переносятся при следующем
+    запуске. Если строки статистики нет, она вычисляется заново. Перенос изменений сдвигает среднюю задолженность,
+    поэтому кэшированные списки сетей, отобранных по порогу, сбрасываются.
+
+    Возвращает:
+    - int: Количество перенесённых изменений.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'WITH folded AS (DELETE FROM {DebtStatisticsDelta._meta.db_table} RETURNING debt_change, count_change) '
+            f'UPDATE {DebtStatistics._meta.db_table} SET total_debt = total_debt + totals.debt_change, '
+            f'network_count = network_count + totals.count_change '
+            f'FROM (SELECT COALESCE(SUM(debt_change), 0) AS debt_change, '
+            f'COALESCE(SUM(count_change), 0) AS count_change, COUNT(*) AS folded_count FROM folded) AS totals '
+            f'WHERE id = %s RETURNING totals.folded_count',
+            [STATISTICS_ID],
+        )
+        row = cursor.fetchone()
+    if row is None:
+        refresh_debt_statistics()
+        return 0
+    if row[0]:
+        invalidate_lists(NETWORK_SCOPE)
+    return row[0]
+
+
+def refresh_debt_statistics():
+    """
+    Полностью пересчитывает статистику задолженности по таблице сетей.
+
+    На время пересчёта таблица изменений блокируется для записи: уже зафиксированные изменения учтены в пересчёте
+    и удаляются, а транзакции, изменяющие сети параллельно, добавляют свои изменения после него, поэтому они
+    не теряются и не учитываются дважды.
+
+    Возвращает:
+    - DebtStatistics: Пересчитанная статистика.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {DebtStatisticsDelta._meta.db_table} IN EXCLUSIVE MODE')
+        statistics, _ = DebtStatistics.objects.select_for_update().get_or_create(pk=STATISTICS_ID)
+        DebtStatisticsDelta.objects.all().delete()
+        totals = Network.objects.aggregate(total_debt=Coalesce(Sum('debt'), Decimal('0'), output_field=DEBT_FIELD),
+                                           network_count=Count('id'))
+        statistics.total_debt = totals['total_debt']
+        statistics.network_count = totals['network_count']
+        statistics.save(update_fields=('total_debt', 'network_count'))
+    refresh_debt_percentiles()
+    statistics.refresh_from_db()
+    return statistics
+
+
+def refresh_debt_percentiles():
+    """
+    Пересчитывает пороговые значения перцентилей задолженности одним агрегирующим запросом и сбрасывает
+    кэшированные списки сетей, отобранных по порогу.
+    """
+    percentiles = Network.objects.aggregate(percentiles=PercentileDisc('debt', PERCENTILE_FRACTIONS))['percentiles']
+    DebtStatistics.objects.filter(pk=STATISTICS_ID).update(debt_percentiles=percentiles or [],
+                                                           percentiles_refreshed_at=timezone.now())
+    invalidate_lists(NETWORK_SCOPE)
+
+
+def average_debt_subquery():
+    """
+    Возвращает выражение со средней задолженностью из статистики для использования в фильтре.
+    """
+    average = (DebtStatistics.objects.filter(pk=STATISTICS_ID)
+               .annotate(average=ExpressionWrapper(F('total_debt') / NullIf(F('network_count'), 0),
+                                                   output_field=DEBT_FIELD))
+               .values('average'))
+    return Subquery(average, output_field=DEBT_FIELD)
+
+
+def percentile_debt_subquery(percentile):
+    """
+    Возвращает выражение с пороговым значением задолженности для перцентиля из статистики.
+
+    Аргументы:
+    - percentile (int): Перцентиль от 0 до 100.
+    """
+    threshold = DebtStatistics.objects.filter(pk=STATISTICS_ID).values(f'debt_percentiles__{percentile}')
+    return Subquery(threshold, output_field=DEBT_FIELD)
+
+
+def top_debt_subquery(limit):
+    """
+    Возвращает выражение с задолженностью сети, занимающей место limit по убыванию задолженности.
+
+    Выражение вычисляется по индексу (задолженность, id) без сортировки всей таблицы.
+
+    Аргументы:
+    - limit (int): Количество сетей с наибольшей задолженностью.
+    """
+    threshold = Network.objects.order_by('-debt', '-id').values('debt')[limit - 1:limit]
+    return Subquery(threshold, output_field=DEBT_FIELD)
+
+
+def get_debt_threshold_filter(threshold, percentile=None, limit=None):
+    """
+    Возвращает условие фильтра сетей по порогу задолженности.
+
+    Аргументы:
+    - threshold (str): Вид порога: 'average' — выше средней, 'percentile' — не ниже перцентиля,
+    'top' — не ниже задолженности сети на месте limit.
+    - percentile (int): Перцентиль для порога 'percentile'.
+    - limit (int): Количество сетей для порога 'top'.
+
+    Возвращает:
+    - dict: Именованные аргументы для QuerySet.filter().
+    """
+    if threshold == 'percentile':
+        return {'debt__gte': percentile_debt_subquery(percentile)}
+    if threshold == 'top':
+        return {'debt__gte': top_debt_subquery(limit)}
+    return {'debt__gt': average_debt_subquery()}
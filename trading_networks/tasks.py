@@ -1,55 +1,226 @@
-import random
-
-from celery import shared_task
+from celery import chain, chord, group, shared_task
 from django.core.mail import EmailMessage
-from django.db import transaction
+from django.db import InterfaceError, OperationalError, transaction
 
 from config import settings
-from trading_networks.models import Network
+from trading_networks.debt import DEFAULT_CHUNK_SIZE, DEFAULT_CONCURRENCY, DEFAULT_SHARD_SIZE, finish_debt_run, \
+    get_debt_run_updated_count, get_or_create_debt_run, get_schedule_slot, process_debt_run, process_debt_shard, \
+    record_debt_clear, rollup_debt, split_debt_run
+from trading_networks.analytics import refresh_debt_cube, refresh_subtree_debt_rollup
+from trading_networks.history import record_debt_snapshot
+from trading_networks.models import DebtTaskRun
+from trading_networks.statistics import fold_debt_statistics, refresh_debt_percentiles
 
+# Задачи задолженности идемпотентны, поэтому их можно подтверждать после выполнения и повторять при сбоях
+DEBT_TASK_OPTIONS = {
+    'acks_late': True,
+    'reject_on_worker_lost': True,
+    'autoretry_for': (OperationalError, InterfaceError),
+    'retry_backoff': True,
+    'retry_jitter': True,
+    'max_retries': 10,
+}
 
-@shared_task
-def increase_debt():
+
+def report_debt_progress(task):
     """
-    Задача увеличивает задолженность перед поставщиком на случайное число от 5 до 500 для всех сетей.
+    Создаёт функцию, публикующую прогресс задачи задолженности в бэкенд результатов Celery.
 
-    Эта задача выбирает все существующие сети и увеличивает их задолженность на случайное значение,
-    выбираемое в диапазоне от 5 до 500.
+    Аргументы:
+    - task (Task): Экземпляр выполняемой задачи.
 
-    Возвращает строку с информацией о том, на какую сумму увеличена задолженность и для какого количества сетей.
+    Возвращает:
+    - callable: Функция для передачи в process_debt_run.
     """
-    increase_amount = random.randint(5, 500)
-    networks = Network.objects.all()
-    updated_count = 0
 
-    for network in networks:
-        network.debt += increase_amount
-        network.save()
-        updated_count += 1
+    def on_progress(processed_chunks, total_chunks, updated_count):
+        if task.request.id:
+            task.update_state(state='PROGRESS', meta={
+                'processed_chunks': processed_chunks,
+                'total_chunks': total_chunks,
+                'updated_count': updated_count,
+            })
 
-    return f'Увеличено задолженность на {increase_amount} для {updated_count} сетей.'
+    return on_progress
 
 
-@shared_task
-def decrease_debt():
+def apply_debt_run_results():
+    """
+    Сводит операции журнала в задолженность сетей и обновляет данные, производные от задолженности.
+
+    Вызывается после завершения каждого запуска задачи задолженности: после сводки изменения статистики
+    задолженности переносятся в статистику, в историю задолженности добавляется снимок, пересчитываются сводка
+    задолженности поддеревьев заводов, перцентили задолженности и агрегаты задолженности по измерениям сетей.
+    """
+    rollup_debt()
+    fold_debt_statistics()
+    record_debt_snapshot()
+    refresh_subtree_debt_rollup()
+    refresh_debt_percentiles()
+    refresh_debt_cube()
+
+
+def format_debt_summary(run, updated_count):
+    """
+    Формирует итоговую строку задачи задолженности.
+
+    Аргументы:
+    - run (DebtTaskRun): Запуск задачи.
+    - updated_count (int): Количество сетей, задолженность которых изменена.
+
+    Возвращает:
+    - str: Строка с информацией о сумме изменения и количестве сетей.
+    """
+    if run.task_name == DebtTaskRun.DECREASE:
+        return f'Уменьшено задолженность на {run.amount} для {updated_count} сетей.'
+    return f'Увеличено задолженность на {run.amount} для {updated_count} сетей.'
+
+
+def dispatch_debt_run(run, shard_size, concurrency):
+    """
+    Распределяет обработку запуска задачи задолженности между воркерами Celery.
+
+    Диапазон идентификаторов разбивается на части, части распределяются по `concurrency` цепочкам, которые
+    выполняются параллельно в составе chord. Каждая цепочка передаёт накопленное количество обновлённых сетей
+    следующей части, а завершающая задача суммирует результаты цепочек. Запуск распределяется только один раз:
+    повторно доставленная задача, чей запуск уже распределён, не создаёт второй chord.
+
+    Аргументы:
+    - run (DebtTaskRun): Запуск задачи.
+    - shard_size (int): Размер части в идентификаторах сетей.
+    - concurrency (int): Максимальное количество одновременно обрабатываемых частей.
+
+    Возвращает:
+    - int: Количество частей или 0, если запуск уже распределён.
+    """
+    shards = split_debt_run(run, shard_size)
+    lanes = [shards[lane::concurrency] for lane in range(min(concurrency, len(shards)))]
+    header = group(
+        chain(apply_debt_shard.s(0, run.id, *lane[0]), *(apply_debt_shard.s(run.id, *shard) for shard in lane[1:]))
+        for lane in lanes
+    )
+    with transaction.atomic():
+        # Отметка откатывается, если chord не удалось отправить, и запуск сможет распределить повторная доставка
+        if not DebtTaskRun.objects.filter(pk=run.pk, is_dispatched=False).update(is_dispatched=True):
+            return 0
+        chord(header)(summarize_debt_run.s(run.id))
+    return len(shards)
+
+
+def run_debt_task(task, task_name, amount_range, chunk_size, fan_out, shard_size, concurrency):
+    """
+    Выполняет запуск задачи задолженности последовательно или распределяет его между воркерами.
+
+    Сети обрабатываются пакетами по диапазонам идентификаторов: для каждого пакета в журнал задолженности
+    добавляются операции, пакет фиксируется в отдельной транзакции. Запуск определяется слотом расписания,
+    поэтому повторная доставка задачи продолжает тот же запуск с той же суммой без повторного применения пакетов,
+    а вызов для уже завершённого слота ничего не меняет и возвращает итог завершённого запуска. По завершении
+    вызывается apply_debt_run_results.
+
+    Аргументы:
+    - task (Task): Экземпляр выполняемой задачи.
+    - task_name (str): Название задачи (DebtTaskRun.INCREASE или DebtTaskRun.DECREASE).
+    - amount_range (tuple): Границы случайной суммы изменения задолженности.
+    - chunk_size (int): Размер пакета идентификаторов сетей.
+    - fan_out (bool): Распределить обработку между воркерами.
+    - shard_size (int): Размер части в идентификаторах сетей при распределённой обработке.
+    - concurrency (int): Количество одновременно обрабатываемых частей при распределённой обработке.
+
+    Возвращает:
+    - str: Итоговая строка задачи.
+    """
+    slot = get_schedule_slot(task.name, eta=task.request.eta)
+    run = get_or_create_debt_run(task_name, amount_range, chunk_size, slot=slot, task_id=task.request.id)
+    if run.is_finished:
+        # Запуск этого слота уже завершён: повторная доставка или перекрывающееся срабатывание
+        return format_debt_summary(run, get_debt_run_updated_count(run))
+    if fan_out:
+        shard_count = dispatch_debt_run(run, shard_size, concurrency)
+        if not shard_count:
+            return f'Изменение задолженности на {run.amount} уже распределено.'
+        return f'Изменение задолженности на {run.amount} распределено на {shard_count} частей.'
+
+    updated_count = process_debt_run(run, on_progress=report_debt_progress(task))
+    apply_debt_run_results()
+    return format_debt_summary(run, updated_count)
+
+
+@shared_task(bind=True, **DEBT_TASK_OPTIONS)
+def increase_debt(self, chunk_size=DEFAULT_CHUNK_SIZE, fan_out=False, shard_size=DEFAULT_SHARD_SIZE,
+                  concurrency=DEFAULT_CONCURRENCY):
+    """
+    Задача увеличивает задолженность перед поставщиком на случайное число от 5 до 500 для всех сетей.
+
+    Запуск выполняется функцией run_debt_task. В режиме fan_out обработка распределяется между воркерами,
+    и итоговую строку возвращает задача summarize_debt_run.
+
+    Аргументы:
+    - chunk_size (int): Размер пакета идентификаторов сетей.
+    - fan_out (bool): Распределить обработку между воркерами.
+    - shard_size (int): Размер части в идентификаторах сетей при распределённой обработке.
+    - concurrency (int): Количество одновременно обрабатываемых частей при распределённой обработке.
+
+    Возвращает строку с информацией о том, на какую сумму увеличена задолженность и для какого количества сетей.
+    """
+    return run_debt_task(self, DebtTaskRun.INCREASE, (5, 500), chunk_size, fan_out, shard_size, concurrency)
+
+
+@shared_task(bind=True, **DEBT_TASK_OPTIONS)
+def decrease_debt(self, chunk_size=DEFAULT_CHUNK_SIZE, fan_out=False, shard_size=DEFAULT_SHARD_SIZE,
+                  concurrency=DEFAULT_CONCURRENCY):
     """
     Задача уменьшает задолженность перед поставщиком на случайное число от 100 до 10 000 для всех сетей.
 
-    Эта задача выбирает все сети с достаточной задолженностью и уменьшает их задолженность
-    на случайное значение, выбираемое в диапазоне от 100 до 10 000.
+    Условие достаточной задолженности (`debt >= сумма`) проверяется на стороне базы данных. Запуск выполняется
+    функцией run_debt_task. В режиме fan_out обработка распределяется между воркерами, и итоговую строку
+    возвращает задача summarize_debt_run.
+
+    Аргументы:
+    - chunk_size (int): Размер пакета идентификаторов сетей.
+    - fan_out (bool): Распределить обработку между воркерами.
+    - shard_size (int): Размер части в идентификаторах сетей при распределённой обработке.
+    - concurrency (int): Количество одновременно обрабатываемых частей при распределённой обработке.
 
     Возвращает строку с информацией о том, на какую сумму уменьшена задолженность и для какого количества сетей.
     """
-    decrease_amount = random.randint(100, 10000)
-    networks = Network.objects.filter(debt__gte=decrease_amount)
-    updated_count = 0
+    return run_debt_task(self, DebtTaskRun.DECREASE, (100, 10000), chunk_size, fan_out, shard_size, concurrency)
+
+
+@shared_task(**DEBT_TASK_OPTIONS)
+def apply_debt_shard(updated_before, run_id, start_id, end_id):
+    """
+    Задача применяет изменение задолженности к части диапазона идентификаторов запуска.
 
-    for network in networks:
-        network.debt -= decrease_amount
-        network.save()
-        updated_count += 1
+    Аргументы:
+    - updated_before (int): Количество сетей, обновлённых предыдущими частями цепочки.
+    - run_id (int): Идентификатор запуска задачи задолженности.
+    - start_id (int): Начальный идентификатор части.
+    - end_id (int): Конечный идентификатор части (не включительно).
 
-    return f'Уменьшено задолженность на {decrease_amount} для {updated_count} сетей.'
+    Возвращает накопленное количество сетей, задолженность которых изменена.
+    """
+    run = DebtTaskRun.objects.get(id=run_id)
+    return updated_before + process_debt_shard(run, start_id, end_id)
+
+
+@shared_task(**DEBT_TASK_OPTIONS)
+def summarize_debt_run(lane_counts, run_id):
+    """
+    Завершающая задача распределённого запуска задолженности.
+
+    Суммирует количество обновлённых сетей по всем цепочкам, завершает запуск, сводит операции журнала
+    в задолженность сетей и добавляет снимок в историю задолженности.
+
+    Аргументы:
+    - lane_counts (list): Количество обновлённых сетей по каждой цепочке.
+    - run_id (int): Идентификатор запуска задачи задолженности.
+
+    Возвращает строку с информацией о сумме изменения и количестве сетей, как и последовательный режим.
+    """
+    run = DebtTaskRun.objects.get(id=run_id)
+    finish_debt_run(run)
+    apply_debt_run_results()
+    return format_debt_summary(run, sum(lane_counts))
 
 
 @shared_task
@@ -57,19 +228,32 @@ def clear_debt_async(network_ids):
     """
     Асинхронная задача для очистки задолженности перед поставщиком у выбранных сетей.
 
-    Эта задача принимает список идентификаторов сетей и устанавливает задолженность для каждой из них в 0.
+    Эта задача принимает список идентификаторов сетей, добавляет в журнал задолженности обнуляющие операции
+    и сводит их в задолженность этих сетей.
 
     Аргументы:
     - network_ids (list): Список идентификаторов сетей, для которых нужно очистить задолженность.
 
     Возвращает строку с информацией о том, у скольких сетей была очищена задолженность.
     """
-    networks = Network.objects.filter(id__in=network_ids)
-    with transaction.atomic():
-        updated_count = networks.update(debt=0)
+    updated_count = record_debt_clear(network_ids)
+    rollup_debt(network_ids=network_ids)
     return f'Задолженность очищена у {updated_count} сетей.'
 
 
+@shared_task(**DEBT_TASK_OPTIONS)
+def rollup_debt_balances():
+    """
+    Периодическая задача, сводящая неприменённые операции журнала задолженности в задолженность сетей
+    и переносящая накопленные изменения статистики задолженности в статистику.
+
+    Возвращает строку с информацией о количестве сведённых операций.
+    """
+    applied_count = rollup_debt()
+    fold_debt_statistics()
+    return f'Сведено {applied_count} операций по задолженности.'
+
+
 @shared_task
 def send_qr_code_email(email, qr_code_bytes):
     """
@@ -1,3 +1,602 @@
-from django.test import TestCase
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from products.models import Product
+from trading_networks.analytics import aggregate_subtree_debt
+from trading_networks.api_views.api_network import NetworkByProductAPIView, NetworkDebtAverageAPIView, \
+    NetworkListAPIView
+from trading_networks.bulk import bulk_save_networks
+from trading_networks.cache import NETWORK_SCOPE, get_employee_network_ids, get_employee_networks_key, get_list_key, \
+    get_versions
+from trading_networks.debt import apply_debt_chunk, get_debt_run_updated_count, get_or_create_debt_run, \
+    get_schedule_slot, rollup_debt, split_debt_run
+from trading_networks.graph import HierarchyGraph
+from trading_networks.hierarchy import get_subtree_height
+from trading_networks.history import get_debt_history
+from trading_networks.models import DebtStatistics, DebtStatisticsDelta, DebtTaskRun, DebtTransaction, Network, \
+    NetworkDebtHistory
+from trading_networks.renderers import FastJSONRenderer
+from trading_networks.serializers.network import NetworkSerializer
+from trading_networks.serializers.values import ValuesRepresentation
+from trading_networks.statistics import fold_debt_statistics, refresh_debt_statistics
+from trading_networks.tasks import apply_debt_shard, dispatch_debt_run, summarize_debt_run
+from trading_networks.validators import MAX_NETWORK_LEVEL, MAX_NETWORK_LEVEL_MESSAGE
+from users.models import User
+
+
+def create_network(name, network_type='Factory', supplier=None, debt=0, **fields):
+    """
+    Создаёт сеть с обязательными полями, заполненными тестовыми значениями.
+    """
+    values = {'email': f'{name}@example.com', 'country': 'Россия', 'city': 'Москва', 'street': 'Тверская',
+              'house_number': '1', **fields}
+    return Network.objects.create(network_type=network_type, network_name=name, supplier=supplier, debt=debt, **values)
+
+
+class APIClientMixin:
+    """
+    Миксин тестов API, аутентифицирующий клиента токеном доступа JWT, как в рабочих запросах.
+    """
+
+    def authenticate(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(context.captured_queries)
+
+
+class QueryBudgetTests(APIClientMixin, APITestCase):
+    """
+    Тесты бюджетов SQL-запросов списков сетей (атрибут query_budget представлений).
+
+    Количество запросов не должно превышать бюджет представления и не должно зависеть от количества сетей
+    на странице и их продуктов и сотрудников.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create(email='admin@example.com', first_name='Админ', last_name='Админов',
+                                        is_superuser=True)
+        self.authenticate(self.user)
+        self.products = [Product.objects.create(product_name=f'Продукт {index}', product_model='X')
+                         for index in range(3)]
+        self.employees = [User.objects.create(email=f'employee{index}@example.com', first_name='Имя',
+                                              last_name='Фамилия') for index in range(3)]
+
+    def create_networks(self, count):
+        for index in range(count):
+            network = create_network(f'Сеть {index}', debt=100 * (index + 1))
+            network.products.set(self.products)
+            network.employees.set(self.employees)
+
+    def assert_queries(self, url, view_class):
+        self.create_networks(1)
+        single = self.count_queries(url)
+        self.create_networks(9)
+        many = self.count_queries(url)
+        self.assertLessEqual(many, view_class.query_budget)
+        self.assertEqual(single, many)
+
+    def test_network_list(self):
+        self.assert_queries('/api/networks/list/', NetworkListAPIView)
+
+    def test_network_list_with_expanded_products(self):
+        self.assert_queries('/api/networks/list/?expand=products,supplier', NetworkListAPIView)
+
+    def test_network_debt_average(self):
+        self.assert_queries('/api/networks/debt-exceeds-average/?threshold=percentile&percentile=0',
+                            NetworkDebtAverageAPIView)
+
+    def test_network_by_product(self):
+        self.assert_queries(f'/api/networks/product/{self.products[0].pk}/', NetworkByProductAPIView)
+
+    def test_network_by_product_with_expanded_products(self):
+        self.assert_queries(f'/api/networks/product/{self.products[0].pk}/?expand=products', NetworkByProductAPIView)
+
+
+class ValuesRepresentationTests(TestCase):
+    """
+    Тесты совпадения ответа по строкам QuerySet.values() с ответом NetworkSerializer байт в байт.
+    """
+
+    def render_with_serializer(self, queryset):
+        serializer = NetworkSerializer()
+        return JSONRenderer().render(NetworkSerializer(serializer.setup_eager_loading(queryset), many=True).data)
+
+    def render_with_values(self, queryset):
+        representation = ValuesRepresentation.from_serializer(NetworkSerializer())
+        rows = list(queryset.values(*representation.columns))
+        return FastJSONRenderer().render(representation.represent(rows))
+
+    def test_many_to_many_order_matches_serializer(self):
+        users = [User.objects.create(email=f'user{index}@example.com', first_name='Имя', last_name='Фамилия')
+                 for index in range(3)]
+        products = [Product.objects.create(product_name=f'Продукт {index}', product_model='X') for index in range(3)]
+        factory = create_network('Завод')
+        network = create_network('Дилер', network_type='DealerCenter', supplier=factory)
+        # Связи добавляются не в порядке первичных ключей
+        network.employees.set([users[2], users[0]])
+        network.employees.add(users[1])
+        network.products.set([products[1]])
+        network.products.add(products[2], products[0])
+
+        queryset = Network.objects.order_by('pk')
+        self.assertEqual(self.render_with_values(queryset), self.render_with_serializer(queryset))
+
+    def test_line_separators_are_escaped(self):
+        create_network('Сеть\u2028с\u2029разделителями')
+        queryset = Network.objects.order_by('pk')
+        content = self.render_with_values(queryset)
+        self.assertEqual(content, self.render_with_serializer(queryset))
+        self.assertIn(b'\\u2028', content)
+
+
+class SubtreeDebtTests(TestCase):
+    """
+    Тесты агрегатов задолженности поддеревьев (aggregate_subtree_debt).
+    """
+
+    def test_prefix_scans_match_full_table_aggregate(self):
+        roots = [create_network(f'Завод {index}', debt=10 * index) for index in range(1, 12)]
+        for root in roots:
+            retail = create_network(f'Сеть {root.pk}', network_type='RetailNetwork', supplier=root, debt=5)
+            create_network(f'ИП {root.pk}', network_type='IndividualBusinessman', supplier=retail, debt=7)
+        # Корни 1 и 11 проверяют, что префикс пути '/1/' не захватывает поддерево '/11/'
+        root_ids = [roots[0].pk, roots[10].pk]
+
+        with CaptureQueriesContext(connection) as context:
+            breakdown = aggregate_subtree_debt(root_ids)
+        full = aggregate_subtree_debt(Network.objects.filter(network_type='Factory').values('id'))
+
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertEqual(dict(breakdown), {root_id: full[root_id] for root_id in root_ids})
+        self.assertEqual(sum(row['network_count'] for row in breakdown[roots[0].pk]), 3)
+        self.assertEqual(aggregate_subtree_debt([]), {})
+
+
+@override_settings(EMPLOYEE_NETWORKS_CACHE_ENABLED=True)
+class EmployeeNetworksCacheTests(TestCase):
+    """
+    Тесты сброса кэша сетей сотрудников при изменении связей без сигнала m2m_changed.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create(email='admin@example.com', first_name='Админ', last_name='Админов',
+                                         is_superuser=True)
+        self.old_employee, self.new_employee = [
+            User.objects.create(email=f'employee{index}@example.com', first_name='Имя', last_name='Фамилия')
+            for index in range(2)
+        ]
+        self.network = create_network('Завод')
+        self.network.employees.set([self.old_employee])
+        cache.clear()
+
+    def assert_invalidated(self, users, action):
+        for user in users:
+            get_employee_network_ids(user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            action()
+        for user in users:
+            self.assertIsNone(cache.get(get_employee_networks_key(user.pk)))
+
+    def test_bulk_update_replaces_employees(self):
+        items = [{'pk': self.network.pk, 'employees': [self.new_employee.pk]}]
+        self.assert_invalidated([self.old_employee, self.new_employee],
+                                lambda: self.assertEqual(bulk_save_networks(items, self.admin)[0]['status'], 'updated'))
+        self.assertEqual(get_employee_network_ids(self.new_employee.pk), {self.network.pk})
+        self.assertEqual(get_employee_network_ids(self.old_employee.pk), set())
+
+    def test_bulk_create_adds_employees(self):
+        product = Product.objects.create(product_name='Продукт', product_model='X')
+        items = [{'network_type': 'Factory', 'network_name': 'Новый завод', 'email': 'new@example.com',
+                  'country': 'Россия', 'city': 'Москва', 'street': 'Тверская', 'house_number': '1',
+                  'debt': '0', 'products': [product.pk], 'employees': [self.new_employee.pk]}]
+        self.assert_invalidated([self.new_employee],
+                                lambda: self.assertEqual(bulk_save_networks(items, self.admin)[0]['status'], 'created'))
+        self.assertEqual(len(get_employee_network_ids(self.new_employee.pk)), 1)
+
+    def test_network_delete(self):
+        self.assert_invalidated([self.old_employee], self.network.delete)
+        self.assertEqual(get_employee_network_ids(self.old_employee.pk), set())
+
+
+class NetworkBulkTests(APIClientMixin, APITestCase):
+    """
+    Тесты пакетного создания и изменения сетей (NetworkBulkAPIView).
+    """
+    url = '/api/networks/bulk/'
+
+    def setUp(self):
+        self.user = User.objects.create(email='admin@example.com', first_name='Админ', last_name='Админов',
+                                        is_superuser=True)
+        self.authenticate(self.user)
+        self.product = Product.objects.create(product_name='Продукт', product_model='X')
+
+    def item(self, name, network_type='Distributor', **fields):
+        return {'network_type': network_type, 'network_name': name, 'email': f'{name}@example.com',
+                'country': 'Россия', 'city': 'Москва', 'street': 'Тверская', 'house_number': '1', 'debt': '0',
+                'products': [self.product.pk], **fields}
+
+    def post(self, items):
+        response = self.client.post(self.url, items, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data['results']
+
+    def test_supplier_ref_chain(self):
+        # Поставщики указаны после ссылающихся на них сетей
+        results = self.post([
+            self.item('dealer', 'DealerCenter', supplier_ref='distributor'),
+            self.item('distributor', ref='distributor', supplier_ref='factory'),
+            self.item('factory', 'Factory', ref='factory'),
+        ])
+        self.assertEqual([result['status'] for result in results], ['created'] * 3)
+        dealer, distributor, factory = [Network.objects.get(pk=result['pk']) for result in results]
+        self.assertEqual([factory.network_level, distributor.network_level, dealer.network_level], [0, 1, 2])
+        self.assertEqual(dealer.supplier, distributor)
+        self.assertEqual(dealer.hierarchy_path, f'/{factory.pk}/{distributor.pk}/{dealer.pk}/')
+
+    def test_supplier_ref_cycle(self):
+        results = self.post([
+            self.item('first', ref='first', supplier_ref='second'),
+            self.item('second', ref='second', supplier_ref='first'),
+            self.item('dependent', supplier_ref='first'),
+        ])
+        self.assertEqual([result['status'] for result in results], ['error'] * 3)
+        self.assertEqual(results[0]['errors'], {'supplier_ref': ['Ссылки на поставщиков образуют цикл']})
+        self.assertEqual(results[2]['errors'], {'supplier_ref': ['Поставщик не создан из-за ошибок']})
+        self.assertFalse(Network.objects.exists())
+
+    def test_partial_errors(self):
+        employee = User.objects.create(email='employee@example.com', first_name='Имя', last_name='Фамилия')
+        network = create_network('existing')
+        self.authenticate(employee)
+        results = self.post([
+            self.item('valid', 'Factory'),
+            {**self.item('invalid'), 'email': 'not an email'},
+            self.item('orphan', supplier_ref='missing'),
+            {'pk': network.pk, 'network_name': 'renamed'},
+            [],
+        ])
+        self.assertEqual([result['status'] for result in results], ['created'] + ['error'] * 4)
+        self.assertIn('email', results[1]['errors'])
+        self.assertEqual(results[2]['errors'], {'supplier_ref': ['Сеть со ссылкой "missing" отсутствует в пакете']})
+        self.assertIn('pk', results[3]['errors'])
+        self.assertEqual(set(Network.objects.values_list('network_name', flat=True)), {'valid', 'existing'})
+
+    def test_move_conflicts_with_create(self):
+        first, second = create_network('first'), create_network('second')
+        distributor = create_network('distributor', 'Distributor', supplier=first)
+        results = self.post([
+            {'pk': distributor.pk, 'supplier': second.pk},
+            self.item('dealer', 'DealerCenter', supplier=distributor.pk),
+            self.item('retail', 'RetailNetwork', supplier=first.pk),
+            self.item('referenced', 'DealerCenter', ref='referenced', supplier=distributor.pk),
+            self.item('dependent', 'RetailNetwork', ref='dependent', supplier_ref='referenced'),
+            self.item('transitive', 'IndividualBusinessman', supplier_ref='dependent'),
+        ])
+        self.assertEqual([result['status'] for result in results],
+                         ['updated', 'error', 'created', 'error', 'error', 'error'])
+        self.assertIn('non_field_errors', results[1]['errors'])
+        self.assertIn('non_field_errors', results[3]['errors'])
+        for result in results[4:]:
+            self.assertEqual(result['errors'], {'supplier_ref': ['Поставщик не создан из-за ошибок']})
+        self.assertFalse(Network.objects.filter(network_name__in=['referenced', 'dependent', 'transitive']).exists())
+        distributor.refresh_from_db()
+        self.assertEqual(distributor.hierarchy_path, f'/{second.pk}/{distributor.pk}/')
+
+    def test_max_level(self):
+        items = [self.item('level0', 'Factory', ref='level0')]
+        items += [self.item(f'level{level}', ref=f'level{level}', supplier_ref=f'level{level - 1}')
+                  for level in range(1, MAX_NETWORK_LEVEL + 2)]
+        results = self.post(items)
+        self.assertEqual([result['status'] for result in results],
+                         ['created'] * (MAX_NETWORK_LEVEL + 1) + ['error'])
+        self.assertEqual(results[-1]['errors'], {'supplier_ref': [MAX_NETWORK_LEVEL_MESSAGE]})
+
+        deepest = Network.objects.get(pk=results[-2]['pk'])
+        self.assertEqual(deepest.network_level, MAX_NETWORK_LEVEL)
+        results = self.post([self.item('below', supplier=deepest.pk)])
+        self.assertEqual(results[0]['errors'], {'non_field_errors': [MAX_NETWORK_LEVEL_MESSAGE]})
+
+    def test_ndjson_decode_error(self):
+        content = '{"network_name": "first"}\n'.encode() + b'{"network_name": "\xff"}\n'
+        response = self.client.post(self.url, content, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 400, response.content)
+
+
+class DebtLedgerTests(TestCase):
+    """
+    Тесты журнала задолженности: сводка операций в задолженность сетей и очистка задолженности в админке.
+    """
+
+    def setUp(self):
+        self.factory = create_network('Завод', debt=100)
+        self.dealer = create_network('Дилер', 'DealerCenter', supplier=self.factory, debt=50)
+
+    def assert_debts(self, *debts):
+        self.assertEqual([Network.objects.get(pk=network.pk).debt for network in (self.factory, self.dealer)],
+                         list(debts))
+
+    def test_rollup(self):
+        DebtTransaction.objects.bulk_create([
+            DebtTransaction(network=self.factory, amount=30, source=DebtTransaction.BEAT_INCREASE),
+            DebtTransaction(network=self.dealer, amount=-20, source=DebtTransaction.DAILY_DECREASE),
+            DebtTransaction(network=self.factory, amount=5, source=DebtTransaction.MANUAL),
+        ])
+        self.assertEqual(rollup_debt(batch_size=2), 3)
+        self.assert_debts(135, 30)
+        self.assertFalse(DebtTransaction.objects.filter(is_applied=False).exists())
+        self.assertEqual(rollup_debt(), 0)
+
+    def test_admin_clear_debt(self):
+        admin = User.objects.create(email='admin@example.com', first_name='Админ', last_name='Админов',
+                                    is_staff=True, is_superuser=True)
+        DebtTransaction.objects.create(network=self.factory, amount=25, source=DebtTransaction.BEAT_INCREASE)
+        self.client.force_login(admin)
+        response = self.client.post(reverse('admin:trading_networks_network_changelist'), {
+            'action': 'clear_debt',
+            '_selected_action': [self.factory.pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assert_debts(0, 50)
+        cleared = DebtTransaction.objects.get(network=self.factory, source=DebtTransaction.ADMIN_CLEAR)
+        self.assertEqual((cleared.amount, cleared.is_applied), (-125, True))
+        self.assertFalse(DebtTransaction.objects.filter(is_applied=False).exists())
+
+
+class DebtStatisticsTests(TestCase):
+    """
+    Тесты инкрементальной статистики задолженности: изменения накапливаются и переносятся в статистику.
+    """
+
+    def setUp(self):
+        self.statistics = refresh_debt_statistics()
+
+    def test_changes_are_folded(self):
+        factory = create_network('Завод')
+        create_network('Дилер', network_type='DealerCenter', supplier=factory, debt=150)
+        create_network('Сеть', network_type='RetailNetwork', supplier=factory, debt=50).delete()
+        self.assertEqual(DebtStatisticsDelta.objects.count(), 4)
+
+        self.assertEqual(fold_debt_statistics(), 4)
+        statistics = DebtStatistics.objects.get(pk=self.statistics.pk)
+        self.assertEqual((statistics.total_debt, statistics.network_count),
+                         (self.statistics.total_debt + 150, self.statistics.network_count + 2))
+        self.assertFalse(DebtStatisticsDelta.objects.exists())
+        self.assertEqual(fold_debt_statistics(), 0)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_fold_invalidates_cached_lists(self):
+        list_key = get_list_key(NETWORK_SCOPE)
+        create_network('Завод', debt=100)
+        with self.captureOnCommitCallbacks(execute=True):
+            fold_debt_statistics()
+        version = get_versions([list_key])
+        with self.captureOnCommitCallbacks(execute=True):
+            fold_debt_statistics()
+        self.assertEqual(get_versions([list_key]), version)
+
+        create_network('Другой завод', debt=100)
+        with self.captureOnCommitCallbacks(execute=True):
+            fold_debt_statistics()
+        self.assertNotEqual(get_versions([list_key]), version)
+
+    def test_refresh_discards_counted_changes(self):
+        create_network('Завод', debt=0)
+        statistics = refresh_debt_statistics()
+        self.assertFalse(DebtStatisticsDelta.objects.exists())
+        self.assertEqual(statistics.network_count, Network.objects.count())
+
+
+class DebtTaskRunTests(TestCase):
+    """
+    Тесты реестра запусков задач задолженности: повторное использование запуска, однократное применение пакетов,
+    слоты расписания, однократное распределение запуска и его завершение.
+    """
+
+    def setUp(self):
+        self.factory = create_network('Завод')
+        self.dealer = create_network('Дилер', 'DealerCenter', supplier=self.factory)
+        self.slot = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        self.run = get_or_create_debt_run(DebtTaskRun.INCREASE, (10, 10), slot=self.slot)
+
+    def test_same_slot_reuses_run(self):
+        run = get_or_create_debt_run(DebtTaskRun.INCREASE, (20, 30), slot=self.slot, task_id='other-task')
+        self.assertEqual((run.pk, run.amount), (self.run.pk, 10))
+        self.assertEqual(DebtTaskRun.objects.count(), 1)
+
+    def test_chunk_reapply_does_not_double_charge(self):
+        self.assertEqual(apply_debt_chunk(self.run, self.run.first_id), 2)
+        self.assertEqual(apply_debt_chunk(self.run, self.run.first_id), 2)
+        self.assertEqual(self.run.transactions.count(), 2)
+
+        rollup_debt()
+        self.factory.refresh_from_db()
+        self.assertEqual(self.factory.debt, 10)
+
+    def test_summarize_debt_run(self):
+        shards = split_debt_run(self.run, 1)
+        lane_counts = [apply_debt_shard(0, self.run.pk, *shard) for shard in shards]
+        self.assertEqual(summarize_debt_run(lane_counts, self.run.pk), 'Увеличено задолженность на 10 для 2 сетей.')
+
+        self.run.refresh_from_db()
+        self.assertTrue(self.run.is_finished)
+        self.assertIsNotNone(self.run.finished_at)
+        self.assertEqual(get_debt_run_updated_count(self.run), 2)
+        self.assertEqual(sorted(Network.objects.values_list('debt', flat=True)), [10, 10])
+        self.assertFalse(self.run.transactions.filter(is_applied=False).exists())
+
+    def test_schedule_slot(self):
+        task_path = 'trading_networks.tasks.increase_debt'
+        now = datetime(2026, 1, 1, 4, 30, tzinfo=timezone.utc)
+        self.assertEqual(get_schedule_slot(task_path, now), datetime(2026, 1, 1, 3, tzinfo=timezone.utc))
+        # Время выполнения из запроса задачи задаёт слот точно, без выравнивания по интервалу
+        self.assertEqual(get_schedule_slot(task_path, now, eta='2026-01-01T04:10:00+00:00'),
+                         datetime(2026, 1, 1, 4, 10, tzinfo=timezone.utc))
+
+    def test_dispatch_once(self):
+        with patch('trading_networks.tasks.chord') as mocked_chord:
+            self.assertEqual(dispatch_debt_run(self.run, 100, 2), 1)
+            self.assertEqual(dispatch_debt_run(self.run, 100, 2), 0)
+        self.assertEqual(mocked_chord.call_count, 1)
+        self.run.refresh_from_db()
+        self.assertTrue(self.run.is_dispatched)
+
+
+class HierarchyGraphTests(TestCase):
+    """
+    Тесты графа иерархии в памяти процесса.
+    """
+
+    def test_subtree_height_matches_path_query(self):
+        factory = create_network('Завод')
+        distributor = create_network('Дистрибьютор', 'Distributor', supplier=factory)
+        dealer = create_network('Дилер', 'DealerCenter', supplier=distributor)
+        graph = HierarchyGraph.from_database()
+        retail = create_network('Сеть', 'RetailNetwork', supplier=dealer)
+        self.assertTrue(graph.append(retail.pk, dealer.pk))
+
+        # Внутри транзакции теста граф не используется, поэтому get_subtree_height выполняет запрос по пути
+        for network in (factory, distributor, dealer, retail):
+            network.refresh_from_db()
+            self.assertEqual(graph.get_subtree_height(network.pk), get_subtree_height(network))
+        self.assertEqual(graph.get_subtree_height(factory.pk), 3)
+
+
+class DebtHistoryTests(TestCase):
+    """
+    Тесты сжатия истории задолженности до интервалов (get_debt_history).
+    """
+
+    def test_buckets(self):
+        network = create_network('Завод')
+        start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        for day in range(2):
+            timestamps = [start + timedelta(days=day, hours=hour) for hour in range(0, 24, 6)]
+            NetworkDebtHistory.objects.create(network=network, day=timestamps[0].date(), timestamps=timestamps,
+                                              debts=[Decimal(10 * (day * 4 + index)) for index in range(4)])
+
+        # Снимки в 00, 06, 12, 18 часов двух суток с задолженностью 0, 10, ..., 70; последний снимок вне диапазона
+        history = get_debt_history(network, start, start + timedelta(days=1, hours=18), 3)
+        self.assertEqual([(bucket['start'], bucket['min'], bucket['max'], bucket['avg'], bucket['count'])
+                          for bucket in history], [
+            (start, 0, 20, 10, 3),
+            (start + timedelta(hours=14), 30, 40, 35, 2),
+            (start + timedelta(hours=28), 50, 60, 55, 2),
+        ])
+        self.assertEqual(get_debt_history(network, start + timedelta(days=3), start + timedelta(days=4), 10), [])
+
+
+class NetworkHierarchyTests(APIClientMixin, APITestCase):
+    """
+    Тесты списков поставщиков и потомков сети (NetworkAncestorsAPIView, NetworkDescendantsAPIView).
+    """
+
+    def setUp(self):
+        self.authenticate(User.objects.create(email='admin@example.com', first_name='Админ', last_name='Админов',
+                                              is_superuser=True))
+        self.factory = create_network('Завод')
+        self.distributor = create_network('Дистрибьютор', 'Distributor', supplier=self.factory)
+        self.dealer = create_network('Дилер', 'DealerCenter', supplier=self.distributor)
+        self.retail = create_network('Сеть', 'RetailNetwork', supplier=self.distributor)
+        create_network('Другой завод')
+
+    def get_ids(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [network['pk'] for network in response.data['results']]
+
+    def test_ancestors(self):
+        self.assertEqual(self.get_ids(f'/api/networks/{self.dealer.pk}/ancestors/'),
+                         [self.factory.pk, self.distributor.pk])
+        self.assertEqual(self.get_ids(f'/api/networks/{self.factory.pk}/ancestors/'), [])
+
+    def test_descendants(self):
+        self.assertEqual(self.get_ids(f'/api/networks/{self.factory.pk}/descendants/'),
+                         [self.distributor.pk, self.dealer.pk, self.retail.pk])
+        self.assertEqual(self.get_ids(f'/api/networks/{self.dealer.pk}/descendants/'), [])
+
+
+class ConditionalGetTests(APIClientMixin, APITestCase):
+    """
+    Тесты условных запросов (ConditionalGetMixin): неизменённый ответ возвращается статусом 304, а после изменения
+    связей сети — полностью.
+    """
+
+    def setUp(self):
+        self.authenticate(User.objects.create(email='admin@example.com', first_name='Админ', last_name='Админов',
+                                              is_superuser=True))
+        self.network = create_network('Завод')
+        self.product = Product.objects.create(product_name='Продукт', product_model='X')
+
+    def assert_revalidated(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        etag = response['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        # Изменение связей обновляет время изменения сети (touch_networks)
+        self.network.products.add(self.product)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list(self):
+        self.assert_revalidated('/api/networks/list/')
+
+    def test_detail(self):
+        self.assert_revalidated(f'/api/networks/detail/{self.network.pk}/')
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheTests(APIClientMixin, APITestCase):
+    """
+    Тесты кэша ответов (ResponseCacheMixin): кэшированный список сбрасывается сигналами изменения сети и продукта
+    через смену версии списков.
+    """
+
+    def setUp(self):
+        self.authenticate(User.objects.create(email='admin@example.com', first_name='Админ', last_name='Админов',
+                                              is_superuser=True))
+        self.network = create_network('Завод')
+        self.product = Product.objects.create(product_name='Продукт', product_model='X')
+        self.network.products.add(self.product)
+        cache.clear()
+
+    def get_results(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data['results']
+
+    def assert_invalidated(self, url, model, instance, field_name, value, extract):
+        before = extract(self.get_results(url))
+        # Изменение без сигналов не меняет версию, поэтому ответ берётся из кэша
+        model.objects.filter(pk=instance.pk).update(**{field_name: value})
+        self.assertEqual(extract(self.get_results(url)), before)
+
+        setattr(instance, field_name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            instance.save()
+        self.assertEqual(extract(self.get_results(url)), value)
+
+    def test_network_saved(self):
+        self.assert_invalidated('/api/networks/list/', Network, self.network, 'network_name', 'Новый завод',
+                                lambda results: results[0]['network_name'])
+
+    def test_product_changed(self):
+        self.assert_invalidated('/api/networks/list/?expand=products', Product, self.product, 'product_name',
+                                'Новый продукт', lambda results: results[0]['products'][0]['product_name'])
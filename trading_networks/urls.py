@@ -1,20 +1,32 @@
 from django.urls import path
 
 from trading_networks.api_views.api_network import NetworkCreateAPIView, NetworkListAPIView, NetworkRetrieveAPIView, \
-    NetworkUpdateAPIView, NetworkDestroyAPIView, NetworkDebtAverageAPIView, NetworkByProductAPIView, \
-    GenerateQrCodeAPIView
+    NetworkUpdateAPIView, NetworkDestroyAPIView, NetworkBulkAPIView, NetworkDebtAverageAPIView, NetworkByProductAPIView, \
+    GenerateQrCodeAPIView, NetworkDebtHistoryAPIView, NetworkAncestorsAPIView, NetworkDescendantsAPIView, \
+    NetworkSubtreeDebtAPIView, NetworkSearchAPIView, NetworkExportAPIView, \
+    NetworkDebtBreakdownAPIView, NetworkEmployeeListAPIView, ResponseCacheStatsAPIView
 from trading_networks.apps import TradingNetworksConfig
 
 app_name = TradingNetworksConfig.name
 
 urlpatterns = [
     path('create/', NetworkCreateAPIView.as_view(), name='network-create'),
+    path('bulk/', NetworkBulkAPIView.as_view(), name='network-bulk'),
     path('list/', NetworkListAPIView.as_view(), name='network-list'),
+    path('my/', NetworkEmployeeListAPIView.as_view(), name='network-my-list'),
+    path('export/', NetworkExportAPIView.as_view(), name='network-export'),
     path('detail/<int:pk>/', NetworkRetrieveAPIView.as_view(), name='network-detail'),
     path('update/<int:pk>/', NetworkUpdateAPIView.as_view(), name='network-update'),
     path('delete/<int:pk>/', NetworkDestroyAPIView.as_view(), name='network-delete'),
+    path('<int:pk>/ancestors/', NetworkAncestorsAPIView.as_view(), name='network-ancestors'),
+    path('<int:pk>/descendants/', NetworkDescendantsAPIView.as_view(), name='network-descendants'),
+    path('<int:pk>/debt-history/', NetworkDebtHistoryAPIView.as_view(), name='network-debt-history'),
 
+    path('search/', NetworkSearchAPIView.as_view(), name='network-search'),
     path('debt-exceeds-average/', NetworkDebtAverageAPIView.as_view(), name='network-debt-exceeds-average'),
+    path('cache-stats/', ResponseCacheStatsAPIView.as_view(), name='response-cache-stats'),
+    path('subtree-debt/', NetworkSubtreeDebtAPIView.as_view(), name='network-subtree-debt'),
+    path('debt-breakdown/', NetworkDebtBreakdownAPIView.as_view(), name='network-debt-breakdown'),
     path('product/<int:product_id>/', NetworkByProductAPIView.as_view(), name='network-by-product'),
 
     path('generate-qr/<int:network_id>/', GenerateQrCodeAPIView.as_view(), name='generate-qr-code'),
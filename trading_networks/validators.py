@@ -1,5 +1,12 @@
 from rest_framework import serializers
 
+from trading_networks.hierarchy import get_network_level, get_subtree_height
+
+# Максимальный уровень сети в иерархии (уровни с 0 по 4, всего пять звеньев): сеть этого уровня не может быть
+# поставщиком
+MAX_NETWORK_LEVEL = 4
+MAX_NETWORK_LEVEL_MESSAGE = "Уровень звеньев уже достиг максимума - 5"
+
 
 def validate_supplier_for_factory(data):
     """
@@ -27,7 +34,7 @@ def validate_network_supplier(data):
     Проверяет уровень сети поставщика.
 
     Функция проверяет, не достиг ли уровень сети поставщика максимального значения.
-    Если уровень поставщика равен или превышает 4, генерируется ошибка валидации.
+    Если уровень поставщика равен или превышает MAX_NETWORK_LEVEL, генерируется ошибка валидации.
 
     Аргументы:
     - data (dict): Словарь с данными сети, содержащий ключ 'supplier'.
@@ -36,6 +43,33 @@ def validate_network_supplier(data):
     - dict: Неизмененный словарь с данными, если валидация прошла успешно.
     """
     supplier = data.get('supplier')
-    if supplier and supplier.network_level >= 4:
-        raise serializers.ValidationError("Уровень звеньев уже достиг максимума - 5")
+    if supplier and supplier.network_level >= MAX_NETWORK_LEVEL:
+        raise serializers.ValidationError(MAX_NETWORK_LEVEL_MESSAGE)
+    return data
+
+
+def validate_supplier_hierarchy(network, data):
+    """
+    Проверяет смену поставщика или типа существующей сети.
+
+    Функция проверяет, что новый поставщик не является самой сетью или её потомком (иначе в иерархии возникнет цикл),
+    и что после переноса ни одна сеть поддерева не опустится ниже максимального уровня. Потомок определяется
+    по материализованному пути поставщика, поэтому проверка занимает время, пропорциональное глубине иерархии,
+    а высота поддерева вычисляется одним запросом по индексу пути.
+
+    Аргументы:
+    - network (Network): Изменяемая сеть.
+    - data (dict): Словарь с данными сети, который может содержать ключи 'network_type' и 'supplier'.
+
+    Возвращает:
+    - dict: Неизмененный словарь с данными, если валидация прошла успешно.
+    """
+    supplier = data.get('supplier', network.supplier)
+    network_type = data.get('network_type', network.network_type)
+    if supplier and (supplier.pk == network.pk or f'/{network.pk}/' in supplier.hierarchy_path):
+        raise serializers.ValidationError("Поставщик не может быть самой сетью или её потомком")
+
+    level = get_network_level(network_type, supplier.network_level if supplier else None)
+    if level != network.network_level and level + get_subtree_height(network) > MAX_NETWORK_LEVEL:
+        raise serializers.ValidationError(MAX_NETWORK_LEVEL_MESSAGE)
     return data
@@ -2,21 +2,26 @@ from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated, AllowAny
 
 from trading_networks.permissions import IsSuperUser
+from users.authentication import FreshUserMixin
 from users.models import User
+from users.paginators import UserPaginator
 from users.permissions import IsOwner
 from users.serializers.user import UserSerializer
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(FreshUserMixin, viewsets.ModelViewSet):
     """
     Представление для работы с пользователями.
 
     Данный класс предоставляет CRUD-операции для модели User с различными разрешениями в зависимости
-    от выполняемого действия.
+    от выполняемого действия. Разрешение IsOwner сравнивает пользователя запроса с объектом модели, а изменение
+    профиля и пароля требует актуальных данных, поэтому пользователь загружается из базы данных
+    (см. FreshUserMixin).
 
     Атрибуты:
     - serializer_class: Класс сериализатора, используемого для преобразования объектов User в формат JSON.
     - queryset: QuerySet объектов User, используемый для выборки данных из базы.
+    - pagination_class: Класс пагинации списка пользователей (по номерам страниц или по курсору).
 
     Методы:
     - get_permissions(): Определяет разрешения для различных действий (create, list, update, retrieve, destroy).
@@ -29,7 +34,8 @@ class UserViewSet(viewsets.ModelViewSet):
     - retrieve: Доступен аутентифицированным пользователям, которые являются владельцами или суперпользователями.
     """
     serializer_class = UserSerializer
-    queryset = User.objects.all()
+    queryset = User.objects.order_by('pk')
+    pagination_class = UserPaginator
 
     def get_permissions(self):
         if self.action == 'create':
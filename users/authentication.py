@@ -0,0 +1,62 @@
+from functools import cached_property
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+
+# Поля пользователя, которые передаются в токене доступа и читаются разрешениями IsActiveEmployee и IsSuperUser
+USER_CLAIMS = ('is_active', 'is_superuser')
+
+
+def set_user_claims(token, user):
+    """
+    Записывает в токен текущие значения полей пользователя USER_CLAIMS.
+    """
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+
+
+class ClaimsTokenUser(TokenUser):
+    """
+    Пользователь, построенный по токену доступа без обращения к базе данных.
+
+    Признаки активности и суперпользователя берутся из утверждений токена, которые записываются при выдаче токена
+    и при каждом его обновлении. Остальные поля модели пользователя недоступны.
+    """
+
+    @cached_property
+    def is_active(self):
+        return self.token.get('is_active', False)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    Аутентификация по JWT без загрузки пользователя из базы данных.
+
+    Если токен содержит утверждения USER_CLAIMS, возвращается ClaimsTokenUser, иначе (токены, выданные до включения
+    режима) пользователь загружается из базы данных, как в JWTAuthentication. Токен доступа живёт
+    ACCESS_TOKEN_LIFETIME, а при обновлении утверждения перечитываются из базы данных (см.
+    ClaimsTokenRefreshSerializer), поэтому деактивация пользователя или снятие признака суперпользователя
+    вступает в силу не позднее чем через время жизни токена. Представления, которым нужны актуальные данные
+    пользователя, используют FreshUserMixin.
+
+    Режим включается настройкой JWT_STATELESS_AUTH_ENABLED.
+    """
+
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+        return ClaimsTokenUser(validated_token)
+
+
+class FreshUserMixin:
+    """
+    Миксин для представлений, которым нужен пользователь, загруженный из базы данных при каждом запросе.
+
+    Используется представлениями, которые читают поля пользователя помимо USER_CLAIMS или сравнивают его
+    с объектами модели, а также выполняют необратимые действия, для которых недопустима задержка деактивации
+    пользователя до истечения токена.
+
+    Атрибуты:
+    - authentication_classes: Аутентификация по JWT с загрузкой пользователя из базы данных.
+    """
+    authentication_classes = [JWTAuthentication]
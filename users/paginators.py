@@ -0,0 +1,20 @@
+from rest_framework.pagination import PageNumberPagination
+
+from trading_networks.paginators import KeysetPaginationMixin
+
+
+class UserPaginator(KeysetPaginationMixin, PageNumberPagination):
+    """
+    Пагинатор для списка пользователей.
+
+    По умолчанию разбивает список на страницы по номерам, с параметром `?pagination=cursor` — по курсору,
+    см. KeysetPaginationMixin.
+
+    Атрибуты:
+    - page_size (int): Количество пользователей на странице. По умолчанию 30.
+    - page_size_query_param (str): Параметр запроса для указания количества пользователей на странице.
+    - max_page_size (int): Максимально допустимое количество пользователей на странице.
+    """
+    page_size = 30
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -0,0 +1,50 @@
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from users.authentication import USER_CLAIMS, set_user_claims
+from users.models import User
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Сериализатор для выдачи пары токенов с утверждениями о пользователе.
+
+    В токен обновления записываются поля пользователя USER_CLAIMS, которые копируются в токен доступа
+    (см. StatelessJWTAuthentication).
+
+    Методы:
+    - get_token(user): Возвращает токен обновления с утверждениями о пользователе.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        set_user_claims(token, user)
+        return token
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Сериализатор для обновления токена доступа с актуальными утверждениями о пользователе.
+
+    Пользователь загружается из базы данных при каждом обновлении: неактивному или удалённому пользователю
+    новый токен не выдаётся, а в новый токен доступа записываются текущие значения полей USER_CLAIMS вместо
+    значений, сохранённых в токене обновления при входе.
+
+    Методы:
+    - validate(attrs): Проверяет токен обновления и возвращает новый токен доступа.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = (User.objects.filter(**{api_settings.USER_ID_FIELD: refresh.get(api_settings.USER_ID_CLAIM)})
+                .only('pk', *USER_CLAIMS).first())
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        data = super().validate(attrs)
+        access = refresh.access_token
+        set_user_claims(access, user)
+        data['access'] = str(access)
+        return data
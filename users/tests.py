@@ -1,3 +1,48 @@
-from django.test import TestCase
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from users.authentication import ClaimsTokenUser, StatelessJWTAuthentication
+from users.models import User
+from users.serializers.token import ClaimsTokenObtainPairSerializer
+
+
+class StatelessJWTAuthenticationTests(APITestCase):
+    """
+    Тесты аутентификации по утверждениям токена (StatelessJWTAuthentication) и обновления токена
+    с актуальными утверждениями (ClaimsTokenRefreshSerializer).
+    """
+
+    def setUp(self):
+        self.user = User.objects.create(email='user@example.com', first_name='Имя', last_name='Фамилия')
+        self.refresh = ClaimsTokenObtainPairSerializer.get_token(self.user)
+
+    def authenticate(self, token):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        user, _ = StatelessJWTAuthentication().authenticate(request)
+        return user
+
+    def refresh_token(self):
+        return self.client.post('/api/users/token/refresh/', {'refresh': str(self.refresh)}, format='json')
+
+    def test_claims_without_queries(self):
+        with self.assertNumQueries(0):
+            user = self.authenticate(self.refresh.access_token)
+        self.assertIsInstance(user, ClaimsTokenUser)
+        self.assertEqual((user.pk, user.is_active, user.is_superuser), (str(self.user.pk), True, False))
+
+    def test_token_without_claims_loads_user(self):
+        with self.assertNumQueries(1):
+            user = self.authenticate(AccessToken.for_user(self.user))
+        self.assertEqual(user, self.user)
+
+    def test_refresh_reads_current_claims(self):
+        User.objects.filter(pk=self.user.pk).update(is_superuser=True)
+        response = self.refresh_token()
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertTrue(AccessToken(response.data['access'])['is_superuser'])
+
+    def test_refresh_rejects_inactive_user(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.refresh_token()
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['detail'].code, 'no_active_account')